@@ -1,4 +1,5 @@
 from ising_model import IsingModel2D
+from random_streams import spawn_seeds
 import pandas as pd
 
 # Definimos los tamaños de red a estudiar y la temperatura
@@ -6,6 +7,10 @@ L = [20, 40, 60, 80, 100]
 nsteps = [l * 1000 for l in L]
 Temp = 5.0
 
+semilla = None  # Semilla raíz (None genera una nueva, que se guarda en los CSV)
+raiz, semillas = spawn_seeds(semilla, len(L))  # Flujo i para el modelo del tamaño i
+semilla = raiz.entropy  # Semilla efectiva, para reproducir la simulación
+
 print("Programa para el conjunto L = {}".format(L))
 print("\n---\n")
 
@@ -14,7 +19,7 @@ tiempos = []
 
 # Simulaciones en un bucle
 for i, l in enumerate(L):
-    ising_model = IsingModel2D(L=l)
+    ising_model = IsingModel2D(L=l, seed=semillas[i])
     S_init = ising_model.ordered_state()
     Energia, Magnetizacion, S_final, time_duration = ising_model.simulate(S_init, T=Temp, nsteps=nsteps[i])
     
@@ -26,7 +31,8 @@ for i, l in enumerate(L):
 # Crear un DataFrame con los datos
 df = pd.DataFrame({
     'L': L,
-    'Execution time (s)': tiempos
+    'Execution time (s)': tiempos,
+    'Seed': semilla
 })
 
 # Guardar el DataFrame en un archivo CSV
@@ -1,4 +1,5 @@
 from ising_model import IsingModel2D
+from random_streams import spawn_seeds
 import pandas as pd
 import numpy as np
 
@@ -7,13 +8,17 @@ L_values = np.arange(5,155,5)  # Tamaños de la red L
 nsteps = [l * 1000 for l in L_values]  # Pasos de simulación
 Temp = 5.0  # Temperatura
 
+semilla = None  # Semilla raíz (None genera una nueva, que se guarda en los CSV)
+raiz, semillas = spawn_seeds(semilla, len(L_values))  # Flujo i para el modelo del tamaño i
+semilla = raiz.entropy  # Semilla efectiva, para reproducir la simulación
+
 tiempos_simulacion = []  # Lista para almacenar los tiempos de simulación
 
 print(f"Programa para el conjunto L $\in$ [5,150] \n")
 
 # Iteramos sobre cada tamaño de red L
 for i, L in enumerate(L_values):
-    model = IsingModel2D(L=L)  # Inicializamos el modelo de Ising
+    model = IsingModel2D(L=L, seed=semillas[i])  # Inicializamos el modelo de Ising
     S_init = model.ordered_state()  # Estado inicial
     Energia, Magnetizacion, S_final, tiempo = model.simulate(S_init, T=Temp, nsteps=nsteps[i])  # Simulamos
     tiempos_simulacion.append(tiempo)  # Guardamos el tiempo de simulación
@@ -25,7 +30,8 @@ for i, L in enumerate(L_values):
 # Creamos un DataFrame con los tiempos de simulación
 df = pd.DataFrame({
     'L': L_values,
-    'Execution time (s)': tiempos_simulacion
+    'Execution time (s)': tiempos_simulacion,
+    'Seed': semilla
 })
 
 # Guardamos los resultados en un archivo CSV
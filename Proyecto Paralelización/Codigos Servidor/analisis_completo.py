@@ -1,4 +1,5 @@
 from ising_model import IsingModel2D
+from random_streams import spawn_seeds
 import pandas as pd
 import numpy as np
 
@@ -6,6 +7,9 @@ import numpy as np
 L = [20,40,60,80,100]  # Tamaños de la cuadrícula
 nsteps = [l * 1000 for l in L]  # Número de pasos Montecarlo, aumenta con L
 Temp = np.linspace(0.1, 10, 30)  # Rango de temperaturas
+semilla = None  # Semilla raíz (None genera una nueva, que se guarda en los CSV)
+raiz, semillas = spawn_seeds(semilla, len(L))  # Flujo i para el modelo del tamaño i
+semilla = raiz.entropy  # Semilla efectiva, para reproducir la simulación
 print("Programa para el conjunto L = {} y diferentes valores de temperatura.".format(L))
 
 # Inicializamos listas para almacenar tiempos de ejecución y otros resultados
@@ -16,7 +20,7 @@ magnetizaciones = {}
 # Bucle sobre cada tamaño L para simular y almacenar resultados
 for i, l in enumerate(L):
     # Crear el modelo de Ising para el tamaño L actual
-    ising_model = IsingModel2D(L=l)
+    ising_model = IsingModel2D(L=l, seed=semillas[i])
     S = ising_model.ordered_state()  # Estado ordenado inicial
     
     # Simulación de Monte Carlo para cada temperatura y número de pasos
@@ -36,7 +40,8 @@ for i, l in enumerate(L):
 # Crear un DataFrame con los tiempos de ejecución
 df_time = pd.DataFrame({
     'L': L,
-    'Execution time (s)': tiempos
+    'Execution time (s)': tiempos,
+    'Seed': semilla
 })
 
 # Guardar los tiempos de ejecución en un archivo CSV
@@ -45,6 +50,7 @@ df_time.to_csv("simulation_times_3_paral.csv", index=False)
 # Crear un DataFrame para almacenar las energías y magnetizaciones normalizadas
 df_total = pd.DataFrame({
     "Temperatura": Temp,
+    "Seed": semilla,
     **energias,
     **magnetizaciones
 })
@@ -1,4 +1,5 @@
-from ising_model import IsingModel2D
+from sweep_runner import SweepRunner, make_tasks, load_balance, external_times
+from results_store import ResultsStore
 import multiprocessing as mp
 import pandas as pd
 import numpy as np
@@ -8,29 +9,27 @@ import time
 L = [20, 40, 60, 80, 100]  # Tamaños de sistema a evaluar
 nsteps = [l * 1000 for l in L]  # Número de pasos Monte Carlo para cada L
 Temp = np.linspace(0.1, 10, 30)  # Rango de temperaturas
-args = [[(T, l, steps) for T in Temp] for l, steps in zip(L, nsteps)]  # Argumentos para cada simulación
+tasks = make_tasks(L, Temp, nsteps)  # Tareas (L, T, nsteps) de todo el barrido
 
+semilla = None  # Semilla raíz del barrido (None genera una nueva, que se guarda en los CSV)
 numero_procesadores = 6  # Número de procesadores para paralelización
 print("Programa para el conjunto L = {} y 100 diferentes valores de temperatura.".format(L))
 print("Total de procesadores disponibles:", mp.cpu_count())
 print("Número de procesadores usados:", numero_procesadores)
 
-# --- Función que se ejecuta en paralelo ---
-def simulate_single_temp(T, l, steps):
-    """
-    Simula el modelo de Ising para una temperatura T, tamaño de sistema l y número de pasos.
-    Args:
-        T: Temperatura en la simulación.
-        l: Tamaño del sistema L.
-        steps: Número de pasos Monte Carlo.
-    Returns:
-        Tuple: Contiene la temperatura, energía, magnetización, y tiempo de simulación.
-    """
-    model = IsingModel2D(L=l)  # Crear el modelo Ising 2D
-    S = model.ordered_state()  # Estado inicial ordenado
-    # Ejecutar simulación y obtener resultados
-    Energia, Magnetizacion, S_final, time_duration = model.simulate(S, T=T, nsteps=steps)
-    return T, Energia, Magnetizacion, time_duration  # Retornar los resultados
+# --- Ejecución en paralelo ---
+# Un único pool para todos los L: las tareas (L, T) se envían de una vez, las más
+# costosas primero, y se reciben a medida que terminan
+start_time = time.time()
+# Los valores sin normalizar de cada tarea (L, T, semilla, motor) se guardan en
+# formato largo a medida que terminan (ver results_store)
+store = ResultsStore("resultados_barrido_paralelizacion")
+with SweepRunner(processes=numero_procesadores, seed=semilla, store=store) as runner:
+    results = runner.run(tasks)
+semilla = runner.root_seed.entropy  # Semilla efectiva, para reproducir el barrido
+end_time = time.time()
+
+tiempos_por_L = external_times(results)  # Tiempo externo de cada L dentro del barrido
 
 # Lista para almacenar los resultados de las simulaciones
 tiempos_totales_externos = []
@@ -38,28 +37,16 @@ tiempos_internos_promedio = []
 energias_medias = []
 magnetizaciones_medias = []
 
-# Iterar sobre los tamaños de sistema L
+# Procesar los resultados por tamaño de sistema L
 for i, l in enumerate(L):
-    # Medir el tiempo de simulación externa
-    start_time = time.time()
-
-    # Ejecutar simulaciones en paralelo
-    with mp.Pool(processes=numero_procesadores) as pool:
-        results = pool.starmap(simulate_single_temp, args[i])
-
-    end_time = time.time()  # Medir tiempo de ejecución total
-
-    # Procesar los resultados de la simulación
-    tiempo_total_externo = end_time - start_time
-    Temps = [res[0] for res in results]  # Temperaturas
-    Energias = [res[1] for res in results]  # Energías
-    Magnetizaciones = [res[2] for res in results]  # Magnetizaciones
-    Tiempos_internos = [res[3] for res in results]  # Tiempos de simulación interna
-    Tiempos_internos_mean = np.mean(Tiempos_internos)  # Tiempo promedio interno
+    results_l = [res for res in results if res["L"] == l]
+    tiempo_total_externo = tiempos_por_L[l]
+    Temps = [res["T"] for res in results_l]  # Temperaturas
+    Tiempos_internos_mean = np.mean([res["time_internal"] for res in results_l])  # Tiempo promedio interno
 
     # Calcular la energía y magnetización media para cada temperatura
-    energias_medias_l = np.array([np.mean(e) for e in Energias])
-    magnetizaciones_medias_l = np.array([np.mean(m) for m in Magnetizaciones])
+    energias_medias_l = np.array([res["summary"].mean_energy() for res in results_l])
+    magnetizaciones_medias_l = np.array([res["summary"].mean_magnetization() for res in results_l])
 
     # Guardar los resultados
     tiempos_totales_externos.append(tiempo_total_externo)
@@ -73,6 +60,10 @@ for i, l in enumerate(L):
     print("Tiempo interno promedio: {:.5f} s".format(Tiempos_internos_mean))
     print("\n---\n")
 
+print("Tiempo total del barrido: {:.5f} s".format(end_time - start_time))
+for worker, (n_tareas, ocupado) in sorted(load_balance(results).items()):
+    print("Proceso {}: {} tareas, {:.5f} s ocupado".format(worker, n_tareas, ocupado))
+
 # --- Procesamiento de los resultados ---
 # Normalización de energía y magnetización
 def normalizar(resultados):
@@ -91,7 +82,8 @@ magnetizaciones_medias_normalizadas = normalizar(magnetizaciones_medias)
 df_tiempos = pd.DataFrame({
     'L': L,
     'Execution internal time (s)': tiempos_internos_promedio,
-    'Execution external time (s)': tiempos_totales_externos
+    'Execution external time (s)': tiempos_totales_externos,
+    'Seed': semilla
 })
 
 # Guardar el DataFrame de tiempos en un archivo CSV
@@ -100,6 +92,7 @@ df_tiempos.to_csv("simulation_times_completo.csv", index=False)
 # Crear el DataFrame con los resultados de energía y magnetización normalizados
 df_resultados = pd.DataFrame({
     'Temperatura': Temps,  # Se asume que todos los Temps son iguales
+    'Seed': semilla,
     'E_L20': energias_medias_normalizadas[0],
     'E_L40': energias_medias_normalizadas[1],
     'E_L60': energias_medias_normalizadas[2],
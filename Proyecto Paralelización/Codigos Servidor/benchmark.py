@@ -0,0 +1,224 @@
+from ising_model import IsingModel2D
+from jit_kernel import NUMBA_AVAILABLE
+from sweep_runner import SweepRunner, make_tasks
+from multispin import REPLICAS
+import multiprocessing as mp
+import numpy as np
+import platform
+import argparse
+import json
+import time
+import sys
+
+# Banco de pruebas de rendimiento del modelo de Ising.
+#
+# Reemplaza a los scripts analisis_* para medir tiempos: cada escenario se
+# ejecuta con todos los motores de IsingModel2D, con calentamiento y varias
+# repeticiones, y los resultados se guardan en un único archivo JSON junto con
+# la información de la máquina. Opcionalmente se comparan con una línea base.
+#
+# Uso:
+#     python benchmark.py --output benchmark.json
+#     python benchmark.py --quick --baseline benchmark.json
+#     python benchmark.py --scenarios T_sweep_parallel --processes 8
+
+# Escenarios: tamaños de red, temperaturas, pasos por L y procesos (0 = en
+# serie, None = los de la opción --processes, por defecto uno por procesador)
+SCENARIOS = {
+    "single_T_vs_L": {
+        "L": [20, 40, 60, 80, 100],
+        "T": [5.0],
+        "steps_per_L": 1000,
+        "processes": 0,
+    },
+    "T_sweep_serial": {
+        "L": [20, 40],
+        "T": list(np.linspace(0.1, 10, 10)),
+        "steps_per_L": 1000,
+        "processes": 0,
+    },
+    "T_sweep_parallel": {
+        "L": [20, 40],
+        "T": list(np.linspace(0.1, 10, 10)),
+        "steps_per_L": 1000,
+        "processes": None,
+    },
+}
+
+# Versión reducida para comprobaciones rápidas
+QUICK = {"L": [8, 16], "T": [2.0, 5.0], "steps_per_L": 200}
+
+
+def machine_info():
+    """
+    Información de la máquina y del entorno en que se ejecuta el banco de pruebas.
+    """
+    return {
+        "cpu_count": mp.cpu_count(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "numba": NUMBA_AVAILABLE,
+    }
+
+
+def spin_updates(engine, L, nsteps):
+    """
+    Número de intentos de actualización de espín que realiza un motor para un
+    presupuesto de nsteps pasos (ver IsingModel2D.simulate).
+    """
+    N = L * L
+    if engine in ("checkerboard", "swendsen-wang"):
+        return max(1, nsteps // N) * N
+    if engine == "multispin":
+        return max(1, nsteps // N) * N * REPLICAS
+    return nsteps
+
+
+def supports(engine, L):
+    """
+    Indica si un motor admite una red de lado L (los de tablero de ajedrez requieren L par).
+    """
+    return not (engine in ("checkerboard", "multispin") and L % 2 != 0)
+
+
+def _time_serial(engine, L, temperatures, nsteps, seed=None):
+    """
+    Simula todas las temperaturas en serie y devuelve el tiempo interno en s.
+    """
+    model = IsingModel2D(L=L, seed=seed)
+    result = model.simulate(model.ordered_state(), T=np.array(temperatures), nsteps=nsteps,
+                            engine=engine, stream=True)
+    return result[-1]
+
+
+def _time_parallel(engine, L, temperatures, nsteps, processes, seed=None):
+    """
+    Simula todas las temperaturas con un SweepRunner y devuelve el tiempo externo en s.
+    """
+    tasks = make_tasks([L], temperatures, [nsteps])
+    start = time.perf_counter()
+    with SweepRunner(processes=processes, engine=engine, seed=seed) as runner:
+        runner.run(tasks)
+    return time.perf_counter() - start
+
+
+def run_scenario(name, config, engines, repeats=3, warmup=1, seed=None, processes=None):
+    """
+    Ejecuta un escenario con cada motor y cada L.
+
+    Con una semilla fija, cada repetición simula exactamente las mismas cadenas.
+    Los escenarios con "processes" None usan `processes` procesos (por defecto
+    uno por procesador).
+
+    Devuelve una lista de registros (diccionarios) con los tiempos medidos,
+    pasos por segundo y actualizaciones de espín por segundo.
+    """
+    if config["processes"] is not None:
+        processes = config["processes"]
+    elif processes is None:
+        processes = mp.cpu_count()
+    records = []
+    for engine in engines:
+        for L in config["L"]:
+            if not supports(engine, L):
+                continue
+            nsteps = L * config["steps_per_L"]
+            n_T = len(config["T"])
+
+            def measure():
+                if processes:
+                    return _time_parallel(engine, L, config["T"], nsteps, processes, seed)
+                return _time_serial(engine, L, config["T"], nsteps, seed)
+
+            for _ in range(warmup):
+                measure()  # Compilación JIT, cachés, creación de procesos
+            times = np.array([measure() for _ in range(repeats)])
+
+            best = float(np.min(times))
+            records.append({
+                "scenario": name,
+                "engine": engine,
+                "L": L,
+                "n_T": n_T,
+                "nsteps": nsteps,
+                "processes": processes,
+                "repeats": repeats,
+                "time_min": best,
+                "time_mean": float(np.mean(times)),
+                "time_std": float(np.std(times)),
+                "steps_per_second": nsteps * n_T / best,
+                "flips_per_second": spin_updates(engine, L, nsteps) * n_T / best,
+            })
+            print("{:18s} {:14s} L = {:4d}: {:.5f} s, {:.3e} espines/s".format(
+                name, engine, L, best, records[-1]["flips_per_second"]))
+    return records
+
+
+def compare(records, baseline, tolerance=0.10):
+    """
+    Compara los registros con una línea base.
+
+    Devuelve una lista de (escenario, motor, L, razón de velocidad, regresión)
+    donde la razón es flips_per_second actual / base y hay regresión si la
+    razón es menor que 1 - tolerance. Solo se comparan registros con el mismo
+    número de procesos.
+    """
+    key = lambda r: (r["scenario"], r["engine"], r["L"], r["processes"])
+    base = {key(r): r for r in baseline["records"]}
+    report = []
+    for r in records:
+        if key(r) not in base:
+            continue
+        ratio = r["flips_per_second"] / base[key(r)]["flips_per_second"]
+        report.append(key(r)[:3] + (ratio, ratio < 1.0 - tolerance))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas del modelo de Ising 2D")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--engines", nargs="+", default=list(IsingModel2D.ENGINES),
+                        choices=list(IsingModel2D.ENGINES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--quick", action="store_true", help="redes y pasos reducidos")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="archivo JSON de una ejecución anterior")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--seed", type=int, help="semilla raíz (por defecto se genera una)")
+    parser.add_argument("--processes", type=int, default=mp.cpu_count(),
+                        help="procesos de los escenarios en paralelo (por defecto uno por procesador)")
+    args = parser.parse_args(argv)
+
+    seed = np.random.SeedSequence(args.seed).entropy  # Se guarda en el JSON
+
+    info = machine_info()
+    print("Máquina:", info)
+
+    records = []
+    for name in args.scenarios:
+        config = dict(SCENARIOS[name], **QUICK) if args.quick else SCENARIOS[name]
+        records += run_scenario(name, config, args.engines, args.repeats, args.warmup, seed,
+                                args.processes)
+
+    with open(args.output, "w") as f:
+        json.dump({"machine": info, "seed": seed, "processes": args.processes,
+                   "records": records}, f, indent=2)
+    print("Resultados guardados en", args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = 0
+        for scenario, engine, L, ratio, regression in compare(records, baseline, args.tolerance):
+            regressions += regression
+            print("{:18s} {:14s} L = {:4d}: x{:.2f}{}".format(
+                scenario, engine, L, ratio, "  <-- regresión" if regression else ""))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import numpy as np
+
+from instrumentation import phase
+
+# Motor vectorizado de Metropolis por subredes de tablero de ajedrez.
+#
+# Los sitios "negros" ((i + j) par) solo tienen vecinos "blancos" y viceversa,
+# así que todos los espines de una misma subred pueden actualizarse a la vez
+# sin que sus cambios de energía interfieran entre sí.
+
+
+def checkerboard_masks(L):
+    """
+    Construye las máscaras booleanas de las dos subredes del tablero.
+
+    Parámetros:
+    - L: tamaño del lado de la red (debe ser par para que la partición sea
+      consistente con las condiciones de frontera periódicas)
+
+    Devuelve una tupla (negras, blancas) de arrays booleanos de forma (L, L).
+    """
+    if L % 2 != 0:
+        raise ValueError("El motor de tablero de ajedrez requiere L par (L = {})".format(L))
+    i, j = np.indices((L, L))
+    black = (i + j) % 2 == 0
+    return black, ~black
+
+
+def neighbor_sum(S):
+    """
+    Suma de los 4 vecinos periódicos de cada sitio de una red (L, L).
+
+    Devuelve un array int8 de forma (L, L) con valores en {-4, -2, 0, 2, 4}.
+    """
+    return (np.roll(S, 1, axis=0) + np.roll(S, -1, axis=0)
+            + np.roll(S, 1, axis=1) + np.roll(S, -1, axis=1))
+
+
+def acceptance_table(beta, J=1.0, h=0.0):
+    """
+    Precalcula la probabilidad de aceptación min(1, exp(-beta * delta_E)).
+
+    Como delta_E = 2 s (J n + h) solo depende del espín s = ±1 y de la suma de
+    vecinos n ∈ {-4, -2, 0, 2, 4}, basta una tabla de 2 x 5 por temperatura.
+
+    Devuelve un array de forma (2, 5) indexado por [(s + 1) // 2, (n + 4) // 2].
+    Si beta es un array de forma (R,), devuelve una tabla (R, 2, 5) por réplica.
+    """
+    s = np.array([-1, 1])[:, None]
+    n = np.arange(-4, 5, 2)[None, :]
+    delta_E = 2.0 * s * (J * n + h)
+    return np.minimum(1.0, np.exp(-np.multiply.outer(beta, delta_E)))
+
+
+def lattice_energy(S, J=1.0, h=0.0):
+    """
+    Energía total de una red (L, L) contando solo los enlaces derecha/abajo.
+    """
+    S = S.astype(np.int64)
+    bonds = np.sum(S * (np.roll(S, -1, axis=0) + np.roll(S, -1, axis=1)))
+    return float(-J * bonds - h * np.sum(S))
+
+
+def checkerboard_sweeps(S, beta, nsweeps, J=1.0, h=0.0, rng=None, profiler=None):
+    """
+    Ejecuta barridos completos de Metropolis alternando las dos subredes.
+
+    Parámetros:
+    - S: red de espines de forma (L, L); se copia a int8 y no se modifica
+    - beta: inverso de la temperatura
+    - nsweeps: número de barridos (cada barrido intenta invertir los N espines)
+    - J, h: acoplamiento y campo externo
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+    - profiler: instrumentation.Profiler opcional (fases "rng" y "update" e
+      inversiones aceptadas, contadas por barrido)
+
+    Devuelve:
+    - Energía tras cada barrido (array de tamaño nsweeps + 1)
+    - Magnetización tras cada barrido (array de tamaño nsweeps + 1)
+    - Estado final de forma (L, L) en int8
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    S = np.array(S, dtype=np.int8)
+    L = S.shape[0]
+    masks = checkerboard_masks(L)
+    table = acceptance_table(beta, J, h)
+
+    E = lattice_energy(S, J, h)
+    M = int(np.sum(S, dtype=np.int64))
+    Energy = np.empty(nsweeps + 1)
+    Magn = np.empty(nsweeps + 1, dtype=np.int64)
+    Energy[0] = E
+    Magn[0] = M
+
+    for sweep in range(nsweeps):
+        with phase(profiler, "rng"):
+            u = rng.random((2, L, L))  # Números aleatorios de todo el barrido
+        with phase(profiler, "update"):
+            for color, mask in enumerate(masks):
+                n = neighbor_sum(S)
+                p = table[(S + 1) >> 1, (n + 4) >> 1]
+                flip = mask & (u[color] < p)
+
+                # Los sitios de una subred no son vecinos: los cambios se suman
+                s_flip = S[flip].astype(np.int64)
+                E += float(np.sum(2.0 * s_flip * (J * n[flip] + h)))
+                M -= 2 * int(np.sum(s_flip))
+                S[flip] *= -1
+                if profiler is not None:
+                    profiler.count(L * L // 2, s_flip.shape[0])
+
+        Energy[sweep + 1] = E
+        Magn[sweep + 1] = M
+
+    return Energy, Magn, S
+
+
+def batched_checkerboard_sweeps(S, beta, nsweeps, J=1.0, h=0.0, rng=None, profiler=None):
+    """
+    Barridos de tablero de ajedrez de R réplicas a la vez.
+
+    Todas las réplicas se guardan en un único array (R, L, L) y cada media
+    barrida actualiza la misma subred de todas ellas con una sola serie de
+    operaciones de NumPy; cada réplica usa su propia beta (por difusión).
+
+    Parámetros:
+    - S: redes de espines de forma (R, L, L); se copian a int8
+    - beta: array de tamaño R con el inverso de la temperatura de cada réplica
+    - nsweeps: número de barridos
+    - J, h: acoplamiento y campo externo
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+    - profiler: instrumentation.Profiler opcional (como en checkerboard_sweeps)
+
+    Devuelve:
+    - Energías tras cada barrido, array (nsweeps + 1, R)
+    - Magnetizaciones tras cada barrido, array (nsweeps + 1, R)
+    - Estados finales (R, L, L) en int8
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    S = np.array(S, dtype=np.int8)
+    R, L = S.shape[0], S.shape[1]
+    masks = checkerboard_masks(L)
+    table = acceptance_table(np.asarray(beta, dtype=np.float64), J, h)  # (R, 2, 5)
+    replica = np.arange(R)[:, None, None]
+
+    S64 = S.astype(np.int64)
+    E = (-J * np.sum(S64 * (np.roll(S64, -1, axis=1) + np.roll(S64, -1, axis=2)), axis=(1, 2))
+         - h * np.sum(S64, axis=(1, 2))).astype(np.float64)
+    M = np.sum(S64, axis=(1, 2))
+    Energy = np.empty((nsweeps + 1, R))
+    Magn = np.empty((nsweeps + 1, R), dtype=np.int64)
+    Energy[0] = E
+    Magn[0] = M
+
+    for sweep in range(nsweeps):
+        with phase(profiler, "rng"):
+            u = rng.random((2, R, L, L))
+        with phase(profiler, "update"):
+            for color, mask in enumerate(masks):
+                n = (np.roll(S, 1, axis=1) + np.roll(S, -1, axis=1)
+                     + np.roll(S, 1, axis=2) + np.roll(S, -1, axis=2))
+                p = table[replica, (S + 1) >> 1, (n + 4) >> 1]
+                flip = mask & (u[color] < p)
+
+                s_flip = np.where(flip, S, 0).astype(np.int64)
+                E += np.sum(2.0 * s_flip * (J * n + h), axis=(1, 2))
+                M -= 2 * np.sum(s_flip, axis=(1, 2))
+                S[flip] *= -1
+                if profiler is not None:
+                    profiler.count(R * L * L // 2, int(np.count_nonzero(flip)))
+
+        Energy[sweep + 1] = E
+        Magn[sweep + 1] = M
+
+    return Energy, Magn, S
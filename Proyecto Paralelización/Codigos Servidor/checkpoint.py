@@ -0,0 +1,274 @@
+from jit_kernel import metropolis_chunks, neighbor_energy
+from lattice import make_lattice, vectorized_sweeps
+from observables import ObservableAccumulator
+import numpy as np
+import json
+import os
+
+# Puntos de control para tareas (L, T) largas.
+#
+# Cada tarea se ejecuta por segmentos; al final de cada segmento se guardan en
+# disco la red (empaquetada en bits), el estado del generador aleatorio, el
+# contador de pasos, la energía y el acumulador de observables. Si el proceso
+# muere, la tarea continúa desde el último segmento guardado y produce
+# exactamente los mismos números que una ejecución sin interrupciones.
+#
+# Estructura de un directorio de tarea:
+#     L{L}_T{T}/meta.json            parámetros y estado (se escribe al final)
+#     L{L}_T{T}/state_{paso}.npy     red empaquetada a la que apunta meta.json
+# En redes distintas de la cuadrada periódica el directorio lleva el nombre de
+# la red como prefijo (p. ej. cubic_L40_T4.5), y con campo externo h != 0 el
+# campo como sufijo (p. ej. L20_T2.0_h0.1). T y h se escriben con repr(), que
+# reproduce el float exacto: dos temperaturas distintas nunca comparten nombre.
+#
+# Una tarea solo se reanuda con los mismos parámetros con los que se creó; si
+# no coinciden se lanza ValueError en lugar de mezclar dos cadenas distintas.
+# root_seed.json, en el directorio raíz, guarda la semilla raíz del barrido
+# para que un SweepRunner sin semilla explícita reanude con los mismos flujos.
+
+
+def task_name(L, T, lattice="square", h=0.0):
+    """
+    Nombre que identifica la tarea (L, T, h) en la red `lattice`, compartido
+    por los directorios de puntos de control y los archivos de series.
+    """
+    name = "L{}_T{!r}".format(L, float(T))
+    if h:
+        name += "_h{!r}".format(float(h))
+    if lattice != "square":
+        name = lattice + "_" + name
+    return name
+
+
+def task_dir(directory, L, T, lattice="square", h=0.0):
+    """
+    Directorio de puntos de control de la tarea (L, T, h) en la red `lattice`.
+    """
+    return os.path.join(directory, task_name(L, T, lattice, h))
+
+
+def root_seed(directory, seed=None):
+    """
+    Semilla raíz de un barrido con puntos de control en `directory`.
+
+    Si seed es None se usa la guardada en root_seed.json (o una nueva si no
+    hay); la semilla usada se guarda si el archivo todavía no existe.
+
+    Devuelve una numpy.random.SeedSequence.
+    """
+    path = os.path.join(directory, "root_seed.json")
+    if seed is None and os.path.exists(path):
+        with open(path) as f:
+            return _meta_seed(json.load(f))
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        _write_json(path, {"seed_entropy": seed.entropy, "seed_spawn_key": list(seed.spawn_key)})
+    return seed
+
+
+def _meta_seed(meta):
+    """
+    SeedSequence con la que se creó la tarea, leída de su meta.json.
+    """
+    return np.random.SeedSequence(meta["seed_entropy"], spawn_key=tuple(meta["seed_spawn_key"]))
+
+
+def _write_json(path, data):
+    """
+    Escribe un JSON de forma atómica (archivo temporal + os.replace).
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class CheckpointedTask:
+    """
+    Tarea (L, T, nsteps) reanudable bit a bit desde disco.
+    """
+
+    ENGINES = ("jit", "checkerboard")  # Motores con generador numpy (estado serializable)
+
+    def __init__(self, directory, L, T, nsteps, engine="jit", J=1.0, h=0.0,
+                 thermalization=0, stride=1, segment_steps=None, seed=None, lattice="square"):
+        """
+        Inicializa la tarea; si ya existe un punto de control en disco, se carga.
+
+        Parámetros:
+        - directory: directorio raíz de los puntos de control
+        - L, T, nsteps: tamaño, temperatura y pasos de la tarea
+        - engine: "jit" (pasos individuales) o "checkerboard" (nsteps // N barridos)
+        - J, h: acoplamiento y campo externo
+        - thermalization, stride: parámetros del ObservableAccumulator
+        - segment_steps: pasos entre puntos de control (por defecto 10 barridos)
+        - seed: semilla (entero o numpy.random.SeedSequence); si es None se
+          genera una y queda guardada para poder reproducir la tarea
+        - lattice: nombre de la red (ver lattice.make_lattice)
+
+        Si el punto de control existente se creó con otros parámetros (o con
+        otra semilla, cuando seed no es None) se lanza ValueError.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError("Motor sin soporte de puntos de control '{}', opciones: {}".format(
+                engine, self.ENGINES))
+        self.lattice = make_lattice(lattice, L)
+        self.path = task_dir(directory, L, T, lattice, h)
+        self.meta_path = os.path.join(self.path, "meta.json")
+
+        N = self.lattice.N
+        segment_steps = segment_steps or 10 * N
+        if engine == "checkerboard":
+            # Se trabaja en barridos completos: pasos múltiplos de N
+            nsteps = max(1, nsteps // N) * N
+            segment_steps = max(1, segment_steps // N) * N
+        params = {"L": L, "T": T, "nsteps": nsteps, "engine": engine, "J": J, "h": h,
+                  "lattice": lattice, "segment_steps": segment_steps}
+        if seed is not None and not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        if os.path.exists(self.meta_path):
+            self._load()
+            self._check(params, thermalization, stride, seed)
+            return
+
+        if seed is None:
+            seed = np.random.SeedSequence()
+        self.meta = {
+            **params,
+            "seed_entropy": seed.entropy, "seed_spawn_key": list(seed.spawn_key),
+            "step": 0, "done": False,
+            "E": None, "state_file": None,
+        }
+        self.rng = np.random.default_rng(seed)
+        self.S = np.ones(N, dtype=np.int8)  # Estado inicial ordenado
+        self.acc = ObservableAccumulator(thermalization, stride)
+
+    def _load(self):
+        """
+        Carga el último punto de control guardado.
+        """
+        with open(self.meta_path) as f:
+            self.meta = json.load(f)
+        N = self.lattice.N
+        bits = np.load(os.path.join(self.path, self.meta["state_file"]))
+        self.S = (2 * np.unpackbits(bits, count=N).astype(np.int8) - 1).astype(np.int8)
+        self.rng = np.random.default_rng()
+        self.rng.bit_generator.state = self.meta["rng_state"]
+        self.acc = ObservableAccumulator.from_dict(self.meta["accumulator"])
+
+    def _check(self, params, thermalization, stride, seed):
+        """
+        Lanza ValueError si el punto de control cargado no se creó con los
+        parámetros pedidos.
+        """
+        stored = dict(self.meta, thermalization=self.acc.thermalization, stride=self.acc.stride)
+        requested = dict(params, thermalization=thermalization, stride=stride)
+        if seed is not None:
+            stored["seed"] = (self.meta["seed_entropy"], list(self.meta["seed_spawn_key"]))
+            requested["seed"] = (seed.entropy, list(seed.spawn_key))
+        mismatches = ["{} = {} (se pidió {})".format(name, stored[name], value)
+                      for name, value in requested.items() if stored[name] != value]
+        if mismatches:
+            raise ValueError("El punto de control en '{}' se creó con otros parámetros: {}".format(
+                self.path, ", ".join(mismatches)))
+
+    def save(self):
+        """
+        Guarda el estado actual: primero la red y luego meta.json, que apunta a ella.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        old_file = self.meta["state_file"]
+        state_file = "state_{}.npy".format(self.meta["step"])
+        np.save(os.path.join(self.path, state_file), np.packbits(self.S > 0))
+
+        self.meta["state_file"] = state_file
+        self.meta["rng_state"] = self.rng.bit_generator.state
+        self.meta["accumulator"] = self.acc.as_dict()
+        _write_json(self.meta_path, self.meta)
+
+        if old_file and old_file != state_file:
+            os.remove(os.path.join(self.path, old_file))
+
+    @property
+    def seed(self):
+        """
+        Semilla (SeedSequence) con la que se creó la tarea; al reanudar es la
+        guardada en disco, no la recibida.
+        """
+        return _meta_seed(self.meta)
+
+    @property
+    def done(self):
+        """
+        Indica si la tarea ya completó sus nsteps pasos.
+        """
+        return self.meta["done"]
+
+    def _segment(self, steps):
+        """
+        Avanza la tarea `steps` pasos y acumula los observables.
+        """
+        meta = self.meta
+        J, h = meta["J"], meta["h"]
+        lattice = self.lattice
+        beta = 1.0 / meta["T"]
+        if meta["engine"] == "checkerboard":
+            Energy, Magn, self.S = vectorized_sweeps(self.S, beta, steps // lattice.N, lattice,
+                                                     J=J, h=h, rng=self.rng)
+            self.acc.add_series(Energy[1:], Magn[1:])
+            meta["E"] = float(Energy[-1])
+        else:
+            E = meta["E"]
+            for E_chunk, M_chunk in metropolis_chunks(self.S, beta, steps, E, J, h,
+                                                      nbr=lattice.nbr, rng=self.rng):
+                self.acc.add_series(E_chunk, M_chunk)
+                E = float(E_chunk[-1])
+            meta["E"] = E
+
+    def run(self, max_segments=None):
+        """
+        Ejecuta (o continúa) la tarea guardando un punto de control tras cada segmento.
+
+        Parámetros:
+        - max_segments: número máximo de segmentos a ejecutar en esta llamada
+          (None para terminar la tarea)
+
+        Devuelve el ObservableAccumulator de la tarea.
+        """
+        meta = self.meta
+        if meta["step"] == 0 and meta["E"] is None:
+            # Valor inicial de la cadena, igual que en IsingModel2D.simulate
+            meta["E"] = neighbor_energy(self.S, self.lattice.nbr, meta["J"], meta["h"])
+            self.acc.add(meta["E"], int(np.sum(self.S, dtype=np.int64)))
+            self.save()  # La semilla queda en disco antes del primer segmento
+
+        segments = 0
+        while not meta["done"] and (max_segments is None or segments < max_segments):
+            steps = min(meta["segment_steps"], meta["nsteps"] - meta["step"])
+            self._segment(steps)
+            meta["step"] += steps
+            meta["done"] = meta["step"] >= meta["nsteps"]
+            self.save()
+            segments += 1
+        return self.acc
+
+
+def load_finished(directory, L, T, lattice="square", h=0.0):
+    """
+    Lee una tarea terminada de sus puntos de control.
+
+    Devuelve una tupla (ObservableAccumulator, SeedSequence con la que se
+    simuló la tarea), o None si la tarea no tiene punto de control o no ha
+    terminado.
+    """
+    meta_path = os.path.join(task_dir(directory, L, T, lattice, h), "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if not meta["done"]:
+        return None
+    return ObservableAccumulator.from_dict(meta["accumulator"]), _meta_seed(meta)
@@ -0,0 +1,226 @@
+import numpy as np
+
+from jit_kernel import njit, neighbor_array, neighbor_energy
+
+# Algoritmos de clúster (Wolff y Swendsen–Wang) para el modelo de Ising con h = 0.
+#
+# Cerca de T_c el tiempo de autocorrelación de Metropolis crece como L^~2.17,
+# mientras que las actualizaciones de clúster invierten de una vez regiones
+# correlacionadas enteras y reducen drásticamente ese crecimiento. Ambos
+# núcleos usan un arreglo de vecinos (N, z) como el de jit_kernel.neighbor_array
+# (o de lattice.py, con -1 para vecinos inexistentes) y se compilan con Numba
+# cuando está disponible.
+
+
+def bond_probability(beta, J=1.0):
+    """
+    Probabilidad de activar un enlace entre espines paralelos: 1 - exp(-2 beta J).
+    Solo es una probabilidad para J > 0 (caso ferromagnético).
+    """
+    return 1.0 - np.exp(-2.0 * beta * J)
+
+
+@njit(cache=True)
+def wolff_kernel(S, nbr, p_add, seed_site, uniforms, u, in_cluster, stack, J):
+    """
+    Construye e invierte un clúster de Wolff a partir de seed_site.
+
+    Parámetros:
+    - S: estado int8 de tamaño N (se modifica en el sitio)
+    - nbr: arreglo de vecinos (N, z) (-1 para vecinos inexistentes)
+    - p_add: probabilidad de agregar un vecino paralelo al clúster
+    - seed_site: sitio semilla
+    - uniforms: números uniformes en [0, 1); se usan desde la posición u y
+      deben quedar al menos z N disponibles
+    - u: posición del primer uniforme sin usar
+    - in_cluster: array booleano de tamaño N en False (se deja en False al salir)
+    - stack: array entero de tamaño N usado como pila y lista de miembros
+    - J: constante de acoplamiento
+
+    Devuelve el tamaño del clúster, el cambio de energía y la nueva posición u.
+    """
+    z = nbr.shape[1]
+    s = S[seed_site]
+    stack[0] = seed_site
+    in_cluster[seed_site] = True
+    size = 1
+    head = 0
+    while head < size:
+        i = stack[head]
+        head += 1
+        for d in range(z):
+            j = nbr[i, d]
+            if j >= 0 and not in_cluster[j] and S[j] == s:
+                if uniforms[u] < p_add:
+                    in_cluster[j] = True
+                    stack[size] = j
+                    size += 1
+                u += 1
+
+    # Solo cambian los enlaces de la frontera del clúster
+    delta_E = 0.0
+    for m in range(size):
+        i = stack[m]
+        for d in range(z):
+            j = nbr[i, d]
+            if j >= 0 and not in_cluster[j]:
+                delta_E += 2.0 * J * s * S[j]
+    for m in range(size):
+        i = stack[m]
+        S[i] = -s
+        in_cluster[i] = False
+    return size, delta_E, u
+
+
+@njit(cache=True)
+def _find(parent, i):
+    """
+    Raíz del conjunto de i con compresión de caminos (union-find).
+    """
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        nxt = parent[i]
+        parent[i] = root
+        i = nxt
+    return root
+
+
+@njit(cache=True)
+def swendsen_wang_kernel(S, nbr, p_add, bond_uniforms, flip_uniforms, parent):
+    """
+    Un barrido de Swendsen–Wang: activa enlaces, etiqueta clústeres con
+    union-find y voltea cada clúster con probabilidad 1/2.
+
+    Parámetros:
+    - S: estado int8 de tamaño N (se modifica en el sitio)
+    - nbr: arreglo de vecinos (N, z); se usan los z // 2 enlaces hacia adelante
+    - p_add: probabilidad de activar un enlace entre espines paralelos
+    - bond_uniforms: array (N, z // 2) de uniformes para los enlaces
+    - flip_uniforms: array de N uniformes para decidir qué clústeres se voltean
+    - parent: array entero de tamaño N de trabajo
+
+    Devuelve el número de clústeres.
+    """
+    N = S.shape[0]
+    for i in range(N):
+        parent[i] = i
+    for i in range(N):
+        for d in range(bond_uniforms.shape[1]):
+            j = nbr[i, d]
+            if j >= 0 and S[i] == S[j] and bond_uniforms[i, d] < p_add:
+                ri = _find(parent, i)
+                rj = _find(parent, j)
+                if ri != rj:
+                    parent[ri] = rj
+
+    n_clusters = 0
+    for i in range(N):
+        r = _find(parent, i)
+        if r == i:
+            n_clusters += 1
+        # Cada clúster usa el uniforme de su raíz, así se voltea entero o no se voltea
+        if flip_uniforms[r] < 0.5:
+            S[i] = -S[i]
+    return n_clusters
+
+
+def wolff_run(S, beta, nsteps, E, J=1.0, nbr=None, rng=None):
+    """
+    Ejecuta actualizaciones de Wolff hasta invertir en total al menos nsteps espines.
+
+    Parámetros:
+    - S: estado inicial (lista o array de tamaño N); se copia a int8
+    - beta: inverso de la temperatura
+    - nsteps: número de inversiones de espín equivalentes a pasos de Metropolis
+    - E: energía del estado inicial
+    - J: constante de acoplamiento
+    - nbr: arreglo de vecinos (N, z) (por defecto la red cuadrada periódica)
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+
+    Devuelve:
+    - Energía tras cada clúster (array)
+    - Magnetización tras cada clúster (array)
+    - Tamaño de cada clúster (array)
+    - Estado final (int8 de tamaño N)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    S = np.array(S, dtype=np.int8)
+    N = S.shape[0]
+    if nbr is None:
+        nbr = neighbor_array(int(round(np.sqrt(N))))
+    p_add = bond_probability(beta, J)
+    in_cluster = np.zeros(N, dtype=np.bool_)
+    stack = np.empty(N, dtype=np.int64)
+    z = nbr.shape[1]
+
+    # Búfer de uniformes compartido entre clústeres; se renueva cuando quedan
+    # menos de z N (el máximo que puede consumir un clúster)
+    uniforms = rng.random(max(2 * z * N, 1 << 16))
+    u = 0
+
+    M = int(np.sum(S, dtype=np.int64))
+    Energy = [E]
+    Magn = [M]
+    sizes = []
+    flipped = 0
+    while flipped < nsteps:
+        seed_site = int(rng.integers(N))
+        s = int(S[seed_site])
+        if u + z * N > uniforms.shape[0]:
+            uniforms = rng.random(uniforms.shape[0])
+            u = 0
+        size, delta_E, u = wolff_kernel(S, nbr, p_add, seed_site, uniforms, u,
+                                        in_cluster, stack, float(J))
+        E += delta_E
+        M -= 2 * s * size
+        flipped += size
+        Energy.append(E)
+        Magn.append(M)
+        sizes.append(size)
+
+    return np.array(Energy), np.array(Magn, dtype=np.int64), np.array(sizes, dtype=np.int64), S
+
+
+def swendsen_wang_run(S, beta, nsweeps, J=1.0, nbr=None, rng=None):
+    """
+    Ejecuta nsweeps barridos de Swendsen–Wang.
+
+    Parámetros:
+    - S: estado inicial (lista o array de tamaño N); se copia a int8
+    - beta: inverso de la temperatura
+    - nsweeps: número de barridos
+    - J: constante de acoplamiento
+    - nbr: arreglo de vecinos (N, z) (por defecto la red cuadrada periódica)
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+
+    Devuelve:
+    - Energía tras cada barrido (array de tamaño nsweeps + 1)
+    - Magnetización tras cada barrido (array de tamaño nsweeps + 1)
+    - Estado final (int8 de tamaño N)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    S = np.array(S, dtype=np.int8)
+    N = S.shape[0]
+    if nbr is None:
+        nbr = neighbor_array(int(round(np.sqrt(N))))
+    p_add = bond_probability(beta, J)
+    parent = np.empty(N, dtype=np.int64)
+    forward = nbr.shape[1] // 2
+
+    def observables():
+        return neighbor_energy(S, nbr, J), int(np.sum(S, dtype=np.int64))
+
+    Energy = np.empty(nsweeps + 1)
+    Magn = np.empty(nsweeps + 1, dtype=np.int64)
+    Energy[0], Magn[0] = observables()
+    for sweep in range(nsweeps):
+        swendsen_wang_kernel(S, nbr, p_add, rng.random((N, forward)), rng.random(N), parent)
+        Energy[sweep + 1], Magn[sweep + 1] = observables()
+
+    return Energy, Magn, S
@@ -0,0 +1,423 @@
+from sweep_runner import SweepRunner, worker_name
+from multiprocessing.managers import BaseManager
+from collections import deque
+import multiprocessing as mp
+import threading
+import argparse
+import pickle
+import queue
+import time
+import sys
+import os
+
+# Ejecución distribuida de barridos en varias máquinas.
+#
+# El proceso que lanza el barrido abre un intermediario (broker) con
+# multiprocessing.managers: un servidor TCP que guarda la cola de tareas
+# (TaskBoard). Los procesos trabajadores, en esta u otras máquinas, se conectan
+# con la dirección y la clave del broker, piden tareas de una en una, las
+# ejecutan y devuelven el resultado (el resumen de observables de simulate_task,
+# unos pocos números), que el proceso padre recibe a medida que llegan.
+#
+# Tolerancia a fallos: cada trabajador envía un latido periódico. Si un
+# trabajador deja de latir durante más de lease_timeout segundos (proceso
+# terminado, máquina caída, red cortada), sus tareas en curso vuelven a la cola
+# y las toma otro trabajador. Si el trabajador "perdido" termina después la
+# tarea, el resultado duplicado se descarta. Como cada tarea lleva su propia
+# semilla, repetirla da exactamente el mismo resultado.
+#
+# BrokerPool ofrece la parte de la interfaz de mp.Pool que usa SweepRunner
+# (imap_unordered, apply_async, close, join), así que DistributedSweepRunner es
+# un SweepRunner con los mismos métodos (run, imap, imap_dynamic, anneal),
+# puntos de control, almacén de resultados e instrumentación. Las rutas de
+# series_dir y checkpoint_dir deben estar en un sistema de archivos compartido
+# por todas las máquinas.
+#
+# Uso:
+#     # Máquina principal (lanza el barrido y 4 trabajadores locales)
+#     with DistributedSweepRunner(address=("", 50000), authkey=b"clave", processes=4,
+#                                 engine="jit", seed=1) as runner:
+#         results = runner.run(make_tasks(L, Temp, nsteps))
+#
+#     # Cada máquina adicional (un trabajador por procesador)
+#     python distributed.py worker principal:50000 --authkey clave
+
+
+class TaskBoard:
+    """
+    Cola de tareas del broker: tareas pendientes, en curso (por trabajador),
+    resultados y latidos. Vive en el proceso servidor del broker; los clientes
+    la usan a través de un proxy, por eso todos sus métodos toman el cerrojo.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = deque()   # Identificadores de tareas en espera
+        self.payloads = {}       # Identificador -> (función, argumentos) serializados
+        self.running = {}        # Identificador -> trabajador que la ejecuta
+        self.finished = set()    # Identificadores con resultado
+        self.results = []        # (identificador, ok, valor serializado) aún no leídos
+        self.heartbeats = {}     # Trabajador -> hora del último latido
+        self.lost = set()        # Trabajadores dados por perdidos
+        self.requeued = 0        # Tareas devueltas a la cola por trabajadores perdidos
+        self.closed = False
+
+    def submit(self, task_id, payload):
+        """
+        Agrega una tarea a la cola.
+        """
+        with self.lock:
+            self.payloads[task_id] = payload
+            self.pending.append(task_id)
+
+    def claim(self, worker):
+        """
+        Entrega la siguiente tarea pendiente a `worker`.
+
+        Devuelve (identificador, carga serializada), o None si no hay tareas.
+        """
+        with self.lock:
+            self.heartbeats[worker] = time.time()
+            self.lost.discard(worker)
+            while self.pending:
+                task_id = self.pending.popleft()
+                if task_id in self.finished:
+                    continue
+                self.running[task_id] = worker
+                return task_id, self.payloads[task_id]
+            return None
+
+    def heartbeat(self, worker):
+        """
+        Registra un latido de `worker`.
+        """
+        with self.lock:
+            self.heartbeats[worker] = time.time()
+
+    def complete(self, worker, task_id, ok, value):
+        """
+        Registra el resultado (o el error, si ok es False) de una tarea. Los
+        resultados repetidos de una tarea reasignada se descartan.
+        """
+        with self.lock:
+            if task_id in self.finished:
+                return
+            self.finished.add(task_id)
+            self.running.pop(task_id, None)
+            self.payloads.pop(task_id, None)
+            self.results.append((task_id, ok, value))
+
+    def fetch(self):
+        """
+        Devuelve y vacía la lista de resultados aún no leídos.
+        """
+        with self.lock:
+            results, self.results = self.results, []
+            return results
+
+    def requeue_lost(self, timeout):
+        """
+        Devuelve a la cola (al frente) las tareas en curso de los trabajadores
+        sin latidos en los últimos `timeout` segundos.
+
+        Devuelve la lista de identificadores reasignados.
+        """
+        with self.lock:
+            now = time.time()
+            lost = {w for w, t in self.heartbeats.items() if now - t > timeout}
+            self.lost |= lost
+            requeued = [task_id for task_id, w in self.running.items() if w in lost]
+            for task_id in requeued:
+                del self.running[task_id]
+                self.pending.appendleft(task_id)
+            self.requeued += len(requeued)
+            return requeued
+
+    def close(self):
+        """
+        Indica a los trabajadores que no llegarán más tareas.
+        """
+        with self.lock:
+            self.closed = True
+
+    def is_closed(self):
+        """
+        Indica si el broker ya no recibirá tareas nuevas.
+        """
+        with self.lock:
+            return self.closed
+
+    def status(self):
+        """
+        Estado de la cola: tareas pendientes, en curso y terminadas, tareas
+        reasignadas y trabajadores activos y perdidos.
+        """
+        with self.lock:
+            return {"pending": len(self.pending), "running": len(self.running),
+                    "finished": len(self.finished), "requeued": self.requeued,
+                    "workers": sorted(set(self.heartbeats) - self.lost),
+                    "lost": sorted(self.lost)}
+
+
+_BOARD = None
+
+
+def _get_board():
+    """
+    TaskBoard único del proceso servidor del broker.
+    """
+    global _BOARD
+    if _BOARD is None:
+        _BOARD = TaskBoard()
+    return _BOARD
+
+
+class BrokerManager(BaseManager):
+    """
+    Servidor del broker (lo abre el proceso que lanza el barrido).
+    """
+
+
+BrokerManager.register("board", callable=_get_board)
+
+
+class BrokerClient(BaseManager):
+    """
+    Conexión de un trabajador (o de otro cliente) a un broker ya abierto.
+    """
+
+
+BrokerClient.register("board")
+
+
+def _heartbeat(board, worker, interval, stop):
+    """
+    Envía latidos al broker cada `interval` segundos hasta que se active `stop`.
+    """
+    while not stop.wait(interval):
+        try:
+            board.heartbeat(worker)
+        except (EOFError, OSError):
+            return
+
+
+def run_worker(address, authkey, name=None, heartbeat=5.0, poll=0.5):
+    """
+    Bucle de un trabajador: pide tareas al broker, las ejecuta y devuelve sus
+    resultados hasta que el broker se cierra.
+
+    Parámetros:
+    - address: dirección (host, puerto) del broker
+    - authkey: clave del broker (bytes)
+    - name: nombre del trabajador (por defecto "máquina:pid", el mismo que
+      guardan los resultados de sweep_runner en "worker")
+    - heartbeat: segundos entre latidos (debe ser bastante menor que el
+      lease_timeout del broker)
+    - poll: segundos de espera cuando la cola está vacía
+
+    Devuelve el número de tareas ejecutadas.
+    """
+    client = BrokerClient(address=tuple(address), authkey=authkey)
+    client.connect()
+    board = client.board()
+    name = name or worker_name()
+
+    # El latido va en un hilo aparte para no depender de la duración de las tareas
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(board, name, heartbeat, stop), daemon=True).start()
+    done = 0
+    try:
+        while True:
+            claimed = board.claim(name)
+            if claimed is None:
+                if board.is_closed():
+                    break
+                time.sleep(poll)
+                continue
+            task_id, payload = claimed
+            func, args = pickle.loads(payload)
+            try:
+                ok, value = True, func(*args)
+            except Exception as exc:
+                ok, value = False, exc
+            board.complete(name, task_id, ok, pickle.dumps(value))
+            done += 1
+    except (EOFError, OSError):
+        pass  # El broker se cerró
+    finally:
+        stop.set()
+    return done
+
+
+class BrokerPool:
+    """
+    Pool de procesos distribuido sobre un broker, con la interfaz de mp.Pool
+    que usa SweepRunner (imap_unordered, apply_async, close y join).
+    """
+
+    def __init__(self, address=("", 0), authkey=None, processes=0, lease_timeout=30.0, poll=0.2):
+        """
+        Abre el broker y lanza los trabajadores locales.
+
+        Parámetros:
+        - address: dirección (host, puerto) en la que escucha el broker; el
+          host "" acepta conexiones de cualquier máquina y el puerto 0 elige
+          uno libre (ver self.address)
+        - authkey: clave que deben presentar los trabajadores (bytes; por
+          defecto una clave aleatoria, ver self.authkey)
+        - processes: número de trabajadores locales (0 para usar solo
+          trabajadores externos)
+        - lease_timeout: segundos sin latidos tras los que un trabajador se da
+          por perdido y sus tareas vuelven a la cola
+        - poll: segundos entre consultas de resultados al broker
+        """
+        self.authkey = authkey if authkey is not None else os.urandom(16)
+        self.lease_timeout = lease_timeout
+        self.poll = poll
+        self.manager = BrokerManager(address=tuple(address), authkey=self.authkey)
+        self.manager.start()
+        self.address = self.manager.address
+        self.board = self.manager.board()
+
+        self.workers = [mp.Process(target=run_worker, daemon=True,
+                                   args=(self.address, self.authkey, None, lease_timeout / 4.0, poll))
+                        for _ in range(processes)]
+        for worker in self.workers:
+            worker.start()
+
+        self._next_id = 0
+        self._handlers = {}  # Identificador -> (callback, error_callback)
+        self._handlers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def _collect(self):
+        """
+        Hilo que reasigna las tareas de trabajadores perdidos y entrega los
+        resultados a sus funciones de retorno.
+        """
+        while not self._stop.wait(self.poll):
+            try:
+                self.board.requeue_lost(self.lease_timeout)
+                results = self.board.fetch()
+            except (EOFError, OSError):
+                return
+            for task_id, ok, value in results:
+                with self._handlers_lock:
+                    callback, error_callback = self._handlers.pop(task_id)
+                value = pickle.loads(value)
+                if ok:
+                    callback(value)
+                elif error_callback is not None:
+                    error_callback(value)
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        """
+        Envía func(*args) a la cola; al terminar se llama callback(resultado)
+        o error_callback(excepción) desde el hilo de resultados.
+        """
+        with self._handlers_lock:
+            task_id = self._next_id
+            self._next_id += 1
+            self._handlers[task_id] = (callback or (lambda value: None), error_callback)
+        self.board.submit(task_id, pickle.dumps((func, tuple(args))))
+
+    def imap_unordered(self, func, iterable):
+        """
+        Aplica func a cada elemento de iterable en los trabajadores y produce
+        los resultados en el orden en que terminan. Un error en una tarea se
+        relanza aquí.
+        """
+        finished = queue.Queue()
+        n = 0
+        for item in iterable:
+            self.apply_async(func, (item,), callback=lambda value: finished.put((True, value)),
+                             error_callback=lambda exc: finished.put((False, exc)))
+            n += 1
+        for _ in range(n):
+            ok, value = finished.get()
+            if not ok:
+                raise value
+            yield value
+
+    def status(self):
+        """
+        Estado de la cola del broker (ver TaskBoard.status).
+        """
+        return self.board.status()
+
+    def close(self):
+        """
+        Avisa a los trabajadores de que no habrá más tareas.
+        """
+        self.board.close()
+
+    def join(self):
+        """
+        Espera a los trabajadores locales y cierra el broker.
+        """
+        for worker in self.workers:
+            worker.join()
+        self._stop.set()
+        self._collector.join()
+        self.manager.shutdown()
+
+
+class DistributedSweepRunner(SweepRunner):
+    """
+    SweepRunner cuyas tareas se reparten entre trabajadores conectados a un
+    broker (locales o en otras máquinas) en lugar de un mp.Pool local.
+
+        with DistributedSweepRunner(address=("", 50000), authkey=b"clave") as runner:
+            results = runner.run(make_tasks(L, Temp, nsteps))
+    """
+
+    def __init__(self, address=("", 0), authkey=None, processes=0, lease_timeout=30.0, **options):
+        """
+        Inicializa el ejecutor.
+
+        Parámetros:
+        - address, authkey, lease_timeout: como en BrokerPool
+        - processes: número de trabajadores locales (0 para usar solo
+          trabajadores externos)
+        - options: resto de parámetros de SweepRunner (engine, seed, store, ...)
+        """
+        super().__init__(processes=processes, **options)
+        self.processes = processes
+        self.address = address
+        self.authkey = authkey
+        self.lease_timeout = lease_timeout
+
+    def __enter__(self):
+        self.pool = BrokerPool(self.address, self.authkey, self.processes, self.lease_timeout)
+        self.address = self.pool.address
+        self.authkey = self.pool.authkey
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trabajadores de barridos distribuidos")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="conecta trabajadores a un broker")
+    worker.add_argument("address", help="dirección del broker, host:puerto")
+    worker.add_argument("--authkey", required=True, help="clave del broker")
+    worker.add_argument("--processes", type=int, default=mp.cpu_count(),
+                        help="trabajadores en esta máquina (por defecto uno por procesador)")
+    worker.add_argument("--heartbeat", type=float, default=5.0, help="segundos entre latidos")
+    args = parser.parse_args(argv)
+
+    host, port = args.address.rsplit(":", 1)
+    address = (host, int(port))
+    authkey = args.authkey.encode()
+    processes = [mp.Process(target=run_worker, args=(address, authkey, None, args.heartbeat))
+                 for _ in range(args.processes)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+from contextlib import contextmanager, nullcontext
+import json
+import time
+import sys
+import os
+
+try:
+    import resource
+except ImportError:  # No disponible en Windows
+    resource = None
+
+# Instrumentación opcional de las simulaciones.
+#
+# Un Profiler se pasa a IsingModel (o se activa con SweepRunner(profile=True))
+# y acumula el tiempo de cada fase del bucle principal, los intentos de
+# actualización de espín y las inversiones aceptadas. Al terminar cada
+# simulación emite un registro estructurado (diccionario) con la tasa de
+# aceptación, espines por segundo, tiempos por fase y el pico de memoria.
+#
+# Las fases se miden por bloques de números aleatorios o por barridos, nunca
+# por paso individual. Sin Profiler, los motores solo comprueban `is None` una
+# vez por bloque, así que el costo con la instrumentación desactivada es
+# despreciable.
+#
+# Fases:
+#     rng       generación de números aleatorios
+#     update    propuesta, delta_E, aceptación y actualización de E y M
+#     measure   registro de E y M (listas o ObservableAccumulator)
+#     other     tiempo restante de la simulación (no asignado a ninguna fase)
+
+
+def memory_high_water():
+    """
+    Pico de memoria residente del proceso en MB (None si no está disponible).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en kB en Linux
+    return peak / 1024.0 ** 2 if sys.platform == "darwin" else peak / 1024.0
+
+
+def phase(profiler, name):
+    """
+    Contexto que mide una fase en `profiler`, o que no hace nada si es None.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name)
+
+
+class Profiler:
+    """
+    Acumula tiempos por fase y contadores de espín y emite registros estructurados.
+    """
+
+    def __init__(self, sink=None):
+        """
+        Inicializa el perfilador.
+
+        Parámetros:
+        - sink: función opcional que recibe cada registro al emitirse (p. ej.
+          para escribirlo en un archivo); los registros también se guardan en
+          self.records
+        """
+        self.sink = sink
+        self.records = []
+        self._depth = 0
+        self._reset()
+
+    def _reset(self):
+        """
+        Reinicia los contadores de la medición en curso.
+        """
+        self.phases = {}
+        self.updates = 0
+        self.accepted = None  # None si el motor no cuenta las inversiones
+        self._start = time.perf_counter()
+
+    def begin(self):
+        """
+        Empieza una medición. Las llamadas anidadas (p. ej. simulate dentro de
+        anneal) se suman a la medición exterior y no emiten registros propios.
+        """
+        if self._depth == 0:
+            self._reset()
+        self._depth += 1
+
+    def end(self, kind, **fields):
+        """
+        Termina una medición y, si es la exterior, emite su registro.
+
+        Parámetros:
+        - kind: tipo de registro (p. ej. "simulate")
+        - fields: campos adicionales del registro (L, T, motor, ...)
+
+        Devuelve el registro emitido, o None si la medición estaba anidada.
+        """
+        self._depth -= 1
+        if self._depth:
+            return None
+        return self.emit(kind, **self.summary(), **fields)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Contexto que suma su duración a la fase `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        """
+        Suma `seconds` segundos a la fase `name`.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, updates, accepted=None):
+        """
+        Suma intentos de actualización de espín y, si se conocen, inversiones aceptadas.
+        """
+        self.updates += updates
+        if accepted is not None:
+            self.accepted = (self.accepted or 0) + accepted
+
+    def summary(self):
+        """
+        Resumen de la medición en curso: tiempo, contadores, tasa de
+        aceptación, espines por segundo, tiempos por fase y pico de memoria.
+        """
+        elapsed = time.perf_counter() - self._start
+        phases = dict(self.phases)
+        phases["other"] = max(0.0, elapsed - sum(phases.values()))
+        return {
+            "time": elapsed,
+            "updates": self.updates,
+            "accepted": self.accepted,
+            "acceptance": self.accepted / self.updates
+                          if self.accepted is not None and self.updates else None,
+            "flips_per_second": self.updates / elapsed if elapsed > 0 else None,
+            "phases": phases,
+            "memory_mb": memory_high_water(),
+        }
+
+    def emit(self, kind, **fields):
+        """
+        Emite un registro con el tipo, el proceso y la hora, más los campos dados.
+        """
+        record = {"kind": kind, "pid": os.getpid(), "timestamp": time.time(), **fields}
+        self.collect([record])
+        return record
+
+    def collect(self, records):
+        """
+        Agrega registros ya construidos (p. ej. los devueltos por otro proceso).
+        """
+        for record in records:
+            self.records.append(record)
+            if self.sink is not None:
+                self.sink(record)
+
+
+def write_records(records, path):
+    """
+    Agrega registros a un archivo JSON Lines (un registro por línea).
+    """
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
@@ -1,41 +1,52 @@
 import numpy as np
-import random
 import time
 import math
 
-class IsingModel2D:
+from checkerboard import batched_checkerboard_sweeps
+from cluster import swendsen_wang_run, wolff_run
+from instrumentation import phase
+from jit_kernel import CHUNK, NUMBA_AVAILABLE, metropolis_chunks, metropolis_run, neighbor_energy
+from lattice import make_lattice, vectorized_sweeps
+from multispin import REPLICAS, multispin_run, unpack_replica
+from observables import (BlockingAccumulator, HistogramAccumulator, ObservableAccumulator,
+                         is_equilibrated)
+from random_streams import make_rng
+
+# Motor por defecto de anneal() y simulate_until(): sin Numba el núcleo "jit" corre en Python puro
+# y es más lento que los barridos vectorizados
+FAST_ENGINE = "jit" if NUMBA_AVAILABLE else "checkerboard"
+
+class IsingModel:
     """
-    Clase para simular el modelo de Ising en 2D con condiciones de frontera periódicas.
+    Clase para simular el modelo de Ising sobre una red cualquiera (ver lattice.Lattice).
     """
 
-    def __init__(self, L, J=1.0, h=0.0):
+    ENGINES = ("metropolis", "checkerboard", "jit", "wolff", "swendsen-wang", "multispin")  # Motores disponibles en simulate()
+
+    def __init__(self, lattice, J=1.0, h=0.0, seed=None, profiler=None):
         """
         Inicializa el modelo.
         
         Parámetros:
-        - L: tamaño del lado de la cuadrícula (sistema L x L)
+        - lattice: red de espines (lattice.Lattice, p. ej. make_lattice("cubic", 40))
         - J: constante de acoplamiento entre espines
         - h: campo magnético externo
+        - seed: semilla del generador de números aleatorios del modelo (entero,
+          numpy.random.SeedSequence o Generator); con la misma semilla todas las
+          simulaciones son reproducibles (ver random_streams)
+        - profiler: instrumentation.Profiler opcional; cada simulación emite un
+          registro con aceptación, espines por segundo, tiempos por fase y
+          memoria (None desactiva la instrumentación)
         """
-        self.L = L
-        self.N = L * L  # Número total de sitios
+        self.lattice = lattice
+        self.L = lattice.L
+        self.N = lattice.N  # Número total de sitios
         self.J = J
         self.h = h
-        self.nbr = self._compute_periodic_neighbors()  # Vecinos periódicos precomputados
-
-    def _compute_periodic_neighbors(self):
-        """
-        Calcula los vecinos periódicos para cada sitio en la red.
-        
-        Devuelve un diccionario donde cada clave es un sitio y el valor es una tupla con sus 4 vecinos.
-        """
-        return {
-            i: ((i // self.L) * self.L + (i + 1) % self.L,   # vecino a la derecha
-                (i + self.L) % self.N,                      # vecino de abajo
-                (i // self.L) * self.L + (i - 1) % self.L,   # vecino a la izquierda
-                (i - self.L) % self.N)                       # vecino de arriba
-            for i in range(self.N)
-        }
+        self.nbr = lattice.nbr  # Arreglo de vecinos (N, z) precomputado
+        self.seed = seed
+        self.rng = make_rng(seed)  # Único flujo aleatorio de todos los motores
+        self.profiler = profiler
 
     def random_state(self):
         """
@@ -43,7 +54,7 @@ class IsingModel2D:
         
         Devuelve una lista de tamaño N.
         """
-        return [random.choice([1, -1]) for _ in range(self.N)]
+        return (2 * self.rng.integers(0, 2, size=self.N) - 1).tolist()
 
     def ordered_state(self, value=1):
         """
@@ -58,57 +69,97 @@ class IsingModel2D:
 
     def reshape_state(self, S):
         """
-        Convierte un estado 1D en una matriz 2D (LxL).
+        Convierte un estado 1D en un array con la forma de la red.
         
         Parámetros:
         - S: estado en forma de lista
         
-        Devuelve un array de numpy de forma (L, L).
+        Devuelve un array de numpy de forma (L, L) (o (L, L, L) en la red cúbica).
         """
-        return np.reshape(S, (self.L, self.L))
+        return np.reshape(S, self.lattice.shape)
 
     def energy(self, S):
         """
         Calcula la energía total del sistema para un estado dado.
         
+        Se suman solo los enlaces hacia adelante de cada sitio (derecha y abajo
+        en la red cuadrada), de modo que cada par de vecinos se cuenta una vez.
+        
         Parámetros:
-        - S: lista de espines
+        - S: lista o array de numpy de espines (tamaño N o con la forma de la red)
         
         Devuelve un valor flotante.
         """
-        E = 0.
-        for k in range(self.N):
-            E += -self.J * S[k] * sum(S[nn] for nn in self.nbr[k])  # Interacción con vecinos
-        E *= 0.5  # Corrige doble conteo
-        E -= self.h * sum(S)  # Interacción con el campo externo
-        return E
+        return neighbor_energy(S, self.nbr, self.J, self.h)
 
     def magnetization(self, S):
         """
         Calcula la magnetización total del sistema.
         
         Parámetros:
-        - S: lista de espines
+        - S: lista o array de numpy de espines
         
         Devuelve un valor entero.
         """
-        return sum(S)
+        return int(np.sum(S, dtype=np.int64))
 
-    def simulate(self, S_ini, T, nsteps=20000):
+    def simulate(self, S_ini, T, nsteps=20000, check_every=None, engine="metropolis",
+                 stream=False, thermalization=0, stride=1, histogram=False):
         """
         Realiza una simulación de Monte Carlo usando el algoritmo de Metropolis.
         
+        Con engine="metropolis" la energía y la magnetización se actualizan de
+        forma incremental en cada inversión aceptada (E += delta_E, M += 2 * S[k]),
+        de modo que el costo por paso es O(1) y no O(N).
+        
         Parámetros:
         - S_ini: estado inicial
         - T: temperatura (o arreglo de temperaturas)
-        - nsteps: número de pasos de Monte Carlo
+        - nsteps: número de pasos de Monte Carlo (intentos de inversión individuales)
+        - check_every: si no es None, se recalculan energy() y magnetization()
+          desde cero y se verifica que coincidan con los valores acumulados
+          (modo de autoverificación; lanza RuntimeError si hay deriva). El
+          motor "metropolis" verifica cada `check_every` pasos; el resto
+          ejecuta sus pasos fuera del bucle de Python y verifica solo el
+          estado final de cada temperatura
+        - stream: si es True no se guardan las series de E y M; cada temperatura
+          se resume en un ObservableAccumulator (memoria O(1))
+        - thermalization: valores iniciales descartados en modo stream (pasos,
+          o barridos para "checkerboard")
+        - stride: en modo stream se acumula uno de cada `stride` valores
+        - histogram: en modo stream, si es True cada temperatura se resume en
+          un HistogramAccumulator (guarda además el histograma de energía para
+          reponderar, ver reweighting)
+        - engine: motor de simulación, uno de ENGINES:
+            - "metropolis": espín aleatorio en Python puro, un valor por paso
+            - "checkerboard": subredes de tablero de ajedrez con NumPy; usa
+              nsteps // N barridos completos y reporta un valor por barrido
+              (en redes distintas de la cuadrada periódica con L par se usan
+              las subredes de la red, ver lattice.vectorized_sweeps)
+            - "jit": la misma dinámica de espín aleatorio que "metropolis" sobre
+              arrays int8 con un núcleo compilado con Numba (o Python puro si
+              Numba no está instalado) y tabla de aceptación precalculada
+            - "wolff": clústeres de Wolff hasta invertir al menos nsteps espines
+              en total; reporta un valor por clúster (solo h = 0 y J > 0)
+            - "swendsen-wang": nsteps // N barridos de Swendsen–Wang con
+              etiquetado union-find; un valor por barrido (solo h = 0 y J > 0)
+            - "multispin": 64 réplicas independientes empaquetadas en bits
+              (uint64 por sitio), nsteps // N barridos; E y M son arrays de
+              forma (barridos + 1, 64) y el estado final es la réplica 0 (solo
+              h = 0, J > 0 y red cuadrada periódica)
         
         Devuelve:
         - Energías a lo largo del tiempo
         - Magnetizaciones a lo largo del tiempo
         - Estado final (si solo una temperatura)
         - Tiempo total de simulación
+        
+        En modo stream las dos primeras listas se reemplazan por una única lista
+        de ObservableAccumulator, uno por temperatura.
         """
+        self._check_engine(engine)
+        accumulator = HistogramAccumulator if histogram else ObservableAccumulator
+
         T = np.atleast_1d(T)  # Asegura que T sea un array
         beta = 1.0 / T
 
@@ -118,72 +169,509 @@ class IsingModel2D:
         start = time.perf_counter()
 
         for i in range(len(T)):
-            E = self.energy(S_ini)
-            Energy = [E]
-            S = S_ini.copy()
-            Magn = [self.magnetization(S)]
-
-            for step in range(nsteps):
-                # Elige un espín aleatorio
-                k = random.randint(0, self.N - 1)
-                
-                # Calcula el cambio de energía si se invierte el espín
-                delta_E = 2.0 * S[k] * (sum(S[nn] for nn in self.nbr[k]) + self.h)
+            acc = accumulator(thermalization, stride) if stream else None
 
-                # Criterio de Metropolis para aceptar el cambio
-                if random.uniform(0.0, 1.0) < math.exp(-beta[i] * delta_E):
-                    S[k] *= -1  # Invierte el espín
-                    E += delta_E  # Actualiza energía
-
-                Energy.append(E)
-                Magn.append(self.magnetization(S))
+            if self.profiler is not None:
+                self.profiler.begin()
+            Energy, Magn, S = self._run(engine, S_ini, beta[i], nsteps, check_every, acc)
+            if self.profiler is not None:
+                self.profiler.end("simulate", engine=engine, L=self.L, T=float(T[i]), nsteps=nsteps)
 
-            E_total.append(Energy)
-            M_total.append(Magn)
+            if stream:
+                E_total.append(acc)
+            else:
+                E_total.append(Energy)
+                M_total.append(Magn)
 
         end = time.perf_counter()
 
         # Devuelve diferentes formatos dependiendo si se simula una o varias temperaturas
+        if stream:
+            if len(T) == 1:
+                return [E_total, S, end - start]
+            return [E_total, end - start]
+
         if len(T) == 1:
             return [E_total, M_total, S, end - start]
         
         return [E_total, M_total, end - start]
 
+    def simulate_batch(self, S_ini, T, nsteps=20000, replicas=1, stream=False,
+                       thermalization=0, stride=1):
+        """
+        Simula todas las temperaturas a la vez con el motor de tablero de ajedrez.
+        
+        Las len(T) · replicas réplicas se guardan en un único array int8
+        (R, L, L) y avanzan juntas en cada media barrida, de modo que el costo
+        de Python se reparte entre todas (ver checkerboard.batched_checkerboard_sweeps).
+        
+        Parámetros:
+        - S_ini: estado inicial común a todas las réplicas
+        - T: arreglo de temperaturas
+        - nsteps: pasos de Monte Carlo por réplica (se ejecutan nsteps // N barridos)
+        - replicas: cadenas independientes por temperatura
+        - stream, thermalization, stride: como en simulate()
+        
+        Devuelve:
+        - Energías por barrido para cada temperatura (arrays (barridos + 1,)
+          o (barridos + 1, replicas) si replicas > 1)
+        - Magnetizaciones por barrido, con la misma forma
+        - Estados finales (R, L, L), ordenados por temperatura y luego por réplica
+        - Tiempo total de simulación
+        
+        En modo stream las dos primeras listas se reemplazan por una única lista
+        de ObservableAccumulator, uno por temperatura (combinando sus réplicas).
+        """
+        if not self.lattice.is_square_periodic:
+            raise ValueError("simulate_batch requiere la red cuadrada periódica (red '{}')".format(
+                self.lattice.name))
+        T = np.atleast_1d(T)
+        beta = np.repeat(1.0 / T, replicas)
+        S0 = np.broadcast_to(self.reshape_state(S_ini), (len(beta), self.L, self.L))
+
+        if self.profiler is not None:
+            self.profiler.begin()
+        start = time.perf_counter()
+        Energy, Magn, S = batched_checkerboard_sweeps(S0, beta, max(1, nsteps // self.N),
+                                                      J=self.J, h=self.h, rng=self.rng,
+                                                      profiler=self.profiler)
+        end = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.end("simulate_batch", engine="checkerboard", L=self.L,
+                              T=[float(t) for t in T], replicas=replicas, nsteps=nsteps)
+
+        Energy = Energy.reshape(-1, len(T), replicas)
+        Magn = Magn.reshape(-1, len(T), replicas)
+        if stream:
+            results = []
+            for i in range(len(T)):
+                acc = ObservableAccumulator(thermalization, stride)
+                for r in range(replicas):
+                    chain = ObservableAccumulator(thermalization, stride)
+                    chain.add_series(Energy[:, i, r], Magn[:, i, r])
+                    acc.merge(chain)
+                results.append(acc)
+            return [results, S, end - start]
+
+        squeeze = (lambda x: x[:, 0]) if replicas == 1 else (lambda x: x)
+        E_total = [squeeze(Energy[:, i]) for i in range(len(T))]
+        M_total = [squeeze(Magn[:, i]) for i in range(len(T))]
+        return [E_total, M_total, S, end - start]
+
+    def _check_engine(self, engine):
+        """
+        Verifica que el motor exista y admita los parámetros del modelo.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError("Motor desconocido '{}', opciones: {}".format(engine, self.ENGINES))
+
+        if engine in ("wolff", "swendsen-wang", "multispin") and self.h != 0:
+            raise ValueError("El motor '{}' solo admite h = 0".format(engine))
+
+        if engine in ("wolff", "swendsen-wang", "multispin") and self.J <= 0:
+            raise ValueError("El motor '{}' solo admite J > 0 (ferromagnético)".format(engine))
+
+        if engine == "multispin" and not self.lattice.is_square_periodic:
+            raise ValueError("El motor 'multispin' requiere la red cuadrada periódica (red '{}')".format(
+                self.lattice.name))
+
+    def _run(self, engine, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Ejecuta el motor indicado para una sola temperatura.
+        
+        Devuelve las series de energía y magnetización (None si se acumulan en
+        `acc`) y el estado final.
+        """
+        if engine == "checkerboard":
+            return self._run_checkerboard(S_ini, beta, nsteps, check_every, acc)
+        if engine == "jit":
+            return self._run_jit(S_ini, beta, nsteps, check_every, acc)
+        if engine == "wolff":
+            return self._run_wolff(S_ini, beta, nsteps, check_every, acc)
+        if engine == "swendsen-wang":
+            return self._run_swendsen_wang(S_ini, beta, nsteps, check_every, acc)
+        if engine == "multispin":
+            return self._run_multispin(S_ini, beta, nsteps, check_every, acc)
+        return self._run_metropolis(S_ini, beta, nsteps, check_every, acc)
+
+    def _run_metropolis(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Cadena de Metropolis de espín aleatorio para una sola temperatura.
+        
+        Devuelve las listas de energía y magnetización por paso (None si se
+        acumulan en `acc`) y el estado final.
+        """
+        E = self.energy(S_ini)
+        # El espín fantasma S[-1] = 0 es el "vecino" -1 de las fronteras abiertas
+        S = [int(s) for s in np.ravel(S_ini)] + [0]
+        M = self.magnetization(S)
+        nbr = self.nbr.tolist()  # Listas de Python: indexación más rápida en el bucle
+        chunk = min(nsteps, CHUNK)
+        profiler = self.profiler
+        accepted = 0
+        if profiler is not None:
+            rng_time = profiler.phases.get("rng", 0.0)
+            loop_start = time.perf_counter()
+        if acc is None:
+            Energy = [E]
+            Magn = [M]
+        else:
+            Energy = Magn = None
+            acc.add(E, M)
+
+        for step in range(nsteps):
+            # Números aleatorios pregenerados por bloques
+            if step % chunk == 0:
+                with phase(profiler, "rng"):
+                    sites = self.rng.integers(0, self.N, size=chunk).tolist()
+                    uniforms = self.rng.random(chunk).tolist()
+
+            # Elige un espín aleatorio
+            k = sites[step % chunk]
+            
+            # Calcula el cambio de energía si se invierte el espín
+            delta_E = 2.0 * S[k] * (self.J * sum(S[nn] for nn in nbr[k]) + self.h)
+
+            # Criterio de Metropolis para aceptar el cambio
+            if uniforms[step % chunk] < math.exp(-beta * delta_E):
+                S[k] *= -1  # Invierte el espín
+                E += delta_E  # Actualiza energía
+                M += 2 * S[k]  # Actualiza magnetización
+                accepted += 1
+
+            if acc is None:
+                Energy.append(E)
+                Magn.append(M)
+            else:
+                acc.add(E, M)
+
+            if check_every and (step + 1) % check_every == 0:
+                self._check_observables(S[:-1], E, M)
+
+        if profiler is not None:
+            # En Python puro no se cronometra cada paso: "update" incluye el
+            # registro de E y M del bucle
+            rng_time = profiler.phases.get("rng", 0.0) - rng_time
+            profiler.add_time("update", time.perf_counter() - loop_start - rng_time)
+            profiler.count(nsteps, accepted)
+        return Energy, Magn, S[:-1]
+
+    def _run_checkerboard(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Barridos vectorizados por subredes para una sola temperatura.
+        
+        Devuelve los arrays de energía y magnetización por barrido (None si se
+        acumulan en `acc`) y el estado final aplanado (int8 de tamaño N).
+        """
+        nsweeps = max(1, nsteps // self.N)
+        Energy, Magn, S = vectorized_sweeps(S_ini, beta, nsweeps, self.lattice, J=self.J, h=self.h,
+                                            rng=self.rng, profiler=self.profiler)
+        if check_every:
+            self._check_observables(S, Energy[-1], Magn[-1])
+        if acc is not None:
+            with phase(self.profiler, "measure"):
+                acc.add_series(Energy, Magn)
+            Energy = Magn = None
+        return Energy, Magn, S
+
+    def _run_jit(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Cadena de Metropolis de espín aleatorio con el núcleo compilado.
+        
+        Devuelve los arrays de energía y magnetización por paso (None si se
+        acumulan en `acc`) y el estado final (int8 de tamaño N).
+        """
+
+        if acc is None:
+            Energy, Magn, S = metropolis_run(S_ini, beta, nsteps, J=self.J, h=self.h,
+                                             E=self.energy(S_ini), nbr=self.nbr, rng=self.rng,
+                                             profiler=self.profiler)
+            E, M = Energy[-1], Magn[-1]
+        else:
+            # Los bloques del núcleo se reducen al vuelo y se descartan
+            Energy = Magn = None
+            S = np.array(S_ini, dtype=np.int8)
+            E, M = self.energy(S_ini), self.magnetization(S_ini)
+            acc.add(E, M)
+            for E_chunk, M_chunk in metropolis_chunks(S, beta, nsteps, E, self.J, self.h,
+                                                      nbr=self.nbr, rng=self.rng,
+                                                      profiler=self.profiler):
+                with phase(self.profiler, "measure"):
+                    acc.add_series(E_chunk, M_chunk)
+                E, M = E_chunk[-1], M_chunk[-1]
+
+        if check_every:
+            self._check_observables(S, E, M)
+        return Energy, Magn, S
+
+    def _run_wolff(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Actualizaciones de clúster de Wolff para una sola temperatura.
+        
+        Devuelve los arrays de energía y magnetización por clúster (None si se
+        acumulan en `acc`) y el estado final (int8 de tamaño N).
+        """
+        with phase(self.profiler, "update"):
+            Energy, Magn, sizes, S = wolff_run(S_ini, beta, nsteps, self.energy(S_ini), J=self.J,
+                                               nbr=self.nbr, rng=self.rng)
+        if self.profiler is not None:
+            flipped = int(np.sum(sizes))  # Los clústeres se invierten siempre
+            self.profiler.count(flipped, flipped)
+        if check_every:
+            self._check_observables(S, Energy[-1], Magn[-1])
+        if acc is not None:
+            with phase(self.profiler, "measure"):
+                acc.add_series(Energy, Magn)
+            Energy = Magn = None
+        return Energy, Magn, S
+
+    def _run_swendsen_wang(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Barridos de Swendsen–Wang para una sola temperatura.
+        
+        Devuelve los arrays de energía y magnetización por barrido (None si se
+        acumulan en `acc`) y el estado final (int8 de tamaño N).
+        """
+        nsweeps = max(1, nsteps // self.N)
+        with phase(self.profiler, "update"):
+            Energy, Magn, S = swendsen_wang_run(S_ini, beta, nsweeps, J=self.J,
+                                                nbr=self.nbr, rng=self.rng)
+        if self.profiler is not None:
+            self.profiler.count(nsweeps * self.N)
+        if check_every:
+            self._check_observables(S, Energy[-1], Magn[-1])
+        if acc is not None:
+            with phase(self.profiler, "measure"):
+                acc.add_series(Energy, Magn)
+            Energy = Magn = None
+        return Energy, Magn, S
+
+    def _run_multispin(self, S_ini, beta, nsteps, check_every=None, acc=None):
+        """
+        Barridos de 64 réplicas empaquetadas en bits para una sola temperatura.
+        
+        Devuelve los arrays (barridos + 1, 64) de energía y magnetización (None
+        si se acumulan en `acc`, combinando las 64 cadenas) y la réplica 0 del
+        estado final (int8 de tamaño N).
+        """
+        nsweeps = max(1, nsteps // self.N)
+        with phase(self.profiler, "update"):
+            Energy, Magn, W = multispin_run(S_ini, beta, nsweeps, J=self.J, rng=self.rng)
+        if self.profiler is not None:
+            self.profiler.count(nsweeps * self.N * REPLICAS)
+        S = unpack_replica(W, 0).ravel()
+        if check_every:
+            self._check_observables(S, Energy[-1, 0], Magn[-1, 0])
+        if acc is not None:
+            with phase(self.profiler, "measure"):
+                acc.add_replicas(Energy, Magn)
+            Energy = Magn = None
+        return Energy, Magn, S
+
+    def anneal(self, temperatures, nsteps, S_ini=None, engine=FAST_ENGINE, order="up",
+               block_steps=None, window=5, max_burnin=None, stride=1):
+        """
+        Recorre la malla de temperaturas reutilizando el estado final de cada
+        temperatura como estado inicial de la siguiente (recocido).
+        
+        En cada temperatura se simula por bloques de `block_steps` pasos hasta
+        que la energía deja de derivar (observables.is_equilibrated) o se
+        alcanza max_burnin, y luego se miden nsteps pasos en modo stream.
+        
+        Parámetros:
+        - temperatures: arreglo de temperaturas
+        - nsteps: pasos de medición por temperatura
+        - S_ini: estado inicial (por defecto ordered_state() si order="up" y
+          random_state() si order="down")
+        - engine: motor de simulate() (por defecto "jit" si Numba está
+          instalado y "checkerboard" si no, ver FAST_ENGINE)
+        - order: "up" recorre de menor a mayor temperatura, "down" al revés
+        - block_steps: pasos por bloque de termalización (por defecto N, un barrido)
+        - window: bloques por ventana en la prueba de deriva
+        - max_burnin: máximo de pasos de termalización por temperatura (por
+          defecto nsteps)
+        - stride: se acumula uno de cada `stride` valores
+        
+        Devuelve:
+        - Lista de ObservableAccumulator en el orden de `temperatures`
+        - Pasos de termalización usados en cada temperatura
+        - Estado final
+        - Tiempo total de simulación
+        """
+        if order not in ("up", "down"):
+            raise ValueError("order debe ser 'up' o 'down'")
+        temperatures = np.atleast_1d(temperatures)
+        block_steps = block_steps or self.N
+        max_burnin = nsteps if max_burnin is None else max_burnin
+        if S_ini is None:
+            S_ini = self.ordered_state() if order == "up" else self.random_state()
+
+        walk = np.argsort(temperatures)
+        if order == "down":
+            walk = walk[::-1]
+
+        results = [None] * len(temperatures)
+        burnin = np.zeros(len(temperatures), dtype=np.int64)
+        S = S_ini
+
+        start = time.perf_counter()
+        for i in walk:
+            T = temperatures[i]
+
+            if self.profiler is not None:
+                self.profiler.begin()
+            S, burnin[i] = self._thermalize(S, T, engine, block_steps, window, max_burnin)
+            accs, S, _ = self.simulate(S, T=T, nsteps=nsteps, engine=engine, stream=True,
+                                       stride=stride)
+            results[i] = accs[0]
+            if self.profiler is not None:
+                self.profiler.end("anneal", engine=engine, L=self.L, T=float(T), nsteps=nsteps,
+                                  burnin=int(burnin[i]))
+        end = time.perf_counter()
+
+        return [results, burnin, S, end - start]
+
+    def _thermalize(self, S, T, engine, block_steps, window, max_burnin):
+        """
+        Simula por bloques de block_steps pasos hasta que la energía deja de
+        derivar (observables.is_equilibrated) o se alcanzan max_burnin pasos.
+        
+        Devuelve el estado termalizado y los pasos usados.
+        """
+        block_means = []
+        steps = 0
+        while steps < max_burnin and not is_equilibrated(block_means, window):
+            accs, S, _ = self.simulate(S, T=T, nsteps=block_steps, engine=engine, stream=True)
+            block_means.append(accs[0].mean_energy())
+            steps += block_steps
+        return S, steps
+
+    def simulate_until(self, S_ini, T, target_error=0.01, engine=FAST_ENGINE, chunk_steps=None,
+                       max_steps=None, min_blocks=32, block_steps=None, window=5,
+                       max_burnin=None, error_floor=None):
+        """
+        Simula una temperatura hasta alcanzar un error relativo objetivo.
+        
+        Primero se detecta la termalización como en anneal(); luego se simula
+        por partes de chunk_steps pasos, acumulando en un BlockingAccumulator,
+        hasta que los errores relativos (análisis de bloques) de <E>, C_V y chi
+        son menores que target_error, o hasta max_steps.
+        
+        Parámetros:
+        - S_ini: estado inicial
+        - T: temperatura
+        - target_error: error relativo objetivo para <E>, C_V y chi
+        - engine: motor de simulate() (por defecto FAST_ENGINE, como en anneal())
+        - chunk_steps: pasos entre comprobaciones (por defecto 10 N)
+        - max_steps: máximo de pasos de medición (por defecto 10000 N)
+        - min_blocks: mínimo de bloques antes de confiar en los errores
+        - block_steps, window, max_burnin: parámetros de la termalización
+          (por defecto N, 5 y 1000 N)
+        - error_floor: mínimo del denominador de los errores relativos (por
+          defecto 0.01 N): si C_V o chi son casi nulos basta con que su error
+          absoluto sea menor que target_error · error_floor (ver
+          BlockingAccumulator.relative_errors)
+
+        No admite engine="multispin": sus 64 réplicas parten del mismo estado
+        en cada parte, así que sus bloques no son independientes y los
+        errores quedarían subestimados.
+        
+        Devuelve:
+        - BlockingAccumulator de la medición
+        - Diccionario de estadísticas (BlockingAccumulator.statistics), con
+          errores, tiempos de autocorrelación y tamaño efectivo de la muestra,
+          y "target_reached": False si se llegó a max_steps sin alcanzar el
+          error objetivo
+        - Pasos de termalización
+        - Estado final
+        - Tiempo total de simulación
+        """
+        self._check_engine(engine)
+        if engine == "multispin":
+            raise ValueError("simulate_until no admite el motor 'multispin' (réplicas no independientes)")
+        chunk_steps = chunk_steps or 10 * self.N
+        max_steps = max_steps or 10000 * self.N
+        block_steps = block_steps or self.N
+        max_burnin = 1000 * self.N if max_burnin is None else max_burnin
+        error_floor = 0.01 * self.N if error_floor is None else error_floor
+
+        if self.profiler is not None:
+            self.profiler.begin()
+        start = time.perf_counter()
+        S, burnin = self._thermalize(S_ini, T, engine, block_steps, window, max_burnin)
+
+        acc = BlockingAccumulator()
+        steps = 0
+        reached = False
+        while steps < max_steps and not reached:
+            if steps:
+                acc.skip(1)  # El estado inicial de la parte ya fue acumulado
+            _, _, S = self._run(engine, S, 1.0 / T, chunk_steps, None, acc)
+            steps += chunk_steps
+            reached = acc.n_blocks >= min_blocks and \
+                max(acc.relative_errors(T, error_floor).values()) <= target_error
+        end = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.end("simulate_until", engine=engine, L=self.L, T=float(T),
+                              nsteps=steps, burnin=int(burnin), target_reached=reached)
+
+        stats = acc.statistics(T)
+        stats["target_reached"] = reached
+        return [acc, stats, burnin, S, end - start]
+
+    def _check_observables(self, S, E, M, tol=1e-8):
+        """
+        Verifica que la energía y magnetización acumuladas coincidan con las
+        recalculadas desde cero para el estado S.
+        
+        Lanza RuntimeError si hay deriva entre ambos valores (también con
+        python -O, a diferencia de assert).
+        """
+        E_ref = self.energy(S)
+        M_ref = self.magnetization(S)
+        if not math.isclose(E, E_ref, rel_tol=tol, abs_tol=tol):
+            raise RuntimeError("Deriva en la energía: acumulada {} vs recalculada {}".format(E, E_ref))
+        if M != M_ref:
+            raise RuntimeError("Deriva en la magnetización: acumulada {} vs recalculada {}".format(M, M_ref))
+
     def mean_energy(self, energy_configs):
         """
         Calcula la energía promedio a partir de varias configuraciones.
         
         Parámetros:
-        - energy_configs: lista de listas de energías
+        - energy_configs: lista de listas de energías (o de ObservableAccumulator)
         
         Devuelve un array de numpy.
         """
-        return np.array([np.mean(E) for E in energy_configs])
+        return np.array([E.mean_energy() if isinstance(E, ObservableAccumulator) else np.mean(E)
+                         for E in energy_configs])
 
     def mean_magnetization(self, magnetization_configs):
         """
         Calcula la magnetización promedio a partir de varias configuraciones.
         
         Parámetros:
-        - magnetization_configs: lista de listas de magnetizaciones
+        - magnetization_configs: lista de listas de magnetizaciones (o de ObservableAccumulator)
         
         Devuelve un array de numpy.
         """
-        return np.array([np.mean(M) for M in magnetization_configs])
+        return np.array([M.mean_magnetization() if isinstance(M, ObservableAccumulator) else np.mean(M)
+                         for M in magnetization_configs])
 
     def heat_capacity(self, energy_configs, temperatures):
         """
         Calcula la capacidad calorífica C_V del sistema.
         
         Parámetros:
-        - energy_configs: lista de listas de energías
+        - energy_configs: lista de listas de energías (o de ObservableAccumulator)
         - temperatures: arreglo de temperaturas
         
         Devuelve un array de numpy con C_V en función de T.
         """
         K_B = 1.0  # Constante de Boltzmann (unidades naturales)
         mean_E = self.mean_energy(energy_configs)
-        mean_E2 = np.array([np.mean(np.array(E) ** 2) for E in energy_configs])
+        mean_E2 = np.array([E.mean_energy2() if isinstance(E, ObservableAccumulator)
+                            else np.mean(np.array(E) ** 2) for E in energy_configs])
         C_V = (mean_E2 - mean_E ** 2) / ((temperatures ** 2) * K_B)
         return C_V
 
@@ -192,13 +680,52 @@ class IsingModel2D:
         Calcula la susceptibilidad magnética chi del sistema.
         
         Parámetros:
-        - magnetization_configs: lista de listas de magnetizaciones
+        - magnetization_configs: lista de listas de magnetizaciones (o de ObservableAccumulator)
         - temperatures: arreglo de temperaturas
         
         Devuelve un array de numpy con chi en función de T.
         """
         K_B = 1.0  # Constante de Boltzmann (unidades naturales)
         mean_M = self.mean_magnetization(magnetization_configs)
-        mean_M2 = np.array([np.mean(np.array(M) ** 2) for M in magnetization_configs])
+        mean_M2 = np.array([M.mean_magnetization2() if isinstance(M, ObservableAccumulator)
+                            else np.mean(np.array(M, dtype=float) ** 2) for M in magnetization_configs])
         chi = (mean_M2 - mean_M ** 2) / (temperatures * K_B)
         return chi
+
+    def binder_cumulant(self, magnetization_configs):
+        """
+        Calcula el cumulante de Binder U_L = 1 - <M⁴> / (3 <M²>²).
+        
+        Parámetros:
+        - magnetization_configs: lista de listas de magnetizaciones (o de ObservableAccumulator)
+        
+        Devuelve un array de numpy con U_L para cada configuración.
+        """
+        U = []
+        for M in magnetization_configs:
+            if isinstance(M, ObservableAccumulator):
+                U.append(M.binder_cumulant())
+            else:
+                M2 = np.array(M, dtype=float) ** 2
+                U.append(1.0 - np.mean(M2 ** 2) / (3.0 * np.mean(M2) ** 2))
+        return np.array(U)
+
+
+class IsingModel2D(IsingModel):
+    """
+    Clase para simular el modelo de Ising en 2D con condiciones de frontera periódicas.
+    """
+
+    def __init__(self, L, J=1.0, h=0.0, seed=None, profiler=None):
+        """
+        Inicializa el modelo sobre la red cuadrada periódica de L x L sitios.
+        
+        Parámetros:
+        - L: tamaño del lado de la cuadrícula (sistema L x L)
+        - J, h, seed, profiler: como en IsingModel
+        
+        El arreglo de vecinos (N, 4) (derecha, abajo, izquierda y arriba) se
+        guarda en caché por L, así que todas las instancias del mismo tamaño
+        (y los procesos creados por fork) comparten la misma copia.
+        """
+        super().__init__(make_lattice("square", L), J, h, seed, profiler)
@@ -0,0 +1,196 @@
+import numpy as np
+import functools
+
+from instrumentation import phase
+
+# Núcleo compilado de Metropolis de espín aleatorio.
+#
+# Si Numba está disponible el núcleo se compila con @njit; si no, se usa la
+# misma función en Python puro, de modo que los resultados no dependen de que
+# Numba esté instalado (solo la velocidad).
+#
+# Los núcleos admiten cualquier red descrita por un arreglo de vecinos (N, z)
+# (ver lattice.py): las primeras z // 2 columnas son los enlaces "hacia
+# adelante", de modo que cada enlace se cuenta una vez, y un índice -1 indica
+# que el vecino no existe (fronteras abiertas).
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Sustituto de numba.njit que devuelve la función sin compilar.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+CHUNK = 1 << 16  # Pasos por bloque de números aleatorios pregenerados
+
+
+@functools.lru_cache(maxsize=None)
+def neighbor_array(L):
+    """
+    Construye el arreglo de vecinos periódicos como un array contiguo (N, 4).
+
+    Las columnas son los vecinos derecha, abajo, izquierda y arriba. El
+    resultado se guarda en caché por L y es de solo lectura, ya que lo
+    comparten todas las instancias de IsingModel2D del mismo tamaño.
+    """
+    N = L * L
+    i = np.arange(N)
+    row = (i // L) * L
+    nbr = np.ascontiguousarray(np.stack([
+        row + (i + 1) % L,      # vecino a la derecha
+        (i + L) % N,            # vecino de abajo
+        row + (i - 1) % L,      # vecino a la izquierda
+        (i - L) % N,            # vecino de arriba
+    ], axis=1).astype(np.int64))
+    nbr.setflags(write=False)
+    return nbr
+
+
+def neighbor_energy(S, nbr, J=1.0, h=0.0):
+    """
+    Energía total de un estado contando solo los enlaces hacia adelante de nbr.
+
+    Parámetros:
+    - S: estado de tamaño N
+    - nbr: arreglo de vecinos (N, z); los índices -1 no aportan enlace
+    - J, h: acoplamiento y campo externo
+
+    Devuelve un valor flotante.
+    """
+    S = np.asarray(S, dtype=np.int64).ravel()
+    padded = np.append(S, 0)  # Sitio fantasma de espín 0 en el índice -1
+    bonds = np.sum(S[:, None] * padded[nbr[:, :nbr.shape[1] // 2]])
+    return float(-J * bonds - h * np.sum(S))
+
+
+def neighbor_acceptance_table(beta, z, J=1.0, h=0.0):
+    """
+    Precalcula min(1, exp(-beta * delta_E)) con delta_E = 2 s (J n + h) para
+    una red de coordinación z.
+
+    Devuelve un array de forma (2, 2 z + 1) indexado por [(s + 1) // 2, n + z],
+    donde n ∈ [-z, z] es la suma de los vecinos existentes.
+    """
+    s = np.array([-1, 1])[:, None]
+    n = np.arange(-z, z + 1)[None, :]
+    return np.minimum(1.0, np.exp(-beta * (2.0 * s * (J * n + h))))
+
+
+@njit(cache=True)
+def metropolis_kernel(S, nbr, table, sites, uniforms, J, h, E, M, Energy, Magn):
+    """
+    Aplica un bloque de pasos de Metropolis de espín aleatorio.
+
+    Parámetros:
+    - S: estado aplanado int8 de tamaño N (se modifica en el sitio)
+    - nbr: arreglo de vecinos (N, z) (-1 para vecinos inexistentes)
+    - table: tabla de aceptación (2, 2 z + 1) de neighbor_acceptance_table
+    - sites, uniforms: sitios y números uniformes pregenerados del bloque
+    - J, h: acoplamiento y campo externo
+    - E, M: energía y magnetización al inicio del bloque
+    - Energy, Magn: arrays de salida del bloque (energía y magnetización tras cada paso)
+
+    Devuelve la energía y magnetización al final del bloque.
+    """
+    z = nbr.shape[1]
+    for step in range(sites.shape[0]):
+        k = sites[step]
+        s = int(S[k])
+        n = 0
+        for d in range(z):
+            j = nbr[k, d]
+            if j >= 0:
+                n += int(S[j])
+        if uniforms[step] < table[(s + 1) >> 1, n + z]:
+            E += 2.0 * s * (J * n + h)
+            M -= 2 * s
+            S[k] = -s
+        Energy[step] = E
+        Magn[step] = M
+    return E, M
+
+
+def metropolis_chunks(S, beta, nsteps, E, J=1.0, h=0.0, nbr=None, rng=None, profiler=None):
+    """
+    Generador que ejecuta nsteps pasos de Metropolis en bloques de CHUNK pasos.
+
+    Parámetros:
+    - S: estado int8 de tamaño N (se modifica en el sitio)
+    - beta: inverso de la temperatura
+    - nsteps: número de pasos de Monte Carlo
+    - E: energía del estado inicial
+    - J, h: acoplamiento y campo externo
+    - nbr: arreglo de vecinos (N, z) (por defecto la red cuadrada periódica)
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+    - profiler: instrumentation.Profiler opcional (fases "rng" y "update" e
+      inversiones aceptadas, contadas por bloque)
+
+    Produce, por cada bloque, los arrays de energía y magnetización tras cada paso.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    N = S.shape[0]
+    if nbr is None:
+        nbr = neighbor_array(int(round(np.sqrt(N))))
+    table = neighbor_acceptance_table(beta, nbr.shape[1], J, h)
+    M = int(np.sum(S, dtype=np.int64))
+
+    # Los números aleatorios se generan por bloques para no llamar al RNG en cada paso
+    for offset in range(0, nsteps, CHUNK):
+        size = min(CHUNK, nsteps - offset)
+        with phase(profiler, "rng"):
+            sites = rng.integers(0, N, size=size)
+            uniforms = rng.random(size)
+        Energy = np.empty(size)
+        Magn = np.empty(size, dtype=np.int64)
+        M_start = M
+        with phase(profiler, "update"):
+            E, M = metropolis_kernel(S, nbr, table, sites, uniforms, float(J), float(h),
+                                     E, M, Energy, Magn)
+        if profiler is not None:
+            # Cada inversión aceptada cambia M en ±2
+            profiler.count(size, int(np.count_nonzero(np.diff(Magn, prepend=M_start))))
+        yield Energy, Magn
+
+
+def metropolis_run(S, beta, nsteps, J=1.0, h=0.0, E=None, nbr=None, rng=None, profiler=None):
+    """
+    Ejecuta nsteps pasos de Metropolis de espín aleatorio con el núcleo compilado.
+
+    Parámetros:
+    - S: estado inicial (lista o array de tamaño N); se copia a int8
+    - beta: inverso de la temperatura
+    - nsteps: número de pasos de Monte Carlo
+    - J, h: acoplamiento y campo externo
+    - E: energía del estado inicial (se calcula si es None)
+    - nbr: arreglo de vecinos (N, z) (por defecto la red cuadrada periódica)
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+    - profiler: instrumentation.Profiler opcional (ver metropolis_chunks)
+
+    Devuelve:
+    - Energía tras cada paso (array de tamaño nsteps + 1)
+    - Magnetización tras cada paso (array de tamaño nsteps + 1)
+    - Estado final (int8 de tamaño N)
+    """
+    S = np.array(S, dtype=np.int8)
+    N = S.shape[0]
+    if nbr is None:
+        nbr = neighbor_array(int(round(np.sqrt(N))))
+    if E is None:
+        E = neighbor_energy(S, nbr, J, h)
+
+    Energy = [np.array([E])]
+    Magn = [np.array([np.sum(S, dtype=np.int64)])]
+    for E_chunk, M_chunk in metropolis_chunks(S, beta, nsteps, E, J, h, nbr, rng, profiler):
+        Energy.append(E_chunk)
+        Magn.append(M_chunk)
+
+    return np.concatenate(Energy), np.concatenate(Magn), S
@@ -0,0 +1,229 @@
+import numpy as np
+import functools
+
+from checkerboard import checkerboard_sweeps
+from instrumentation import phase
+from jit_kernel import neighbor_acceptance_table, neighbor_array, neighbor_energy
+
+# Redes generales para el modelo de Ising: cuadrada, cúbica (3D) y triangular,
+# con fronteras periódicas o abiertas.
+#
+# Cada red se describe con un arreglo de vecinos (N, z) con el mismo formato
+# que jit_kernel.neighbor_array: las primeras z // 2 columnas son los enlaces
+# hacia adelante y las siguientes los mismos desplazamientos en sentido
+# contrario; con fronteras abiertas un vecino inexistente vale -1. Así los
+# motores de Metropolis, de clúster y vectorizados funcionan sin cambios en
+# cualquier red.
+#
+# Para el motor vectorizado la red se divide en subredes (colores) cuyos sitios
+# no son vecinos entre sí: dos en las redes cuadrada y cúbica (tablero de
+# ajedrez) y tres en la triangular.
+
+# Desplazamientos hacia adelante de cada tipo de red, en coordenadas del array
+# (el último eje es el más rápido: derecha, abajo, ...)
+OFFSETS = {
+    "square": [(0, 1), (1, 0)],
+    "cubic": [(0, 0, 1), (0, 1, 0), (1, 0, 0)],
+    "triangular": [(0, 1), (1, 0), (1, 1)],
+}
+
+
+def _neighbors(shape, offsets, periodic):
+    """
+    Construye el arreglo de vecinos (N, 2 · len(offsets)) de una red con forma `shape`.
+    """
+    shape = np.array(shape)
+    coords = np.indices(shape).reshape(len(shape), -1).T
+    columns = []
+    for sign in (1, -1):
+        for offset in offsets:
+            c = coords + sign * np.array(offset)
+            if periodic:
+                valid = np.ones(len(c), dtype=bool)
+                c %= shape
+            else:
+                valid = np.all((c >= 0) & (c < shape), axis=1)
+                c = np.clip(c, 0, shape - 1)
+            columns.append(np.where(valid, np.ravel_multi_index(c.T, shape), -1))
+    return np.ascontiguousarray(np.stack(columns, axis=1).astype(np.int64))
+
+
+def _greedy_coloring(nbr):
+    """
+    Coloreado voraz: asigna a cada sitio el menor color que no usa ningún vecino.
+    """
+    N = nbr.shape[0]
+    color = np.full(N, -1, dtype=np.int64)
+    for i in range(N):
+        used = {color[j] for j in nbr[i] if j >= 0}
+        c = 0
+        while c in used:
+            c += 1
+        color[i] = c
+    return color
+
+
+def _coloring(nbr, guess):
+    """
+    Devuelve `guess` si es un coloreado válido (ningún sitio comparte color con
+    un vecino); si no, un coloreado voraz.
+    """
+    neighbor_color = np.where(nbr >= 0, guess[nbr], -1)
+    if np.any(neighbor_color == guess[:, None]):
+        return _greedy_coloring(nbr)
+    return guess
+
+
+class Lattice:
+    """
+    Red de espines: forma, arreglo de vecinos y subredes para el motor vectorizado.
+    """
+
+    KINDS = tuple(OFFSETS)  # Tipos de red disponibles
+
+    def __init__(self, kind, L, periodic=True):
+        """
+        Construye la red.
+
+        Parámetros:
+        - kind: tipo de red, uno de KINDS
+        - L: número de sitios por lado (N = L² o L³)
+        - periodic: True para fronteras periódicas, False para abiertas
+        """
+        if kind not in OFFSETS:
+            raise ValueError("Red desconocida '{}', opciones: {}".format(kind, self.KINDS))
+        self.kind = kind
+        self.L = L
+        self.periodic = periodic
+        self.dim = len(OFFSETS[kind][0])
+        self.shape = (L,) * self.dim
+        self.N = L ** self.dim
+
+        if kind == "square" and periodic:
+            nbr = neighbor_array(L)  # Compartido con IsingModel2D y checkpoint
+        else:
+            nbr = _neighbors(self.shape, OFFSETS[kind], periodic)
+            nbr.setflags(write=False)
+        self.nbr = nbr
+        self.z = nbr.shape[1]  # Número de coordinación
+
+        coords = np.indices(self.shape).reshape(self.dim, -1)
+        guess = coords.sum(axis=0) % (3 if kind == "triangular" else 2)
+        color = _coloring(nbr, guess)
+        self.colors = [np.flatnonzero(color == c) for c in range(int(color.max()) + 1)]
+        self.color_nbr = [nbr[sites] for sites in self.colors]
+
+    @property
+    def name(self):
+        """
+        Nombre de la red: el tipo, con el sufijo "-open" si las fronteras son abiertas.
+        """
+        return self.kind if self.periodic else self.kind + "-open"
+
+    @property
+    def is_square_periodic(self):
+        """
+        Indica si es la red cuadrada periódica de IsingModel2D (admite los
+        motores basados en np.roll: tablero de ajedrez, lotes y multiespín).
+        """
+        return self.kind == "square" and self.periodic
+
+    @property
+    def has_checkerboard(self):
+        """
+        Indica si la red admite el tablero de ajedrez de checkerboard.py
+        (cuadrada periódica con L par; con L impar las dos subredes no son
+        independientes y se usan los colores de la red).
+        """
+        return self.is_square_periodic and self.L % 2 == 0
+
+
+@functools.lru_cache(maxsize=None)
+def make_lattice(name, L):
+    """
+    Construye (y guarda en caché) una red a partir de su nombre.
+
+    Parámetros:
+    - name: tipo de red ("square", "cubic", "triangular"), con el sufijo
+      "-open" para fronteras abiertas (p. ej. "cubic-open")
+    - L: número de sitios por lado
+    """
+    kind, open_suffix, rest = name.partition("-open")
+    if rest:
+        raise ValueError("Nombre de red inválido '{}'".format(name))
+    return Lattice(kind, L, periodic=not open_suffix)
+
+
+def sublattice_sweeps(S, beta, nsweeps, lattice, J=1.0, h=0.0, rng=None, profiler=None):
+    """
+    Barridos vectorizados de Metropolis por subredes para una red cualquiera.
+
+    Generaliza checkerboard.checkerboard_sweeps: en cada barrido se actualizan,
+    una tras otra, todas las subredes de lattice.colors; los sitios de una
+    subred no son vecinos y se actualizan a la vez con NumPy.
+
+    Parámetros:
+    - S: estado de tamaño N; se copia a int8
+    - beta: inverso de la temperatura
+    - nsweeps: número de barridos
+    - lattice: red (Lattice)
+    - J, h: acoplamiento y campo externo
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+    - profiler: instrumentation.Profiler opcional (como en checkerboard_sweeps)
+
+    Devuelve:
+    - Energía tras cada barrido (array de tamaño nsweeps + 1)
+    - Magnetización tras cada barrido (array de tamaño nsweeps + 1)
+    - Estado final (int8 de tamaño N)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    N, z = lattice.N, lattice.z
+    padded = np.zeros(N + 1, dtype=np.int8)  # Sitio fantasma de espín 0 en el índice -1
+    padded[:N] = np.ravel(S)
+    table = neighbor_acceptance_table(beta, z, J, h)
+
+    E = neighbor_energy(padded[:N], lattice.nbr, J, h)
+    M = int(np.sum(padded, dtype=np.int64))
+    Energy = np.empty(nsweeps + 1)
+    Magn = np.empty(nsweeps + 1, dtype=np.int64)
+    Energy[0] = E
+    Magn[0] = M
+
+    for sweep in range(nsweeps):
+        with phase(profiler, "rng"):
+            u = rng.random(N)
+        with phase(profiler, "update"):
+            for sites, nbr in zip(lattice.colors, lattice.color_nbr):
+                s = padded[sites]
+                n = padded[nbr].sum(axis=1, dtype=np.int64)
+                flip = u[sites] < table[(s + 1) >> 1, n + z]
+
+                s_flip = s[flip].astype(np.int64)
+                E += float(np.sum(2.0 * s_flip * (J * n[flip] + h)))
+                M -= 2 * int(np.sum(s_flip))
+                padded[sites[flip]] = -s[flip]
+                if profiler is not None:
+                    profiler.count(sites.shape[0], s_flip.shape[0])
+
+        Energy[sweep + 1] = E
+        Magn[sweep + 1] = M
+
+    return Energy, Magn, padded[:N].copy()
+
+
+def vectorized_sweeps(S, beta, nsweeps, lattice, J=1.0, h=0.0, rng=None, profiler=None):
+    """
+    Barridos vectorizados de Metropolis con el motor más rápido que admite la
+    red: checkerboard_sweeps si lattice.has_checkerboard y sublattice_sweeps en
+    el resto de los casos.
+
+    Parámetros y valores devueltos como en sublattice_sweeps (el estado final es
+    siempre un array int8 de tamaño N).
+    """
+    if lattice.has_checkerboard:
+        Energy, Magn, S = checkerboard_sweeps(np.reshape(S, lattice.shape), beta, nsweeps,
+                                              J=J, h=h, rng=rng, profiler=profiler)
+        return Energy, Magn, S.ravel()
+    return sublattice_sweeps(S, beta, nsweeps, lattice, J=J, h=h, rng=rng, profiler=profiler)
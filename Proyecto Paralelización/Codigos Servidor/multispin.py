@@ -0,0 +1,185 @@
+import numpy as np
+
+from checkerboard import checkerboard_masks
+
+# Codificación multiespín: 64 réplicas independientes empaquetadas en bits.
+#
+# Cada sitio de la red se guarda como una palabra uint64 cuyo bit r es el espín
+# de la réplica r (1 = arriba, 0 = abajo). Una red de L x L ocupa así 8 L² bytes
+# para 64 réplicas (1 bit por espín), y cada operación bit a bit actualiza las
+# 64 réplicas a la vez. Las subredes del tablero de ajedrez se actualizan como
+# en checkerboard.py, contando los vecinos alineados con sumadores bit a bit.
+# Solo se admite h = 0 y J > 0: las tablas de aceptación suponen el caso
+# ferromagnético (con J < 0 el signo de delta_E se invierte y habría que
+# aceptar siempre k >= 2 en lugar de k <= 2).
+
+REPLICAS = 64  # Réplicas por palabra uint64
+ALL_UP = np.uint64(0xFFFFFFFFFFFFFFFF)
+ACCEPT_BITS = 32  # Dígitos binarios de las probabilidades de aceptación
+
+
+def pack_state(S, L):
+    """
+    Empaqueta un estado de espines ±1 repitiéndolo en las 64 réplicas.
+
+    Parámetros:
+    - S: estado (lista o array de tamaño N o de forma (L, L))
+    - L: tamaño del lado de la red
+
+    Devuelve un array uint64 de forma (L, L).
+    """
+    S = np.reshape(np.asarray(S), (L, L))
+    return np.where(S > 0, ALL_UP, np.uint64(0))
+
+
+def unpack_replica(W, r):
+    """
+    Extrae la réplica r de una red empaquetada como array int8 (L, L) de ±1.
+    """
+    bit = (W >> np.uint64(r)) & np.uint64(1)
+    return (2 * bit.astype(np.int8) - 1).astype(np.int8)
+
+
+def _bit_counts(W):
+    """
+    Cuenta, para cada réplica, cuántos sitios tienen el bit encendido.
+
+    Devuelve un array int64 de tamaño 64.
+    """
+    counts = np.zeros(REPLICAS, dtype=np.int64)
+    # Se procesa por filas para no desempaquetar toda la red de una vez
+    for row in W.reshape(W.shape[0], -1):
+        bits = np.unpackbits(row.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        counts += bits.sum(axis=0, dtype=np.int64)
+    return counts
+
+
+def replica_observables(W, J=1.0):
+    """
+    Energía y magnetización de cada una de las 64 réplicas.
+
+    Devuelve dos arrays de tamaño 64: energía (float) y magnetización (int).
+    """
+    N = W.size
+    M = 2 * _bit_counts(W) - N
+    # Enlaces derecha y abajo: alineados - antialineados = 2 · alineados - 2N
+    aligned = (_bit_counts(~(W ^ np.roll(W, -1, axis=0)))
+               + _bit_counts(~(W ^ np.roll(W, -1, axis=1))))
+    E = -J * (2.0 * aligned - 2 * N)
+    return E, M
+
+
+def _binary_digits(p):
+    """
+    Dígitos d1, d2, ..., dK (K = ACCEPT_BITS) de la expansión binaria
+    p = 0.d1 d2 ... dK, truncada (p >= 1 se toma como 1 - 2^-K).
+    """
+    q = min(int(p * 2 ** ACCEPT_BITS), 2 ** ACCEPT_BITS - 1)
+    return [(q >> (ACCEPT_BITS - j)) & 1 for j in range(1, ACCEPT_BITS + 1)]
+
+
+def _random_mask(rng, k3, k4, digits3, digits4):
+    """
+    Palabras uint64 cuyos bits se encienden de forma independiente con
+    probabilidad p3 donde k3 tiene el bit encendido, p4 donde lo tiene k4 y
+    nunca en el resto.
+
+    Cada bit compara un número uniforme U = 0.r1 r2 ... con la expansión
+    binaria p = 0.d1 d2 ... dK sin generar un número por réplica: en la
+    posición j se toma una palabra de bits aleatorios r_j para todas las
+    réplicas a la vez; los bits con r_j != d_j quedan decididos (U < p si
+    d_j = 1) y el resto pasa a la posición siguiente. Como la mitad de los
+    bits se decide en cada posición, basta con unas log2(bits) palabras
+    aleatorias por sitio en lugar de 64 números; si U y p coinciden en los K
+    dígitos, U >= p y no se acepta.
+
+    Parámetros:
+    - rng: numpy.random.Generator
+    - k3, k4: réplicas con k = 3 y k = 4 vecinos alineados (uint64, bits disjuntos)
+    - digits3, digits4: dígitos de p3 y p4 (_binary_digits)
+    """
+    accept = np.zeros_like(k3)
+    undecided = k3 | k4
+    for d3, d4 in zip(digits3, digits4):
+        if not undecided.any():
+            break
+        r = rng.integers(0, ALL_UP, k3.shape, dtype=np.uint64, endpoint=True)
+        ones = (k3 if d3 else np.uint64(0)) | (k4 if d4 else np.uint64(0))
+        accept |= undecided & ones & ~r
+        undecided &= ~(r ^ ones)
+    return accept
+
+
+def multispin_sweep(W, masks, digits3, digits4, rng):
+    """
+    Un barrido de Metropolis sobre las 64 réplicas empaquetadas (h = 0).
+
+    Con k vecinos alineados, delta_E = 4 J (k - 2): se acepta siempre si k <= 2,
+    con probabilidad p3 = exp(-4 beta J) si k = 3 y p4 = exp(-8 beta J) si k = 4.
+    Solo se generan números aleatorios en los sitios con alguna réplica en k = 3 o 4.
+
+    Parámetros:
+    - W: red empaquetada uint64 (L, L) (se modifica en el sitio)
+    - masks: máscaras de las subredes (checkerboard_masks)
+    - digits3, digits4: dígitos binarios de p3 y p4 (_binary_digits)
+    - rng: numpy.random.Generator
+    """
+    for mask in masks:
+        a0 = ~(W ^ np.roll(W, 1, axis=0))[mask]
+        a1 = ~(W ^ np.roll(W, -1, axis=0))[mask]
+        a2 = ~(W ^ np.roll(W, 1, axis=1))[mask]
+        a3 = ~(W ^ np.roll(W, -1, axis=1))[mask]
+
+        # Sumador bit a bit: k = b0 + 2 b1 + 4 b2 vecinos alineados
+        s1, c1 = a0 ^ a1, a0 & a1
+        s2, c2 = a2 ^ a3, a2 & a3
+        b0 = s1 ^ s2
+        carry = s1 & s2
+        b1 = c1 ^ c2 ^ carry
+        b2 = (c1 & c2) | (carry & (c1 ^ c2))
+
+        k3 = b0 & b1 & ~b2
+        flip = ~b2 & ~k3
+        sites = np.flatnonzero(k3 | b2)
+        if sites.size:
+            flip[sites] |= _random_mask(rng, k3[sites], b2[sites], digits3, digits4)
+        W[mask] ^= flip
+
+
+def multispin_run(S, beta, nsweeps, J=1.0, measure_every=1, rng=None):
+    """
+    Ejecuta nsweeps barridos de 64 réplicas independientes empaquetadas en bits.
+
+    Parámetros:
+    - S: estado inicial común a todas las réplicas (tamaño N o forma (L, L))
+    - beta: inverso de la temperatura
+    - nsweeps: número de barridos
+    - J: constante de acoplamiento
+    - measure_every: se miden E y M cada `measure_every` barridos
+    - rng: numpy.random.Generator (por defecto uno nuevo sin semilla)
+
+    Devuelve:
+    - Energías medidas, array (n_medidas, 64)
+    - Magnetizaciones medidas, array (n_medidas, 64)
+    - Red empaquetada final uint64 (L, L)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    L = int(round(np.sqrt(np.size(S))))
+    W = pack_state(S, L)
+    masks = checkerboard_masks(L)
+    digits3 = _binary_digits(np.exp(-4.0 * beta * J))
+    digits4 = _binary_digits(np.exp(-8.0 * beta * J))
+
+    E0, M0 = replica_observables(W, J)
+    Energy = [E0]
+    Magn = [M0]
+    for sweep in range(1, nsweeps + 1):
+        multispin_sweep(W, masks, digits3, digits4, rng)
+        if sweep % measure_every == 0:
+            E, M = replica_observables(W, J)
+            Energy.append(E)
+            Magn.append(M)
+
+    return np.array(Energy), np.array(Magn), W
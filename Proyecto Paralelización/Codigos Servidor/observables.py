@@ -0,0 +1,551 @@
+import numpy as np
+
+
+class ObservableAccumulator:
+    """
+    Acumulador en flujo de los observables de una cadena de Monte Carlo.
+
+    Guarda solo sumas parciales de E, E², M, |M|, M² y M⁴, de modo que la
+    memoria es O(1) sin importar el número de pasos simulados.
+    """
+
+    def __init__(self, thermalization=0, stride=1):
+        """
+        Inicializa el acumulador.
+
+        Parámetros:
+        - thermalization: número de valores iniciales que se descartan
+        - stride: tras la termalización se acumula uno de cada `stride` valores
+        """
+        self.thermalization = thermalization
+        self.stride = stride
+        self.seen = 0    # Valores recibidos (incluye los descartados)
+        self.count = 0   # Valores acumulados
+        self.skipped = 0  # Próximos valores a descartar (ver skip)
+        self.sum_E = 0.0
+        self.sum_E2 = 0.0
+        self.sum_M = 0.0
+        self.sum_absM = 0.0
+        self.sum_M2 = 0.0
+        self.sum_M4 = 0.0
+
+    def skip(self, n=1):
+        """
+        Descarta los próximos n valores recibidos.
+
+        Sirve para continuar una cadena por partes: el valor inicial de cada
+        parte es el estado final de la anterior y ya fue acumulado.
+        """
+        self.skipped += n
+
+    def add(self, E, M):
+        """
+        Agrega un valor de energía y magnetización.
+        """
+        if self.skipped:
+            self.skipped -= 1
+            return
+        i = self.seen - self.thermalization
+        self.seen += 1
+        if i < 0 or i % self.stride:
+            return
+        M2 = M * M
+        self.count += 1
+        self.sum_E += E
+        self.sum_E2 += E * E
+        self.sum_M += M
+        self.sum_absM += abs(M)
+        self.sum_M2 += M2
+        self.sum_M4 += M2 * M2
+
+    def add_series(self, E, M):
+        """
+        Agrega un bloque de valores consecutivos de energía y magnetización.
+
+        Parámetros:
+        - E, M: arrays 1D de la misma longitud (las series de varias réplicas
+          se agregan con add_replicas)
+        """
+        E = np.asarray(E, dtype=np.float64)
+        M = np.asarray(M, dtype=np.float64)
+        if E.ndim != 1 or E.shape != M.shape:
+            raise ValueError("add_series requiere series 1D de la misma longitud (formas {} y {})".format(
+                E.shape, M.shape))
+        if self.skipped:
+            n = min(self.skipped, E.shape[0])
+            self.skipped -= n
+            E = E[n:]
+            M = M[n:]
+        idx = self.seen + np.arange(E.shape[0]) - self.thermalization
+        self.seen += E.shape[0]
+        keep = (idx >= 0) & (idx % self.stride == 0)
+        self._accumulate(E[keep], M[keep])
+
+    def _empty(self):
+        """
+        Acumulador vacío con los mismos parámetros (para combinar réplicas con merge).
+        """
+        return type(self)(self.thermalization, self.stride)
+
+    def add_replicas(self, E, M):
+        """
+        Agrega las series de varias cadenas independientes a la misma
+        temperatura: cada columna es una réplica, con su propia termalización
+        y stride, y se combina con merge.
+
+        Parámetros:
+        - E, M: arrays (valores, réplicas)
+        """
+        E = np.asarray(E)
+        M = np.asarray(M)
+        if E.ndim != 2 or E.shape != M.shape:
+            raise ValueError("add_replicas requiere series 2D de la misma forma (formas {} y {})".format(
+                E.shape, M.shape))
+        for r in range(E.shape[1]):
+            replica = self._empty()
+            replica.add_series(E[:, r], M[:, r])
+            self.merge(replica)
+
+    def _accumulate(self, E, M):
+        """
+        Suma a los acumuladores los valores ya filtrados por termalización y stride.
+        """
+        M2 = M * M
+        self.count += E.shape[0]
+        self.sum_E += float(np.sum(E))
+        self.sum_E2 += float(np.sum(E * E))
+        self.sum_M += float(np.sum(M))
+        self.sum_absM += float(np.sum(np.abs(M)))
+        self.sum_M2 += float(np.sum(M2))
+        self.sum_M4 += float(np.sum(M2 * M2))
+
+    def merge(self, other):
+        """
+        Combina otro acumulador (p. ej. de otra cadena a la misma temperatura).
+        """
+        self.seen += other.seen
+        self.count += other.count
+        self.sum_E += other.sum_E
+        self.sum_E2 += other.sum_E2
+        self.sum_M += other.sum_M
+        self.sum_absM += other.sum_absM
+        self.sum_M2 += other.sum_M2
+        self.sum_M4 += other.sum_M4
+        return self
+
+    def mean_energy(self):
+        """
+        Energía promedio <E>.
+        """
+        return self.sum_E / self.count
+
+    def mean_energy2(self):
+        """
+        Promedio del cuadrado de la energía <E²>.
+        """
+        return self.sum_E2 / self.count
+
+    def mean_magnetization(self):
+        """
+        Magnetización promedio <M>.
+        """
+        return self.sum_M / self.count
+
+    def mean_abs_magnetization(self):
+        """
+        Valor absoluto promedio de la magnetización <|M|>.
+        """
+        return self.sum_absM / self.count
+
+    def mean_magnetization2(self):
+        """
+        Promedio del cuadrado de la magnetización <M²>.
+        """
+        return self.sum_M2 / self.count
+
+    def heat_capacity(self, T, K_B=1.0):
+        """
+        Capacidad calorífica C_V = (<E²> - <E>²) / (K_B T²).
+        """
+        return (self.mean_energy2() - self.mean_energy() ** 2) / (T ** 2 * K_B)
+
+    def magnetic_susceptibility(self, T, K_B=1.0):
+        """
+        Susceptibilidad magnética chi = (<M²> - <M>²) / (K_B T).
+        """
+        return (self.mean_magnetization2() - self.mean_magnetization() ** 2) / (T * K_B)
+
+    def binder_cumulant(self):
+        """
+        Cumulante de Binder U_L = 1 - <M⁴> / (3 <M²>²).
+        """
+        M2 = self.mean_magnetization2()
+        return 1.0 - (self.sum_M4 / self.count) / (3.0 * M2 * M2)
+
+    def as_dict(self):
+        """
+        Devuelve el estado del acumulador como un diccionario (fácil de serializar).
+        """
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye un acumulador a partir de as_dict().
+        """
+        acc = cls(data["thermalization"], data["stride"])
+        acc.__dict__.update(data)
+        return acc
+
+
+def is_equilibrated(block_means, window=5, n_sigma=2.0):
+    """
+    Prueba de deriva para detectar la termalización.
+
+    Compara el promedio de los últimos `window` bloques con el de los `window`
+    anteriores: la cadena se considera termalizada si la diferencia es menor
+    que n_sigma veces su error estándar combinado.
+
+    Parámetros:
+    - block_means: promedios por bloque de un observable (p. ej. la energía)
+    - window: número de bloques de cada ventana
+    - n_sigma: tolerancia en desviaciones estándar
+
+    Devuelve True si no se detecta deriva.
+    """
+    if len(block_means) < 2 * window:
+        return False
+    previous = np.asarray(block_means[-2 * window:-window], dtype=np.float64)
+    last = np.asarray(block_means[-window:], dtype=np.float64)
+    error = np.sqrt((np.var(previous, ddof=1) + np.var(last, ddof=1)) / window)
+    return abs(np.mean(last) - np.mean(previous)) <= n_sigma * error
+
+
+class BlockingAccumulator(ObservableAccumulator):
+    """
+    ObservableAccumulator que además guarda promedios por bloques para estimar
+    errores estadísticos y tiempos de autocorrelación (análisis de bloques).
+
+    Cuando hay 2 * max_blocks bloques, se promedian por pares y el tamaño del
+    bloque se duplica, de modo que la memoria sigue siendo O(max_blocks).
+    """
+
+    BUFFER = 4096  # Valores individuales (add) que se agrupan antes de pasarlos a los bloques
+
+    def __init__(self, thermalization=0, stride=1, block_size=1, max_blocks=128):
+        """
+        Inicializa el acumulador.
+
+        Parámetros:
+        - thermalization, stride: como en ObservableAccumulator
+        - block_size: valores por bloque al inicio
+        - max_blocks: número de bloques que se conservan tras cada fusión
+        """
+        super().__init__(thermalization, stride)
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.blocks = []  # Promedios por bloque de (E, E², M, |M|, M²)
+        self.partial = np.zeros(5)
+        self.partial_count = 0
+        self._pending = []  # Valores de add aún no pasados a los bloques
+
+    def _empty(self):
+        return type(self)(self.thermalization, self.stride, self.block_size, self.max_blocks)
+
+    def add(self, E, M):
+        count = self.count
+        super().add(E, M)
+        if self.count > count:
+            self._pending.append((E, M))
+            if len(self._pending) >= self.BUFFER:
+                self._flush()
+
+    def _flush(self):
+        """
+        Pasa a los bloques los valores agregados uno a uno con add.
+        """
+        if self._pending:
+            values = np.array(self._pending, dtype=np.float64)
+            self._pending = []
+            self._add_blocks(values[:, 0], values[:, 1])
+
+    def _accumulate(self, E, M):
+        super()._accumulate(E, M)
+        self._flush()  # Conserva el orden de llegada
+        self._add_blocks(E, M)
+
+    def _add_blocks(self, E, M):
+        """
+        Agrega valores ya filtrados a los promedios por bloque.
+        """
+        values = np.stack([E, E * E, M, np.abs(M), M * M], axis=1)
+        while values.shape[0]:
+            take = min(self.block_size - self.partial_count, values.shape[0])
+            self.partial += values[:take].sum(axis=0)
+            self.partial_count += take
+            values = values[take:]
+            if self.partial_count == self.block_size:
+                self.blocks.append(self.partial / self.block_size)
+                self.partial = np.zeros(5)
+                self.partial_count = 0
+                if len(self.blocks) == 2 * self.max_blocks:
+                    self._merge_blocks()
+
+    def _merge_blocks(self):
+        """
+        Promedia los bloques por pares y duplica el tamaño del bloque. Si el
+        número de bloques es impar, el último pasa al bloque incompleto.
+        """
+        if len(self.blocks) % 2:
+            self.partial += self.blocks.pop() * self.block_size
+            self.partial_count += self.block_size
+        blocks = np.array(self.blocks).reshape(-1, 5)
+        self.blocks = list(0.5 * (blocks[0::2] + blocks[1::2]))
+        self.block_size *= 2
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otra cadena independiente a la misma
+        temperatura: suma los totales y junta los bloques de ambas, llevados
+        al mayor de los dos tamaños de bloque. Los valores del bloque
+        incompleto de `other` solo cuentan en los totales.
+        """
+        if other.stride != self.stride:
+            raise ValueError("Los acumuladores tienen distinto stride ({} y {})".format(
+                self.stride, other.stride))
+        super().merge(other)
+        self._flush()
+        other._flush()
+        while self.block_size < other.block_size:
+            self._merge_blocks()
+
+        blocks, size = [np.array(b) for b in other.blocks], other.block_size
+        while size < self.block_size:
+            if len(blocks) % 2:
+                blocks.pop()
+            blocks = [0.5 * (a + b) for a, b in zip(blocks[0::2], blocks[1::2])]
+            size *= 2
+        self.blocks += blocks
+        while len(self.blocks) >= 2 * self.max_blocks:
+            self._merge_blocks()
+        return self
+
+    @property
+    def n_blocks(self):
+        """
+        Número de bloques completos.
+        """
+        self._flush()
+        return len(self.blocks)
+
+    def _jackknife(self, estimator):
+        """
+        Error jackknife de una función de los promedios por bloque.
+        """
+        self._flush()
+        blocks = np.array(self.blocks)
+        n = blocks.shape[0]
+        total = blocks.sum(axis=0)
+        estimates = np.array([estimator((total - b) / (n - 1)) for b in blocks])
+        return np.sqrt((n - 1) / n * np.sum((estimates - estimates.mean()) ** 2))
+
+    def autocorrelation_time(self, column=0):
+        """
+        Tiempo de autocorrelación integrado estimado a partir de los bloques:
+        tau = b · var(promedios de bloque) / (2 var(valores)).
+
+        Parámetros:
+        - column: 0 para E, 2 para M, 3 para |M|
+
+        Devuelve tau en unidades de valores acumulados (mínimo 0.5).
+        """
+        self._flush()
+        moments = {0: (self.sum_E, self.sum_E2), 2: (self.sum_M, self.sum_M2),
+                   3: (self.sum_absM, self.sum_M2)}
+        first, second = moments[column]
+        var = second / self.count - (first / self.count) ** 2
+        if var <= 0 or self.n_blocks < 2:
+            return 0.5
+        var_blocks = np.var(np.array(self.blocks)[:, column], ddof=1)
+        return max(0.5, 0.5 * self.block_size * var_blocks / var)
+
+    def statistics(self, T, K_B=1.0):
+        """
+        Promedios, errores y tiempos de autocorrelación de la cadena.
+
+        Devuelve un diccionario con <E>, C_V, chi y <|M|> con sus errores
+        (jackknife sobre bloques), tau_E, tau_M y el tamaño efectivo de la
+        muestra n_eff = n / (2 tau).
+        """
+        cv = lambda m: (m[1] - m[0] ** 2) / (T ** 2 * K_B)
+        chi = lambda m: (m[4] - m[2] ** 2) / (T * K_B)
+        tau_E = self.autocorrelation_time(0)
+        tau_M = self.autocorrelation_time(3)
+        enough = self.n_blocks >= 2
+        return {
+            "mean_energy": self.mean_energy(),
+            "error_energy": self._jackknife(lambda m: m[0]) if enough else np.inf,
+            "heat_capacity": self.heat_capacity(T, K_B),
+            "error_heat_capacity": self._jackknife(cv) if enough else np.inf,
+            "magnetic_susceptibility": self.magnetic_susceptibility(T, K_B),
+            "error_magnetic_susceptibility": self._jackknife(chi) if enough else np.inf,
+            "mean_abs_magnetization": self.mean_abs_magnetization(),
+            "error_abs_magnetization": self._jackknife(lambda m: m[3]) if enough else np.inf,
+            "tau_E": tau_E,
+            "tau_M": tau_M,
+            "n_eff": self.count / (2.0 * max(tau_E, tau_M)),
+            "n_blocks": self.n_blocks,
+        }
+
+    def relative_errors(self, T, floor=0.0):
+        """
+        Errores relativos de <E>, C_V y chi.
+
+        Parámetros:
+        - T: temperatura
+        - floor: mínimo del denominador |valor|, para que un observable casi
+          nulo (p. ej. C_V a temperatura muy baja) no dé un error relativo
+          enorme con un error absoluto pequeño
+
+        Un observable nulo sin error (y floor = 0) tiene error relativo 0.
+        """
+        stats = self.statistics(T)
+
+        def rel(value, error):
+            scale = max(abs(value), floor)
+            if scale == 0:
+                return 0.0 if error == 0 else np.inf
+            return abs(error) / scale
+
+        return {
+            "energy": rel(stats["mean_energy"], stats["error_energy"]),
+            "heat_capacity": rel(stats["heat_capacity"], stats["error_heat_capacity"]),
+            "magnetic_susceptibility": rel(stats["magnetic_susceptibility"],
+                                           stats["error_magnetic_susceptibility"]),
+        }
+
+    def as_dict(self):
+        self._flush()
+        data = super().as_dict()
+        data["blocks"] = [list(map(float, b)) for b in self.blocks]
+        data["partial"] = list(map(float, self.partial))
+        del data["_pending"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = super().from_dict(data)
+        acc.blocks = [np.array(b) for b in data["blocks"]]
+        acc.partial = np.array(data["partial"])
+        acc._pending = []
+        return acc
+
+
+class HistogramAccumulator(ObservableAccumulator):
+    """
+    ObservableAccumulator que además guarda el histograma de energía de la
+    cadena y, para cada energía, las sumas de M, |M|, M² y M⁴, de modo que los
+    observables pueden reponderarse a otras temperaturas (ver reweighting).
+
+    Las energías se agrupan redondeándolas a múltiplos de bin_width; con el
+    valor por defecto cada nivel de energía discreto es su propio bin y solo
+    se juntan los valores que difieren por errores de redondeo.
+    """
+
+    BUFFER = 4096  # Valores individuales (add) que se agrupan antes de sumarlos al histograma
+
+    def __init__(self, thermalization=0, stride=1, bin_width=1e-6):
+        """
+        Inicializa el acumulador.
+
+        Parámetros:
+        - thermalization, stride: como en ObservableAccumulator
+        - bin_width: ancho de los bins de energía
+        """
+        super().__init__(thermalization, stride)
+        self.bin_width = bin_width
+        self.bins = np.empty(0, dtype=np.int64)  # round(E / bin_width) de cada bin, ordenados
+        self.moments = np.empty((0, 5))          # Por bin: cuentas, ΣM, Σ|M|, ΣM², ΣM⁴
+        self._pending = []                       # Valores de add aún no sumados al histograma
+
+    def _empty(self):
+        return type(self)(self.thermalization, self.stride, self.bin_width)
+
+    def add(self, E, M):
+        count = self.count
+        super().add(E, M)
+        if self.count > count:
+            self._pending.append((E, M))
+            if len(self._pending) >= self.BUFFER:
+                self._flush()
+
+    def _flush(self):
+        """
+        Suma al histograma los valores agregados uno a uno con add.
+        """
+        if self._pending:
+            values = np.array(self._pending, dtype=np.float64)
+            self._pending = []
+            self._add_bins(values[:, 0], values[:, 1])
+
+    def _accumulate(self, E, M):
+        super()._accumulate(E, M)
+        self._flush()  # Conserva el orden de llegada
+        self._add_bins(E, M)
+
+    def _add_bins(self, E, M):
+        """
+        Suma los valores (E, M) al histograma.
+        """
+        M2 = M * M
+        values = np.stack([np.ones_like(M), M, np.abs(M), M2, M2 * M2], axis=1)
+        self._merge_bins(np.round(E / self.bin_width).astype(np.int64), values)
+
+    def _merge_bins(self, bins, values):
+        """
+        Combina bins (índices y sumas por bin) con los del histograma.
+        """
+        bins = np.concatenate([self.bins, bins])
+        values = np.concatenate([self.moments, values])
+        self.bins, inverse = np.unique(bins, return_inverse=True)
+        self.moments = np.stack([np.bincount(inverse, weights=values[:, c],
+                                             minlength=self.bins.shape[0])
+                                 for c in range(values.shape[1])], axis=1)
+
+    def histogram(self):
+        """
+        Histograma de energía de la cadena.
+
+        Devuelve:
+        - Energías de los bins (array ordenado)
+        - Número de valores en cada bin
+        - Sumas por bin de M, |M|, M² y M⁴, array (bins, 4)
+        """
+        self._flush()
+        return self.bins * self.bin_width, self.moments[:, 0], self.moments[:, 1:]
+
+    def merge(self, other):
+        if other.bin_width != self.bin_width:
+            raise ValueError("Los histogramas tienen distinto ancho de bin ({} y {})".format(
+                self.bin_width, other.bin_width))
+        super().merge(other)
+        self._flush()
+        other._flush()
+        self._merge_bins(other.bins, other.moments)
+        return self
+
+    def as_dict(self):
+        self._flush()
+        data = super().as_dict()
+        data["bins"] = [int(b) for b in self.bins]
+        data["moments"] = [list(map(float, m)) for m in self.moments]
+        del data["_pending"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = super().from_dict(data)
+        acc.bins = np.array(data["bins"], dtype=np.int64)
+        acc.moments = np.array(data["moments"], dtype=np.float64).reshape(-1, 5)
+        acc._pending = []
+        return acc
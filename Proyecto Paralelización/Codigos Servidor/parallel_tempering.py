@@ -0,0 +1,121 @@
+from checkerboard import batched_checkerboard_sweeps
+from observables import ObservableAccumulator
+import numpy as np
+import time
+
+# Intercambio de réplicas (parallel tempering) sobre una malla de temperaturas.
+#
+# Cada temperatura tiene una réplica del sistema que evoluciona con Metropolis.
+# Periódicamente se proponen intercambios de configuraciones entre temperaturas
+# vecinas con probabilidad min(1, exp((beta_i - beta_j) (E_i - E_j))), de modo que
+# las configuraciones de alta temperatura (que se decorrelacionan rápido)
+# alimentan a las de baja temperatura y cerca de T_c.
+#
+# Con el motor "checkerboard" en la red cuadrada periódica (L par) todas las réplicas
+# se guardan en un único array (R, L, L) y avanzan juntas con
+# batched_checkerboard_sweeps; en el resto de los casos cada réplica avanza con
+# el motor del modelo (IsingModel._run).
+
+
+class ParallelTempering:
+    """
+    Simulación por intercambio de réplicas construida sobre IsingModel (o IsingModel2D).
+    """
+
+    ENGINES = ("checkerboard", "jit")  # Motores usados para avanzar cada réplica
+
+    def __init__(self, model, temperatures, S_ini=None, engine="checkerboard"):
+        """
+        Inicializa las réplicas.
+
+        Parámetros:
+        - model: instancia de IsingModel o IsingModel2D (define la red, J, h y
+          el generador de números aleatorios, model.rng)
+        - temperatures: arreglo de temperaturas (se ordena de menor a mayor)
+        - S_ini: estado inicial común (por defecto model.ordered_state())
+        - engine: motor para avanzar las réplicas, uno de ENGINES
+        """
+        if engine not in self.ENGINES:
+            raise ValueError("Motor desconocido '{}', opciones: {}".format(engine, self.ENGINES))
+        if S_ini is None:
+            S_ini = model.ordered_state()
+
+        self.model = model
+        self.engine = engine
+        self.rng = model.rng
+        self.temperatures = np.sort(np.atleast_1d(np.asarray(temperatures, dtype=float)))
+        self.beta = 1.0 / self.temperatures
+
+        # Un estado por temperatura: states[i] está siempre a la temperatura i
+        self.states = np.tile(np.ravel(S_ini).astype(np.int8), (len(self.temperatures), 1))
+        E0 = model.energy(S_ini)
+        self.energies = np.full(len(self.temperatures), E0)
+        self.swap_attempts = np.zeros(len(self.temperatures) - 1, dtype=np.int64)
+        self.swap_accepted = np.zeros(len(self.temperatures) - 1, dtype=np.int64)
+
+    def _advance(self, nsweeps, accs):
+        """
+        Avanza todas las réplicas nsweeps barridos y acumula sus observables
+        (una medida por barrido).
+        """
+        model = self.model
+        if self.engine == "checkerboard" and model.lattice.has_checkerboard:
+            R = len(self.temperatures)
+            Energy, Magn, S = batched_checkerboard_sweeps(self.states.reshape(R, model.L, model.L),
+                                                          self.beta, nsweeps, J=model.J, h=model.h,
+                                                          rng=self.rng)
+            self.states = S.reshape(R, model.N)
+            for i, acc in enumerate(accs):
+                acc.add_series(Energy[1:, i], Magn[1:, i])
+            self.energies = Energy[-1].copy()
+            return
+
+        # "checkerboard" devuelve una medida por barrido y "jit" una por paso
+        every = 1 if self.engine == "checkerboard" else model.N
+        for i, acc in enumerate(accs):
+            Energy, Magn, S = model._run(self.engine, self.states[i], self.beta[i], nsweeps * model.N)
+            acc.add_series(np.asarray(Energy)[every::every], np.asarray(Magn)[every::every])
+            self.states[i] = S
+            self.energies[i] = Energy[-1]
+
+    def _exchange(self, parity):
+        """
+        Propone intercambios entre los pares de temperaturas (i, i + 1) con i de la paridad dada.
+        """
+        for i in range(parity, len(self.temperatures) - 1, 2):
+            self.swap_attempts[i] += 1
+            delta = (self.beta[i] - self.beta[i + 1]) * (self.energies[i] - self.energies[i + 1])
+            if delta >= 0 or self.rng.random() < np.exp(delta):
+                self.swap_accepted[i] += 1
+                self.states[[i, i + 1]] = self.states[[i + 1, i]]
+                self.energies[i], self.energies[i + 1] = self.energies[i + 1], self.energies[i]
+
+    def run(self, n_exchanges, sweeps_per_exchange=1, thermalization=0):
+        """
+        Ejecuta la simulación por intercambio de réplicas.
+
+        Parámetros:
+        - n_exchanges: número de rondas de intercambio
+        - sweeps_per_exchange: barridos de Metropolis de cada réplica entre intercambios
+        - thermalization: barridos iniciales descartados en los observables
+
+        Devuelve:
+        - Lista de ObservableAccumulator, uno por temperatura (muestreados por barrido)
+        - Tasa de aceptación de intercambios entre temperaturas vecinas
+        - Tiempo total de simulación
+        """
+        accs = [ObservableAccumulator(thermalization) for _ in self.temperatures]
+
+        start = time.perf_counter()
+        for round_ in range(n_exchanges):
+            self._advance(sweeps_per_exchange, accs)
+            self._exchange(round_ % 2)  # Alterna pares pares e impares
+        end = time.perf_counter()
+
+        return [accs, self.acceptance_rates(), end - start]
+
+    def acceptance_rates(self):
+        """
+        Fracción de intercambios aceptados entre cada par de temperaturas vecinas.
+        """
+        return self.swap_accepted / np.maximum(self.swap_attempts, 1)
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Flujos de números aleatorios reproducibles e independientes entre procesos.
+#
+# Cada tarea (L, T, réplica) recibe su propio numpy.random.SeedSequence,
+# derivado de una semilla raíz como lo hace SeedSequence.spawn (la hija i tiene
+# spawn_key = clave de la raíz + (i,)). Los flujos hijos son estadísticamente
+# independientes y no dependen del estado heredado por fork, así que un barrido
+# con la misma semilla raíz da siempre los mismos números, sin importar cuántos
+# procesos se usen ni en qué orden terminen las tareas.
+#
+# Las hijas se construyen directamente en lugar de llamar a root.spawn(n), que
+# avanza un contador interno de la raíz: así la hija i es la misma en cada
+# llamada y basta guardar la entropía de la raíz para reproducir cualquier barrido.
+
+
+def make_rng(seed=None):
+    """
+    Crea un numpy.random.Generator.
+
+    Parámetros:
+    - seed: None, entero, SeedSequence o un Generator (que se devuelve tal cual)
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def spawn_seeds(seed, n, prefix=()):
+    """
+    Deriva n semillas independientes de una semilla raíz, sin modificarla: la
+    misma raíz da siempre las mismas hijas.
+
+    Parámetros:
+    - seed: None, entero o SeedSequence raíz (None genera entropía nueva)
+    - n: número de flujos hijos
+    - prefix: enteros que se anteponen al índice de cada hija, para separar
+      flujos de distintos usos de la misma raíz
+
+    Devuelve la SeedSequence raíz y la lista de sus n hijas.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    key = tuple(root.spawn_key) + tuple(prefix)
+    return root, [np.random.SeedSequence(root.entropy, spawn_key=key + (i,)) for i in range(n)]
+
+
+def keyed_seed(seed, values):
+    """
+    Deriva de la semilla raíz una semilla identificada por valores en lugar de
+    por posición: la clave de la hija se forma con los bits de cada valor, así
+    que la misma tarea recibe el mismo flujo sin importar en qué orden se cree.
+
+    Parámetros:
+    - seed: SeedSequence raíz
+    - values: números que identifican la tarea (p. ej. (L, T, h))
+    """
+    key = tuple(int(np.float64(v).view(np.uint64)) for v in values)
+    return np.random.SeedSequence(seed.entropy, spawn_key=tuple(seed.spawn_key) + key)
+
+
+def seed_record(seq):
+    """
+    Representación serializable (JSON) de una SeedSequence.
+    """
+    return {"entropy": seq.entropy, "spawn_key": list(seq.spawn_key)}
+
+
+def seed_from_record(record):
+    """
+    Reconstruye una SeedSequence a partir de seed_record().
+    """
+    return np.random.SeedSequence(record["entropy"], spawn_key=tuple(record["spawn_key"]))
@@ -0,0 +1,248 @@
+from observables import ObservableAccumulator
+import numpy as np
+import json
+import os
+
+# Almacén columnar de resultados de barridos (L, T).
+#
+# Cada fila es una tarea identificada por la clave (L, T, h, seed, engine,
+# lattice), que no se repite, y guarda los valores sin normalizar: promedios,
+# varianzas, errores y tiempos. Cada columna es un archivo binario con un tipo
+# fijo (como las series de sweep_runner) y schema.json describe las columnas, de
+# modo que:
+#     - las filas se agregan al final de cada archivo a medida que terminan
+#       las tareas, sin reescribir lo ya guardado;
+#     - la lectura es perezosa: cada columna se abre con np.memmap y solo se
+#       cargan las columnas y filas que se usan.
+#
+# Estructura del directorio:
+#     schema.json           nombres y tipos de las columnas
+#     {columna}.bin         valores de la columna, uno por fila
+
+# Columnas en orden: (nombre, tipo de numpy)
+COLUMNS = [
+    ("L", "<i4"),
+    ("T", "<f8"),
+    ("h", "<f8"),
+    ("seed", "S128"),       # "entropía/k1.k2..." de la SeedSequence de la tarea (hasta
+                            # 39 + 1 + 62 caracteres con random_streams.keyed_seed)
+    ("engine", "S16"),
+    ("lattice", "S24"),     # Nombre de la red (ver lattice.make_lattice)
+    ("nsteps", "<i8"),
+    ("count", "<i8"),       # Valores acumulados
+    ("mean_energy", "<f8"),
+    ("var_energy", "<f8"),
+    ("mean_magnetization", "<f8"),
+    ("mean_abs_magnetization", "<f8"),
+    ("var_magnetization", "<f8"),
+    ("heat_capacity", "<f8"),
+    ("magnetic_susceptibility", "<f8"),
+    ("binder_cumulant", "<f8"),
+    ("error_energy", "<f8"),            # NaN si la tarea no estimó errores
+    ("error_abs_magnetization", "<f8"),
+    ("error_heat_capacity", "<f8"),
+    ("error_magnetic_susceptibility", "<f8"),
+    ("tau_E", "<f8"),
+    ("tau_M", "<f8"),
+    ("time_internal", "<f8"),
+    ("wall_time", "<f8"),
+    ("worker", "S96"),      # "máquina:pid" del proceso (sweep_runner.worker_name); vacío
+                            # si la tarea se leyó de un punto de control
+]
+
+KEY = ("L", "T", "h", "seed", "engine", "lattice")
+
+
+def seed_key(record):
+    """
+    Texto "entropía/k1.k2..." de una semilla guardada con random_streams.seed_record.
+    """
+    if record is None:
+        return ""
+    return "{}/{}".format(record["entropy"], ".".join(str(k) for k in record["spawn_key"]))
+
+
+def result_rows(result):
+    """
+    Convierte un resultado de sweep_runner (simulate_task o anneal_task) en
+    filas del almacén, una por temperatura.
+
+    Devuelve una lista de diccionarios {columna: valor}.
+    """
+    temperatures = np.atleast_1d(result["T"])
+    summaries = result["summary"]
+    if isinstance(summaries, ObservableAccumulator):
+        summaries = [summaries]
+    stats = result.get("statistics") or {}
+    worker = result.get("worker")
+
+    rows = []
+    for T, acc in zip(temperatures, summaries):
+        T = float(T)
+        rows.append({
+            "L": result["L"],
+            "T": T,
+            "h": result.get("h", 0.0),
+            "seed": seed_key(result.get("seed")).encode(),
+            "engine": result.get("engine", "").encode(),
+            "lattice": result.get("lattice", "square").encode(),
+            "nsteps": result.get("nsteps", 0),
+            "count": acc.count,
+            "mean_energy": acc.mean_energy(),
+            "var_energy": acc.mean_energy2() - acc.mean_energy() ** 2,
+            "mean_magnetization": acc.mean_magnetization(),
+            "mean_abs_magnetization": acc.mean_abs_magnetization(),
+            "var_magnetization": acc.mean_magnetization2() - acc.mean_magnetization() ** 2,
+            "heat_capacity": acc.heat_capacity(T),
+            "magnetic_susceptibility": acc.magnetic_susceptibility(T),
+            "binder_cumulant": acc.binder_cumulant() if acc.mean_magnetization2() else np.nan,
+            "error_energy": stats.get("error_energy", np.nan),
+            "error_abs_magnetization": stats.get("error_abs_magnetization", np.nan),
+            "error_heat_capacity": stats.get("error_heat_capacity", np.nan),
+            "error_magnetic_susceptibility": stats.get("error_magnetic_susceptibility", np.nan),
+            "tau_E": stats.get("tau_E", np.nan),
+            "tau_M": stats.get("tau_M", np.nan),
+            # En anneal_task el tiempo es el de toda la cadena de L
+            "time_internal": result.get("time_internal", np.nan),
+            "wall_time": result.get("wall_time", np.nan),
+            "worker": (worker or "").encode(),
+        })
+    return rows
+
+
+class ResultsStore:
+    """
+    Almacén columnar en disco de los resultados de un barrido (ver COLUMNS).
+    """
+
+    def __init__(self, directory):
+        """
+        Abre (o crea) el almacén en `directory`.
+
+        Lanza ValueError si el directorio contiene un almacén con otras columnas.
+        """
+        self.directory = directory
+        self.schema_path = os.path.join(directory, "schema.json")
+        schema = {"columns": [[name, dtype] for name, dtype in COLUMNS], "key": list(KEY)}
+        if os.path.exists(self.schema_path):
+            with open(self.schema_path) as f:
+                if json.load(f) != schema:
+                    raise ValueError("El almacén en '{}' tiene otro esquema".format(directory))
+        else:
+            os.makedirs(directory, exist_ok=True)
+            with open(self.schema_path, "w") as f:
+                json.dump(schema, f, indent=1)
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in COLUMNS}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".bin")
+
+    def append(self, result):
+        """
+        Agrega al final del almacén las filas de un resultado (ver result_rows).
+
+        Devuelve el número de filas agregadas (ver append_rows).
+        """
+        return self.append_rows(result_rows(result))
+
+    def append_rows(self, rows):
+        """
+        Agrega filas (diccionarios {columna: valor}) al final de cada columna.
+        Las filas cuya clave (KEY) ya está en el almacén se omiten, de modo que
+        una tarea leída de un punto de control no se guarda dos veces.
+
+        Lanza ValueError si un texto no cabe en su columna (numpy lo truncaría).
+
+        Devuelve el número de filas agregadas.
+        """
+        for name, dtype in self.dtypes.items():
+            if dtype.kind != "S":
+                continue
+            for row in rows:
+                if len(row[name]) > dtype.itemsize:
+                    raise ValueError("El valor {!r} no cabe en la columna '{}' ({})".format(
+                        row[name], name, dtype))
+        stored = self.keys()
+        new_rows = []
+        for row in rows:
+            key = self._key(row)
+            if key not in stored:
+                stored.add(key)
+                new_rows.append(row)
+        rows = new_rows
+        if not rows:
+            return 0
+        # Una escritura interrumpida puede dejar una fila incompleta en algunas
+        # columnas: se descarta escribiendo todas a partir de la última fila completa
+        n = len(self)
+        for name, dtype in self.dtypes.items():
+            values = np.array([row[name] for row in rows], dtype=dtype)
+            path = self._path(name)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(n * dtype.itemsize)
+                f.write(values.tobytes())
+                f.truncate()
+        return len(rows)
+
+    def _key(self, row):
+        # Valores de la clave con el tipo de cada columna, comparables con keys()
+        return tuple(np.array(row[name], dtype=self.dtypes[name]).item() for name in KEY)
+
+    def keys(self):
+        """
+        Claves (KEY) de las filas guardadas, como conjunto de tuplas.
+        """
+        return set(zip(*(self.column(name).tolist() for name in KEY)))
+
+    def __len__(self):
+        # Si una escritura se interrumpió, solo cuentan las filas completas
+        sizes = [os.path.getsize(self._path(name)) // dtype.itemsize
+                 if os.path.exists(self._path(name)) else 0
+                 for name, dtype in self.dtypes.items()]
+        return min(sizes)
+
+    def column(self, name):
+        """
+        Columna `name` como np.memmap de solo lectura (sin cargarla en memoria).
+        """
+        if name not in self.dtypes:
+            raise ValueError("Columna desconocida '{}', opciones: {}".format(name, list(self.dtypes)))
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=self.dtypes[name])
+        return np.memmap(self._path(name), dtype=self.dtypes[name], mode="r", shape=(n,))
+
+    def select(self, columns=None, **conditions):
+        """
+        Lee las filas que cumplen las condiciones de igualdad dadas.
+
+        Parámetros:
+        - columns: columnas a devolver (por defecto todas)
+        - conditions: columna=valor (p. ej. L=20, engine="jit"); un valor puede
+          ser también una lista de valores admitidos
+
+        Devuelve un diccionario {columna: array}, ordenado por (L, T). Solo se
+        leen de disco las columnas de las condiciones y las pedidas.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in conditions.items():
+            values = np.atleast_1d(value)
+            if self.dtypes[name].kind == "S":
+                values = np.array([str(v).encode() for v in values])
+            mask &= np.isin(self.column(name), values)
+        rows = np.flatnonzero(mask)
+        order = np.lexsort((self.column("T")[rows], self.column("L")[rows]))
+        rows = rows[order]
+        columns = columns or list(self.dtypes)
+        data = {}
+        for name in columns:
+            values = np.asarray(self.column(name)[rows])
+            data[name] = values.astype(str) if values.dtype.kind == "S" else values
+        return data
+
+    def to_dataframe(self, columns=None, **conditions):
+        """
+        Como select(), pero devuelve un pandas.DataFrame en formato largo.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.select(columns, **conditions))
@@ -0,0 +1,238 @@
+import numpy as np
+
+# Reponderación de histogramas (Ferrenberg–Swendsen).
+#
+# Una cadena a temperatura T0 muestrea las energías con probabilidad
+# P(E) ∝ g(E) exp(-E / T0), donde g(E) es la densidad de estados. A partir del
+# histograma H(E) de la cadena se estima g(E) ∝ H(E) exp(E / T0) y con ella
+# cualquier promedio a otra temperatura T cercana:
+#     <A>_T = Σ_E A(E) g(E) exp(-E / T) / Σ_E g(E) exp(-E / T)
+# Como el peso solo depende de E, los observables de M se reponderan con los
+# promedios de M, |M|, M² y M⁴ en cada bin de energía (HistogramAccumulator).
+#
+# Con una sola cadena (single_histogram) el resultado solo es fiable para
+# temperaturas cuyas energías típicas la cadena visitó. Con varias cadenas
+# (multiple_histogram) las estimaciones de g(E) se combinan pesando cada
+# histograma según su estadística, resolviendo de forma autoconsistente las
+# energías libres f_k = ln Z_k de cada temperatura simulada; así unas pocas
+# simulaciones que cubren el intervalo dan curvas continuas de <E>, <M>, C_V y
+# chi en toda la malla de temperaturas.
+#
+# Todas las sumas se hacen en escala logarítmica para evitar desbordes
+# (exp(-E / T) con |E| ~ 2N).
+#
+# Ejemplo:
+#     model = IsingModel2D(20, seed=1)
+#     T_sim = np.linspace(2.1, 2.5, 6)
+#     accs, _ = model.simulate(model.ordered_state(), T_sim, nsteps, engine="jit",
+#                              stream=True, thermalization=burnin, histogram=True)
+#     T = np.linspace(2.1, 2.5, 400)
+#     curves = multiple_histogram(accs, T_sim, T)
+#     T_c, C_max = peak_temperature(T, curves["heat_capacity"])
+
+
+def _logsumexp(x, axis=None):
+    """
+    ln Σ exp(x) sin desbordes.
+    """
+    top = np.max(x, axis=axis, keepdims=True)
+    top = np.where(np.isfinite(top), top, 0.0)
+    out = np.log(np.sum(np.exp(x - top), axis=axis, keepdims=True)) + top
+    return np.squeeze(out, axis=axis) if axis is not None else float(out.squeeze())
+
+
+def _combine(histograms):
+    """
+    Lleva los histogramas de varias cadenas a bins comunes.
+
+    Devuelve:
+    - Energías de los bins comunes (ordenadas)
+    - Cuentas de cada cadena en cada bin, array (cadenas, bins)
+    - Sumas de M, |M|, M² y M⁴ de todas las cadenas en cada bin, array (bins, 4)
+    """
+    widths = {h.bin_width for h in histograms}
+    if len(widths) != 1:
+        raise ValueError("Los histogramas tienen distinto ancho de bin: {}".format(sorted(widths)))
+    for h in histograms:
+        h._flush()
+    bins = np.unique(np.concatenate([h.bins for h in histograms]))
+    counts = np.zeros((len(histograms), bins.shape[0]))
+    moments = np.zeros((bins.shape[0], 4))
+    for k, h in enumerate(histograms):
+        index = np.searchsorted(bins, h.bins)
+        counts[k, index] = h.moments[:, 0]
+        moments[index] += h.moments[:, 1:]
+    return bins * widths.pop(), counts, moments
+
+
+def _observables(energies, log_g, counts, moments, temperatures):
+    """
+    Observables reponderados a cada temperatura a partir de ln g(E) y de las
+    sumas por bin de los momentos de M.
+    """
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=np.float64))
+    beta = 1.0 / temperatures
+    visited = counts > 0
+    E = energies[visited]
+    M_bin = moments[visited] / counts[visited, None]  # <M>, <|M|>, <M²>, <M⁴> por bin
+
+    log_w = log_g[visited][None, :] - beta[:, None] * E[None, :]
+    w = np.exp(log_w - _logsumexp(log_w, axis=1)[:, None])  # (temperaturas, bins), filas suman 1
+
+    mean_E = w @ E
+    var_E = np.sum(w * (E[None, :] - mean_E[:, None]) ** 2, axis=1)
+    mean_M, mean_absM, mean_M2, mean_M4 = (w @ M_bin).T
+    return {
+        "T": temperatures,
+        "mean_energy": mean_E,
+        "mean_magnetization": mean_M,
+        "mean_abs_magnetization": mean_absM,
+        "heat_capacity": var_E / temperatures ** 2,
+        "magnetic_susceptibility": (mean_M2 - mean_M ** 2) / temperatures,
+        "binder_cumulant": 1.0 - mean_M4 / (3.0 * mean_M2 ** 2),
+    }
+
+
+def single_histogram(histogram, T0, temperatures):
+    """
+    Reponderación de un solo histograma a otras temperaturas.
+
+    Parámetros:
+    - histogram: HistogramAccumulator de una cadena a temperatura T0
+    - T0: temperatura simulada
+    - temperatures: temperaturas a las que se reponderan los observables
+      (cercanas a T0)
+
+    Devuelve un diccionario de arrays con "T", "mean_energy",
+    "mean_magnetization", "mean_abs_magnetization", "heat_capacity",
+    "magnetic_susceptibility" y "binder_cumulant" (mismas definiciones y
+    normalización que ObservableAccumulator).
+    """
+    energies, counts, moments = histogram.histogram()
+    with np.errstate(divide="ignore"):
+        log_g = np.log(counts) + energies / T0
+    return _observables(energies, log_g, counts, moments, temperatures)
+
+
+def density_of_states(histograms, temperatures_sim, tau=None, tol=1e-10, max_iter=100000):
+    """
+    Estimación de Ferrenberg–Swendsen de la densidad de estados a partir de
+    varios histogramas (ecuaciones de histogramas múltiples).
+
+    Itera hasta la autoconsistencia
+        g(E) = Σ_k H_k(E) / Σ_k n_k exp(-f_k - E / T_k)
+        f_k = ln Σ_E g(E) exp(-E / T_k)
+    con f_0 = 0 (g se conoce salvo una constante).
+
+    Parámetros:
+    - histograms: HistogramAccumulator de cada cadena (todas con los mismos J, h y red)
+    - temperatures_sim: temperatura de cada cadena (puede repetirse)
+    - tau: tiempos de autocorrelación integrados de la energía de cada cadena
+      (opcional, en la convención de BlockingAccumulator.autocorrelation_time,
+      mínimo 0.5); cada histograma se pesa con su tamaño efectivo n / (2 tau)
+    - tol: tolerancia en las energías libres f_k
+    - max_iter: número máximo de iteraciones
+
+    Devuelve:
+    - Energías de los bins
+    - ln g(E) (-inf en los bins no visitados)
+    - Cuentas totales por bin
+    - Sumas por bin de M, |M|, M² y M⁴
+    - Energías libres f_k de cada cadena
+    """
+    histograms = list(histograms)
+    temperatures_sim = np.asarray(temperatures_sim, dtype=np.float64)
+    if len(histograms) != temperatures_sim.shape[0]:
+        raise ValueError("Se necesita una temperatura por histograma ({} y {})".format(
+            len(histograms), temperatures_sim.shape[0]))
+    energies, counts, moments = _combine(histograms)
+    if tau is not None:
+        counts_eff = counts / (2.0 * np.maximum(0.5, np.asarray(tau, dtype=np.float64)))[:, None]
+    else:
+        counts_eff = counts
+    beta = 1.0 / temperatures_sim
+    n = counts_eff.sum(axis=1)
+    total = counts_eff.sum(axis=0)
+    visited = total > 0
+
+    log_total = np.log(total[visited])
+    E = energies[visited]
+    f = np.zeros(len(histograms))
+    for _ in range(max_iter):
+        log_g = log_total - _logsumexp(np.log(n)[:, None] - f[:, None] - beta[:, None] * E[None, :],
+                                       axis=0)
+        f_new = _logsumexp(log_g[None, :] - beta[:, None] * E[None, :], axis=1)
+        f_new -= f_new[0]
+        converged = np.max(np.abs(f_new - f)) < tol
+        f = f_new
+        if converged:
+            break
+
+    full_log_g = np.full(energies.shape[0], -np.inf)
+    full_log_g[visited] = log_g
+    return energies, full_log_g, counts.sum(axis=0), moments, f
+
+
+def multiple_histogram(histograms, temperatures_sim, temperatures, tau=None, tol=1e-10):
+    """
+    Reponderación de varios histogramas (Ferrenberg–Swendsen) a una malla de
+    temperaturas.
+
+    Parámetros:
+    - histograms, temperatures_sim, tau, tol: como en density_of_states
+    - temperatures: temperaturas a las que se reponderan los observables
+      (dentro del intervalo cubierto por las simulaciones)
+
+    Devuelve un diccionario de arrays como single_histogram.
+    """
+    energies, log_g, counts, moments, _ = density_of_states(histograms, temperatures_sim,
+                                                             tau=tau, tol=tol)
+    return _observables(energies, log_g, counts, moments, temperatures)
+
+
+def peak_temperature(temperatures, values):
+    """
+    Posición y altura del máximo de una curva (p. ej. C_V o chi reponderados),
+    refinada con la parábola que pasa por el máximo de la malla y sus dos vecinos.
+
+    Devuelve (T del máximo, valor del máximo).
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    i = int(np.argmax(values))
+    if i == 0 or i == values.shape[0] - 1:
+        return float(temperatures[i]), float(values[i])
+    a, b, c = np.polyfit(temperatures[i - 1:i + 2], values[i - 1:i + 2], 2)
+    if a >= 0:
+        return float(temperatures[i]), float(values[i])
+    T_max = -b / (2.0 * a)
+    return float(T_max), float(c - b * b / (4.0 * a))
+
+
+def pseudo_critical_temperature(histograms, temperatures_sim, observable="heat_capacity",
+                                temperatures=None, tau=None):
+    """
+    Estima T_c(L) como la posición del máximo de C_V (o de chi) reponderado.
+
+    Parámetros:
+    - histograms, temperatures_sim, tau: como en density_of_states (con un
+      solo histograma se usa single_histogram)
+    - observable: "heat_capacity" o "magnetic_susceptibility"
+    - temperatures: malla de reponderación (por defecto 1000 puntos entre la
+      menor y la mayor temperatura simulada; obligatoria con una sola)
+
+    Devuelve (T_c(L), valor del máximo).
+    """
+    if observable not in ("heat_capacity", "magnetic_susceptibility"):
+        raise ValueError("Observable desconocido '{}', opciones: {}".format(
+            observable, ("heat_capacity", "magnetic_susceptibility")))
+    temperatures_sim = np.atleast_1d(np.asarray(temperatures_sim, dtype=np.float64))
+    if temperatures is None:
+        if temperatures_sim.min() == temperatures_sim.max():
+            raise ValueError("Con una sola temperatura simulada hay que dar la malla de temperaturas")
+        temperatures = np.linspace(temperatures_sim.min(), temperatures_sim.max(), 1000)
+    if len(histograms) == 1:
+        curves = single_histogram(histograms[0], temperatures_sim[0], temperatures)
+    else:
+        curves = multiple_histogram(histograms, temperatures_sim, temperatures, tau=tau)
+    return peak_temperature(temperatures, curves[observable])
@@ -0,0 +1,177 @@
+import numpy as np
+
+# Planificador adaptativo de barridos sobre (L, T, h).
+#
+# En lugar de una malla fina y uniforme de temperaturas (o campos), cada curva
+# (un L y un valor fijo del otro parámetro) empieza con una malla gruesa. Cuando
+# todos los puntos de una curva terminan, se agregan puntos medios en los
+# intervalos vecinos al máximo de C_V o chi y en los intervalos donde la curva
+# cambia más rápido; los puntos nuevos se envían al pool de inmediato con
+# SweepRunner.imap_dynamic mientras las demás curvas siguen en curso. La
+# refinación de una curva se detiene cuando sus intervalos son más angostos que
+# la resolución pedida o se alcanza el máximo de tareas.
+#
+# Ejemplo:
+#     planner = SweepPlanner([20, 40], [20000, 80000], scan=(1.5, 3.5))
+#     with SweepRunner(processes=8, engine="jit", seed=1) as runner:
+#         results = planner.run(runner)
+#     planner.peaks()   # {(L, h): {"heat_capacity": T_max, ...}}
+
+
+class SweepPlanner:
+    """
+    Barrido adaptativo: refina la malla de T (o de h) donde C_V o chi tienen su
+    máximo o cambian más rápido.
+    """
+
+    AXES = ("T", "h")  # Parámetro que se recorre en cada curva
+    OBSERVABLES = ("heat_capacity", "magnetic_susceptibility")
+
+    def __init__(self, L_values, nsteps, scan, axis="T", fixed=(0.0,), n_initial=9,
+                 resolution=None, observables=OBSERVABLES, threshold=0.25, max_tasks=500):
+        """
+        Inicializa el planificador.
+
+        Parámetros:
+        - L_values: tamaños de red
+        - nsteps: número de pasos para cada L (lista del mismo tamaño que L_values)
+        - scan: intervalo (inicio, fin) del parámetro recorrido
+        - axis: "T" para recorrer temperaturas con h fijo, "h" para recorrer
+          campos con T fija
+        - fixed: valores del otro parámetro (una curva por cada L y valor)
+        - n_initial: puntos de la malla gruesa inicial de cada curva
+        - resolution: ancho mínimo de un intervalo refinable (por defecto
+          1/100 del intervalo recorrido)
+        - observables: observables que guían la refinación (ver OBSERVABLES)
+        - threshold: un intervalo se refina si el observable cambia en él más
+          que threshold veces su rango en la curva
+        - max_tasks: número máximo de tareas de todo el barrido
+        """
+        if axis not in self.AXES:
+            raise ValueError("Eje desconocido '{}', opciones: {}".format(axis, self.AXES))
+        for name in observables:
+            if name not in self.OBSERVABLES:
+                raise ValueError("Observable desconocido '{}', opciones: {}".format(
+                    name, self.OBSERVABLES))
+        if n_initial < 2:
+            raise ValueError("La malla inicial necesita al menos 2 puntos (n_initial = {})".format(
+                n_initial))
+
+        self.axis = axis
+        self.scan = (float(scan[0]), float(scan[1]))
+        self.nsteps = {int(L): int(steps) for L, steps in zip(L_values, nsteps)}
+        self.fixed = [float(f) for f in fixed]
+        self.n_initial = n_initial
+        self.resolution = (resolution if resolution is not None
+                           else abs(self.scan[1] - self.scan[0]) / 100.0)
+        self.observables = tuple(observables)
+        self.threshold = threshold
+        self.max_tasks = max_tasks
+        self.submitted = 0
+        # Por curva (L, valor fijo): {x: {observable: valor}} y puntos en curso
+        self.values = {(L, f): {} for L in self.nsteps for f in self.fixed}
+        self.pending = {key: set() for key in self.values}
+
+    def _tasks(self, key, xs):
+        """
+        Tareas (L, T, nsteps, h) de los puntos xs de la curva key; las registra
+        como pendientes sin superar max_tasks.
+        """
+        L, f = key
+        xs = [float(x) for x in xs][:max(0, self.max_tasks - self.submitted)]
+        self.pending[key].update(xs)
+        self.submitted += len(xs)
+        if self.axis == "T":
+            return [(L, x, self.nsteps[L], f) for x in xs]
+        return [(L, f, self.nsteps[L], x) for x in xs]
+
+    def initial_tasks(self):
+        """
+        Tareas de la malla gruesa inicial de todas las curvas.
+        """
+        grid = np.linspace(self.scan[0], self.scan[1], self.n_initial)
+        tasks = []
+        for key in self.values:
+            tasks += self._tasks(key, grid)
+        return tasks
+
+    def add(self, result):
+        """
+        Registra el resultado de una tarea (de sweep_runner.simulate_task).
+
+        Devuelve la lista de tareas nuevas: vacía mientras la curva del
+        resultado tenga puntos en curso, y los puntos de refinación cuando
+        termina el último.
+        """
+        L, T, h = result["L"], result["T"], result.get("h", 0.0)
+        x, f = (T, h) if self.axis == "T" else (h, T)
+        key = (L, f)
+        acc = result["summary"]
+        self.values[key][x] = {
+            "heat_capacity": acc.heat_capacity(T),
+            "magnetic_susceptibility": acc.magnetic_susceptibility(T),
+        }
+        self.pending[key].discard(x)
+        if self.pending[key]:
+            return []
+        return self._tasks(key, self.refinement(key))
+
+    def refinement(self, key):
+        """
+        Puntos medios que conviene agregar a la curva key: los de los dos
+        intervalos vecinos al máximo de cada observable y los de los intervalos
+        donde el observable cambia más que threshold veces su rango, siempre que
+        el intervalo sea más ancho que la resolución.
+        """
+        x, curves = self.curve(key)
+        if x.shape[0] < 2:
+            return []
+        wide = np.diff(x) > self.resolution
+        refine = np.zeros(x.shape[0] - 1, dtype=bool)
+        for name in self.observables:
+            y = curves[name]
+            peak = int(np.argmax(y))
+            refine[max(peak - 1, 0):peak + 1] = True
+            span = np.ptp(y)
+            if span > 0:
+                refine |= np.abs(np.diff(y)) > self.threshold * span
+        midpoints = 0.5 * (x[:-1] + x[1:])
+        return list(midpoints[refine & wide])
+
+    def curve(self, key):
+        """
+        Puntos terminados de la curva key.
+
+        Devuelve el array ordenado del parámetro recorrido y un diccionario
+        {observable: array} con los valores en esos puntos.
+        """
+        points = self.values[key]
+        x = np.array(sorted(points))
+        curves = {name: np.array([points[xi][name] for xi in x]) for name in self.OBSERVABLES}
+        return x, curves
+
+    def curves(self):
+        """
+        Todas las curvas: {(L, valor fijo): (x, {observable: array})}.
+        """
+        return {key: self.curve(key) for key in self.values}
+
+    def peaks(self):
+        """
+        Posición del máximo de cada observable en cada curva:
+        {(L, valor fijo): {observable: x del máximo}}.
+        """
+        peaks = {}
+        for key in self.values:
+            x, curves = self.curve(key)
+            if x.shape[0]:
+                peaks[key] = {name: float(x[np.argmax(curves[name])]) for name in self.observables}
+        return peaks
+
+    def run(self, runner):
+        """
+        Ejecuta el barrido adaptativo con un SweepRunner abierto.
+
+        Devuelve la lista de resultados en el orden en que terminaron.
+        """
+        return list(runner.imap_dynamic(self.initial_tasks(), self.add))
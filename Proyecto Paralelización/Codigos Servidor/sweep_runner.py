@@ -0,0 +1,583 @@
+from ising_model import IsingModel
+from lattice import make_lattice
+from multispin import REPLICAS
+from observables import ObservableAccumulator
+from checkpoint import CheckpointedTask, root_seed, task_name
+from random_streams import keyed_seed, seed_record, spawn_seeds
+from instrumentation import Profiler, memory_high_water
+from collections import deque
+import multiprocessing as mp
+import numpy as np
+import socket
+import queue
+import time
+import os
+
+# Ejecutor de barridos (L, T) con un único pool de procesos persistente.
+#
+# Todas las tareas de todos los tamaños se envían de una vez, ordenadas de la
+# más costosa a la más barata, y los resultados se reciben a medida que
+# terminan con imap_unordered. Así ningún procesador queda ocioso esperando a
+# la temperatura más lenta de cada L.
+#
+# Los procesos no devuelven las series completas de E y M: cada tarea se reduce
+# a un ObservableAccumulator (unos pocos números). Si las series hacen falta, se
+# escriben en archivos mapeados en memoria identificados por (L, T) y el proceso
+# padre solo recibe la ruta.
+#
+# Cada tarea usa su propio flujo aleatorio, derivado de la semilla del
+# ejecutor según su posición en la lista de tareas (random_streams.spawn_seeds),
+# de modo que un barrido con la misma semilla es reproducible, también si se
+# vuelve a ejecutar con el mismo ejecutor.
+#
+# Con profile=True cada tarea lleva un instrumentation.Profiler y devuelve sus
+# registros en "profile"; el ejecutor los reúne en self.profiler.records junto
+# con un registro final del barrido (utilización de cada proceso).
+#
+# Con store (results_store.ResultsStore) cada resultado se agrega al almacén
+# columnar en cuanto llega al proceso padre, que es el único que escribe.
+#
+# Las tareas se simulan sobre la red indicada por su nombre (lattice.make_lattice):
+# "square" por defecto, o p. ej. "cubic", "triangular" o "cubic-open".
+#
+# Una tarea es una tupla (L, T, nsteps) o (L, T, nsteps, h) con campo externo h
+# (0 por defecto). imap_dynamic admite además tareas nuevas mientras el barrido
+# avanza (ver sweep_planner).
+
+
+def estimate_cost(task):
+    """
+    Estima el costo relativo de una tarea (L, T, nsteps[, h]) como L² · nsteps.
+    """
+    L, T, nsteps = task[:3]
+    return L * L * nsteps
+
+
+def make_tasks(L_values, temperatures, nsteps, fields=None):
+    """
+    Construye la lista plana de tareas (L, T, nsteps) o (L, T, nsteps, h).
+
+    Parámetros:
+    - L_values: tamaños de red
+    - temperatures: arreglo de temperaturas (el mismo para todos los L)
+    - nsteps: número de pasos para cada L (lista del mismo tamaño que L_values)
+    - fields: arreglo de campos externos h; si no es None se crea una tarea
+      por cada (L, T, h)
+
+    Devuelve una lista de tuplas (L, T, nsteps) (o (L, T, nsteps, h)).
+    """
+    if fields is None:
+        return [(int(l), float(T), int(steps))
+                for l, steps in zip(L_values, nsteps)
+                for T in temperatures]
+    return [(int(l), float(T), int(steps), float(h))
+            for l, steps in zip(L_values, nsteps)
+            for T in temperatures
+            for h in fields]
+
+
+def unpack_task(task):
+    """
+    Devuelve (L, T, nsteps, h) de una tarea con o sin campo externo.
+    """
+    L, T, nsteps = task[:3]
+    h = task[3] if len(task) > 3 else 0.0
+    return L, T, nsteps, h
+
+
+def worker_name():
+    """
+    Nombre del proceso actual, "máquina:pid": a diferencia del pid solo, no se
+    repite entre procesos de distintas máquinas (ver distributed.run_worker).
+    """
+    return "{}:{}".format(socket.gethostname(), os.getpid())
+
+
+def series_paths(series_dir, L, T, lattice="square", h=0.0):
+    """
+    Rutas de los archivos de series de energía (float64) y magnetización (int32)
+    de la tarea (L, T) (con el nombre de la red como prefijo si no es "square"
+    y el campo como sufijo si h no es 0).
+    """
+    name = task_name(L, T, lattice, h)
+    return (os.path.join(series_dir, "E_" + name + ".f64"),
+            os.path.join(series_dir, "M_" + name + ".i32"))
+
+
+def load_series(result):
+    """
+    Abre sin copiar las series guardadas por una tarea ejecutada con series_dir.
+
+    Devuelve dos np.memmap de solo lectura: energía y magnetización (de forma
+    (valores, 64) con el motor "multispin", una columna por réplica).
+    """
+    path_E, path_M = result["series"]
+    E = np.memmap(path_E, dtype=np.float64, mode="r")
+    M = np.memmap(path_M, dtype=np.int32, mode="r")
+    if result.get("engine") == "multispin":
+        return E.reshape(-1, REPLICAS), M.reshape(-1, REPLICAS)
+    return E, M
+
+
+def check_target_error(target_error, engine, thermalization, series_dir, checkpoint_dir):
+    """
+    Lanza ValueError si target_error se combina con opciones que no admite:
+    simulate_until detecta la termalización por sí mismo, no guarda series ni
+    puntos de control y no funciona con el motor "multispin".
+    """
+    if target_error is None:
+        return
+    if engine == "multispin":
+        raise ValueError("target_error no admite el motor 'multispin' (ver IsingModel.simulate_until)")
+    conflicts = [name for name, value in (("thermalization", thermalization),
+                                          ("series_dir", series_dir),
+                                          ("checkpoint_dir", checkpoint_dir)) if value]
+    if conflicts:
+        raise ValueError("target_error no se puede combinar con {}".format(", ".join(conflicts)))
+
+
+def simulate_task(task, engine="metropolis", thermalization=0, series_dir=None,
+                  checkpoint_dir=None, segment_steps=None, target_error=None, seed=None,
+                  profile=False, lattice="square"):
+    """
+    Simula el modelo de Ising para una tarea (L, T, nsteps) desde el estado ordenado.
+
+    Parámetros:
+    - task: tupla (L, T, nsteps) o (L, T, nsteps, h)
+    - engine: motor de IsingModel.simulate
+    - thermalization: valores iniciales descartados en el resumen
+    - series_dir: si no es None, las series de E y M se escriben en archivos
+      mapeados en memoria en este directorio (ver series_paths)
+    - checkpoint_dir: si no es None, la tarea se ejecuta por segmentos con
+      puntos de control en este directorio (ver checkpoint.CheckpointedTask) y
+      continúa desde el último guardado si existe
+    - segment_steps: pasos entre puntos de control
+    - target_error: si no es None, la tarea usa IsingModel.simulate_until
+      con este error relativo objetivo y nsteps como máximo de pasos; el
+      resultado incluye además "statistics" (con "target_reached", False si
+      se agotaron los pasos sin alcanzar el objetivo) y "burnin". No se puede combinar
+      con thermalization, series_dir ni checkpoint_dir (ver check_target_error)
+    - seed: semilla de la tarea (entero o numpy.random.SeedSequence)
+    - profile: si es True el resultado incluye en "profile" los registros de
+      instrumentación de la simulación y de la tarea
+    - lattice: nombre de la red (ver lattice.make_lattice)
+
+    Devuelve un diccionario con los parámetros de la tarea, el resumen de
+    observables (ObservableAccumulator), las rutas de las series (o None), el
+    tiempo interno de simulación, el tiempo de pared de la tarea (inicio y fin)
+    y el nombre del proceso que la ejecutó (ver worker_name).
+    """
+    check_target_error(target_error, engine, thermalization, series_dir, checkpoint_dir)
+    L, T, nsteps, h = unpack_task(task)
+    start = time.time()
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    profiler = Profiler() if profile else None
+    model = IsingModel(make_lattice(lattice, L), h=h, seed=seed, profiler=profiler)
+    S = model.ordered_state()
+
+    paths = None
+    extra = {}
+    if target_error is not None:
+        summary, statistics, burnin, S_final, time_duration = model.simulate_until(
+            S, T, target_error=target_error, engine=engine, max_steps=nsteps)
+        extra = {"statistics": statistics, "burnin": burnin}
+    elif checkpoint_dir is not None:
+        start_perf = time.perf_counter()
+        checkpointed = CheckpointedTask(checkpoint_dir, L, T, nsteps, engine=engine,
+                                        h=h, thermalization=thermalization,
+                                        segment_steps=segment_steps, seed=seed, lattice=lattice)
+        summary = checkpointed.run()
+        seed = checkpointed.seed  # La de disco si la tarea se reanudó
+        time_duration = time.perf_counter() - start_perf
+    elif series_dir is None:
+        summaries, S_final, time_duration = model.simulate(S, T=T, nsteps=nsteps, engine=engine,
+                                                           stream=True,
+                                                           thermalization=thermalization)
+        summary = summaries[0]
+    else:
+        Energia, Magnetizacion, S_final, time_duration = model.simulate(S, T=T, nsteps=nsteps,
+                                                                        engine=engine)
+        Energia, Magnetizacion = np.asarray(Energia[0]), np.asarray(Magnetizacion[0])
+        summary = ObservableAccumulator(thermalization)
+        if Energia.ndim == 1:
+            summary.add_series(Energia, Magnetizacion)
+        else:
+            summary.add_replicas(Energia, Magnetizacion)  # "multispin": una columna por réplica
+
+        paths = series_paths(series_dir, L, T, lattice, h)
+        for path, values, dtype in zip(paths, (Energia, Magnetizacion), (np.float64, np.int32)):
+            buffer = np.memmap(path, dtype=dtype, mode="w+", shape=values.shape)
+            buffer[:] = values
+            buffer.flush()
+            del buffer
+
+    end = time.time()
+    if profiler is not None:
+        profiler.emit("task", engine=engine, lattice=lattice, L=L, T=T, h=h, nsteps=nsteps,
+                      wall_time=end - start, time_internal=time_duration, memory_mb=memory_high_water())
+        extra["profile"] = profiler.records
+    return {
+        "L": L,
+        "T": T,
+        "h": h,
+        "nsteps": nsteps,
+        "engine": engine,
+        "lattice": lattice,
+        "seed": seed_record(seed),
+        "summary": summary,
+        "series": paths,
+        "time_internal": time_duration,
+        "start": start,
+        "end": end,
+        "wall_time": end - start,
+        "worker": worker_name(),
+        **extra,
+    }
+
+
+def _run_indexed(args):
+    """
+    Envoltura para imap_unordered: ejecuta una tarea y devuelve su índice original.
+    """
+    index, task, seed, options = args
+    return index, simulate_task(task, seed=seed, **options)
+
+
+def anneal_task(args):
+    """
+    Ejecuta IsingModel.anneal para un tamaño L (una cadena de recocido por tarea).
+
+    Parámetros:
+    - args: tupla (L, temperaturas, nsteps, engine, order, seed, profile, lattice)
+
+    Devuelve un diccionario con L, las temperaturas, los pasos, el motor, los
+    resúmenes por temperatura, los pasos de termalización, los tiempos y el
+    proceso (y los registros de instrumentación en "profile" si profile es True).
+    """
+    L, temperatures, nsteps, engine, order, seed, profile, lattice = args
+    start = time.time()
+    profiler = Profiler() if profile else None
+    model = IsingModel(make_lattice(lattice, L), seed=seed, profiler=profiler)
+    summaries, burnin, S_final, time_duration = model.anneal(temperatures, nsteps, engine=engine,
+                                                             order=order)
+    end = time.time()
+    extra = {}
+    if profiler is not None:
+        profiler.emit("task", engine=engine, lattice=lattice, L=L, T=list(temperatures),
+                      nsteps=nsteps,
+                      wall_time=end - start, time_internal=time_duration,
+                      memory_mb=memory_high_water())
+        extra["profile"] = profiler.records
+    return {
+        "L": L,
+        "T": list(temperatures),
+        "h": model.h,
+        "nsteps": nsteps,
+        "engine": engine,
+        "lattice": lattice,
+        "seed": seed_record(seed),
+        "summary": summaries,
+        "burnin": burnin,
+        "time_internal": time_duration,
+        "start": start,
+        "end": end,
+        "wall_time": end - start,
+        "worker": worker_name(),
+        **extra,
+    }
+
+
+class SweepRunner:
+    """
+    Mantiene un pool de procesos vivo para ejecutar barridos completos (L, T).
+
+    Se usa como gestor de contexto:
+
+        with SweepRunner(processes=12) as runner:
+            results = runner.run(make_tasks(L, Temp, nsteps))
+    """
+
+    def __init__(self, processes=None, engine="metropolis", thermalization=0, series_dir=None,
+                 checkpoint_dir=None, segment_steps=None, target_error=None, seed=None,
+                 profile=False, sink=None, store=None, lattice="square"):
+        """
+        Inicializa el ejecutor.
+
+        Parámetros:
+        - processes: número de procesos del pool (por defecto mp.cpu_count())
+        - engine: motor de IsingModel.simulate usado en cada tarea
+        - thermalization: valores iniciales descartados en el resumen de cada tarea
+        - series_dir: directorio donde guardar las series completas (None para
+          transportar solo el resumen)
+        - checkpoint_dir: directorio de puntos de control; las tareas terminadas
+          se leen de disco sin volver a simularse y las parciales continúan
+          (requiere engine "jit" o "checkerboard")
+        - segment_steps: pasos entre puntos de control
+        - target_error: error relativo objetivo de <E>, C_V y chi; cada tarea se
+          detiene al alcanzarlo (nsteps pasa a ser el máximo de pasos). La
+          termalización se detecta sola, así que no se puede combinar con
+          thermalization, series_dir ni checkpoint_dir
+        - seed: semilla raíz (entero o SeedSequence); None genera una nueva, que
+          queda disponible en self.root_seed para guardarla con los resultados
+          (con checkpoint_dir, None reutiliza la guardada en él, ver
+          checkpoint.root_seed)
+        - profile: si es True se instrumenta cada tarea y los registros se
+          reúnen en self.profiler.records (ver instrumentation.Profiler)
+        - sink: función que recibe cada registro de instrumentación en el
+          proceso padre (p. ej. para escribirlo en disco)
+        - store: results_store.ResultsStore donde se agrega cada resultado al
+          terminar su tarea (None para no guardar)
+        - lattice: nombre de la red de todas las tareas (ver lattice.make_lattice)
+        """
+        check_target_error(target_error, engine, thermalization, series_dir, checkpoint_dir)
+        self.processes = processes or mp.cpu_count()
+        self.engine = engine
+        self.thermalization = thermalization
+        self.series_dir = series_dir
+        self.checkpoint_dir = checkpoint_dir
+        self.segment_steps = segment_steps
+        self.target_error = target_error
+        if checkpoint_dir is not None:
+            # Sin semilla explícita se reanuda con la raíz guardada en los puntos de control
+            self.root_seed = root_seed(checkpoint_dir, seed)
+        else:
+            self.root_seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.profiler = Profiler(sink) if profile else None
+        self.store = store
+        self.lattice = lattice
+        self.pool = None
+
+    def __enter__(self):
+        self.pool = mp.Pool(processes=self.processes)
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Cierra el pool de procesos.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def _options(self):
+        """
+        Opciones de simulate_task comunes a todas las tareas.
+        """
+        if self.pool is None:
+            raise RuntimeError("El pool no está abierto; use SweepRunner como gestor de contexto")
+        if self.series_dir is not None:
+            os.makedirs(self.series_dir, exist_ok=True)
+        return {"engine": self.engine, "thermalization": self.thermalization,
+                "series_dir": self.series_dir, "checkpoint_dir": self.checkpoint_dir,
+                "segment_steps": self.segment_steps, "target_error": self.target_error,
+                "profile": self.profiler is not None, "lattice": self.lattice}
+
+    def _resumed(self, index, task, seed):
+        """
+        Resultado de una tarea ya terminada en los puntos de control, o None si
+        hay que simularla. Lanza ValueError si el punto de control se creó con
+        otros parámetros o con otra semilla (ver CheckpointedTask).
+        """
+        if self.checkpoint_dir is None:
+            return None
+        L, T, nsteps, h = unpack_task(task)
+        checkpointed = CheckpointedTask(self.checkpoint_dir, L, T, nsteps, engine=self.engine,
+                                        h=h, thermalization=self.thermalization,
+                                        segment_steps=self.segment_steps, seed=seed,
+                                        lattice=self.lattice)
+        if not checkpointed.done:
+            return None
+        now = time.time()
+        return {"L": L, "T": T, "h": h, "nsteps": nsteps, "engine": self.engine,
+                "lattice": self.lattice, "seed": seed_record(checkpointed.seed),
+                "summary": checkpointed.acc,
+                "series": None, "time_internal": 0.0, "start": now, "end": now,
+                "wall_time": 0.0, "worker": None, "resumed": True, "index": index}
+
+    def _collect(self, result):
+        """
+        Registra un resultado recibido: instrumentación y almacén de resultados.
+        """
+        if self.profiler is not None and "profile" in result:
+            self.profiler.collect(result["profile"])
+        if self.store is not None:
+            self.store.append(result)
+
+    def imap(self, tasks):
+        """
+        Envía todas las tareas, las más costosas primero, y produce los
+        resultados en el orden en que terminan.
+        """
+        options = self._options()
+        order = sorted(range(len(tasks)), key=lambda i: estimate_cost(tasks[i]), reverse=True)
+        _, seeds = spawn_seeds(self.root_seed, len(tasks))  # Flujo i para la tarea i en cada llamada
+
+        # Las tareas ya terminadas se leen de disco y no se envían al pool
+        pending = []
+        for i in order:
+            result = self._resumed(i, tasks[i], seeds[i])
+            if result is None:
+                pending.append(i)
+                continue
+            self._collect(result)
+            yield result
+
+        args = [(i, tasks[i], seeds[i], options) for i in pending]
+        for index, result in self.pool.imap_unordered(_run_indexed, args):
+            result["index"] = index
+            self._collect(result)
+            yield result
+
+    def imap_dynamic(self, tasks, refine):
+        """
+        Como imap, pero la lista de tareas puede crecer durante el barrido:
+        tras cada resultado se llama a refine(result), que devuelve una lista
+        (posiblemente vacía) de tareas nuevas que se envían al pool de
+        inmediato, sin esperar a las que siguen en curso.
+
+        Las tareas reciben índices consecutivos en el orden en que se agregan
+        (las iniciales primero). Como ese orden depende de cuándo termina cada
+        tarea, el flujo aleatorio de cada una se deriva de la semilla raíz y de
+        sus valores (L, T, h) con keyed_seed, no de su posición: con la misma
+        semilla cada punto se simula igual sin importar el número de procesos.
+        """
+        options = self._options()
+        finished = queue.Queue()  # Resultados de apply_async (desde el hilo del pool)
+        ready = deque()           # Resultados leídos de puntos de control
+        count = 0
+        running = 0
+
+        def submit(new_tasks):
+            nonlocal count, running
+            seeds = [keyed_seed(self.root_seed, (L, T, h))
+                     for L, T, _, h in map(unpack_task, new_tasks)]
+            order = sorted(range(len(new_tasks)), key=lambda k: estimate_cost(new_tasks[k]),
+                           reverse=True)
+            for k in order:
+                index = count + k
+                result = self._resumed(index, new_tasks[k], seeds[k])
+                if result is not None:
+                    ready.append(result)
+                    continue
+                self.pool.apply_async(_run_indexed, ((index, new_tasks[k], seeds[k], options),),
+                                      callback=finished.put, error_callback=finished.put)
+                running += 1
+            count += len(new_tasks)
+
+        submit(list(tasks))
+        while ready or running:
+            if ready:
+                result = ready.popleft()
+            else:
+                item = finished.get()
+                running -= 1
+                if isinstance(item, BaseException):
+                    raise item
+                index, result = item
+                result["index"] = index
+            self._collect(result)
+            yield result
+            submit(list(refine(result)))
+
+    def anneal(self, L_values, temperatures, nsteps, order="up"):
+        """
+        Barridos de recocido en paralelo: una cadena por cada L (las más grandes primero).
+
+        Devuelve la lista de resultados de anneal_task en el orden de L_values.
+        """
+        if self.pool is None:
+            raise RuntimeError("El pool no está abierto; use SweepRunner como gestor de contexto")
+        # Flujos (1, i): distintos de los de las tareas de imap (i,)
+        _, seeds = spawn_seeds(self.root_seed, len(L_values), prefix=(1,))
+        profile = self.profiler is not None
+        args = [(int(l), list(temperatures), int(steps), self.engine, order, seed, profile,
+                 self.lattice)
+                for l, steps, seed in sorted(zip(L_values, nsteps, seeds),
+                                             key=lambda x: x[0] ** 2 * x[1], reverse=True)]
+        start = time.time()
+        results = {}
+        for res in self.pool.imap_unordered(anneal_task, args):
+            if self.store is not None:
+                self.store.append(res)
+            results[res["L"]] = res
+        results = [results[int(l)] for l in L_values]
+        if profile:
+            for res in results:
+                self.profiler.collect(res["profile"])
+            self._emit_sweep("anneal_sweep", results, time.time() - start)
+        return results
+
+    def run(self, tasks):
+        """
+        Ejecuta todas las tareas y devuelve los resultados en el orden de `tasks`.
+        """
+        start = time.time()
+        results = [None] * len(tasks)
+        for result in self.imap(tasks):
+            results[result["index"]] = result
+        if self.profiler is not None:
+            self._emit_sweep("sweep", results, time.time() - start)
+        return results
+
+    def _emit_sweep(self, kind, results, elapsed):
+        """
+        Emite el registro de un barrido completo: tiempo de pared, número de
+        tareas y utilización de cada proceso.
+        """
+        self.profiler.emit(kind, processes=self.processes, engine=self.engine, lattice=self.lattice,
+                           tasks=len(results), wall_time=elapsed,
+                           utilization={str(w): u for w, u in
+                                        worker_utilization(results, elapsed).items()})
+
+
+def load_balance(results):
+    """
+    Resume el reparto de trabajo entre procesos.
+
+    Devuelve un diccionario {worker: (número de tareas, tiempo ocupado en s)}.
+    """
+    balance = {}
+    for res in results:
+        n, busy = balance.get(res["worker"], (0, 0.0))
+        balance[res["worker"]] = (n + 1, busy + res["wall_time"])
+    return balance
+
+
+def worker_utilization(results, elapsed=None):
+    """
+    Fracción del tiempo de pared en que cada proceso estuvo ocupado.
+
+    Parámetros:
+    - results: resultados de SweepRunner (con "worker", "start", "end" y "wall_time")
+    - elapsed: tiempo de pared del barrido (por defecto desde el primer inicio
+      hasta el último fin)
+
+    Devuelve un diccionario {worker: utilización entre 0 y 1}; las tareas
+    leídas de puntos de control (worker None) no cuentan.
+    """
+    ran = [res for res in results if res["worker"] is not None]
+    if not ran:
+        return {}
+    if elapsed is None:
+        elapsed = max(res["end"] for res in ran) - min(res["start"] for res in ran)
+    return {worker: busy / elapsed if elapsed > 0 else 0.0
+            for worker, (n, busy) in load_balance(ran).items()}
+
+
+def external_times(results):
+    """
+    Tiempo externo por tamaño L: desde que empieza la primera tarea de ese L
+    hasta que termina la última.
+
+    Devuelve un diccionario {L: tiempo en s}.
+    """
+    spans = {}
+    for res in results:
+        first, last = spans.get(res["L"], (np.inf, -np.inf))
+        spans[res["L"]] = (min(first, res["start"]), max(last, res["end"]))
+    return {l: last - first for l, (first, last) in spans.items()}
@@ -0,0 +1,36 @@
+from checkpoint import CheckpointedTask, task_name
+import numpy as np
+import pytest
+
+# Pruebas de los puntos de control de tareas largas (se ejecutan con pytest).
+
+
+@pytest.mark.parametrize("engine", CheckpointedTask.ENGINES)
+def test_checkpoint_resume_is_bit_for_bit(tmp_path, engine):
+    options = dict(engine=engine, thermalization=10, segment_steps=50 * 16, seed=6)
+    full = CheckpointedTask(str(tmp_path / "full"), 4, 2.5, 500 * 16, **options)
+    full.run()
+
+    interrupted = CheckpointedTask(str(tmp_path / "partial"), 4, 2.5, 500 * 16, **options)
+    interrupted.run(max_segments=3)
+    assert not interrupted.done
+    resumed = CheckpointedTask(str(tmp_path / "partial"), 4, 2.5, 500 * 16, **options)
+    resumed.run()
+
+    assert resumed.done
+    assert resumed.acc.as_dict() == full.acc.as_dict()
+    assert np.array_equal(resumed.S, full.S)
+
+    with pytest.raises(ValueError):
+        CheckpointedTask(str(tmp_path / "partial"), 4, 2.5, 1000 * 16, **options)
+
+
+def test_close_temperatures_do_not_share_checkpoints(tmp_path):
+    T = 2.269185314213022
+    assert task_name(4, T) != task_name(4, T + 1e-9)
+    assert task_name(4, T, "cubic", h=0.1) == "cubic_L4_T{!r}_h0.1".format(T)
+
+    options = dict(engine="checkerboard", segment_steps=50 * 16, seed=7)
+    CheckpointedTask(str(tmp_path), 4, T, 100 * 16, **options).run()
+    other = CheckpointedTask(str(tmp_path), 4, T + 1e-9, 100 * 16, **options)
+    assert not other.done
@@ -0,0 +1,40 @@
+from distributed import DistributedSweepRunner
+from sweep_runner import SweepRunner, make_tasks
+import socket
+import time
+
+# Pruebas del broker de barridos distribuidos en una sola máquina (se ejecutan
+# con pytest).
+
+
+def worker_name_of(process):
+    """
+    Nombre "máquina:pid" con el que un trabajador local se registra en el broker.
+    """
+    return "{}:{}".format(socket.gethostname(), process.pid)
+
+
+def test_lost_worker_tasks_are_requeued():
+    tasks = make_tasks([16], [1.5, 2.0, 2.25, 2.5, 2.75, 3.0, 3.5, 4.0], [256 * 2000])
+    options = dict(processes=2, engine="checkerboard", seed=3)
+    with SweepRunner(**options) as runner:
+        expected = runner.run(tasks)
+
+    results = [None] * len(tasks)
+    with DistributedSweepRunner(lease_timeout=1.0, **options) as runner:
+        for result in runner.imap(tasks):
+            assert results[result["index"]] is None  # Cada tarea llega una sola vez
+            results[result["index"]] = result
+            if runner.pool.workers[0].is_alive():
+                # Se termina un trabajador mientras ambos tienen una tarea en curso
+                while runner.pool.status()["running"] < 2:
+                    time.sleep(0.01)
+                runner.pool.workers[0].kill()
+        status = runner.pool.status()
+        killed, survivor = map(worker_name_of, runner.pool.workers)
+
+    assert status["requeued"] == 1
+    assert status["lost"] == [killed]
+    assert {result["worker"] for result in results} <= {killed, survivor}  # Nombres de run_worker
+    for result, reference in zip(results, expected):
+        assert result["summary"].as_dict() == reference["summary"].as_dict()
@@ -0,0 +1,103 @@
+from ising_model import IsingModel, IsingModel2D
+from observables import BlockingAccumulator
+import numpy as np
+import pytest
+
+# Pruebas de los motores contra la enumeración exacta de redes pequeñas (se
+# ejecutan con pytest). Con N <= 16 sitios se recorren los 2^N estados y se
+# calculan <E>, <|M|>, C_V y chi exactos con las mismas definiciones que
+# ObservableAccumulator; cada motor debe reproducirlos dentro de unos pocos
+# errores estadísticos (análisis de bloques) de una cadena con semilla fija.
+# Las pruebas de otros módulos contra los valores exactos importan de aquí las
+# funciones auxiliares.
+
+SWEEPS = 20000   # Barridos de cada cadena (pasos = SWEEPS · N en los motores de espín aleatorio)
+BURNIN = 1000    # Barridos de termalización descartados
+
+
+def exact_observables(lattice, T, J=1.0, h=0.0):
+    """
+    Observables exactos por enumeración de los 2^N estados de la red.
+
+    Devuelve un diccionario con <E>, <|M|>, C_V y chi (sin normalizar por N).
+    """
+    N = lattice.N
+    states = 1 - 2 * ((np.arange(2 ** N)[:, None] >> np.arange(N)) & 1)
+    padded = np.concatenate([states, np.zeros((2 ** N, 1), dtype=states.dtype)], axis=1)
+    forward = lattice.nbr[:, :lattice.z // 2]  # Cada enlace una vez; -1 es el sitio fantasma
+    bonds = np.sum(states[:, :, None] * padded[:, forward], axis=(1, 2))
+    M = states.sum(axis=1)
+    E = -J * bonds - h * M
+    w = np.exp(-(E - E.min()) / T)
+    w /= w.sum()
+    mean_E, mean_M = w @ E, w @ M
+    return {
+        "mean_energy": mean_E,
+        "mean_abs_magnetization": w @ np.abs(M),
+        "heat_capacity": (w @ E ** 2 - mean_E ** 2) / T ** 2,
+        "magnetic_susceptibility": (w @ M ** 2 - mean_M ** 2) / T,
+    }
+
+
+def chain(model, T, engine):
+    """
+    Cadena de SWEEPS barridos desde el estado ordenado, resumida en un
+    BlockingAccumulator para estimar sus errores ("multispin" simula 64
+    réplicas, así que basta con menos barridos).
+    """
+    sweeps, burnin = (SWEEPS // 16, BURNIN // 16) if engine == "multispin" else (SWEEPS, BURNIN)
+    values_per_sweep = model.N if engine in ("metropolis", "jit") else 1
+    Energy, Magn, _, _ = model.simulate(model.ordered_state(), [T], sweeps * model.N, engine=engine)
+    return blocked(Energy[0], Magn[0], burnin * values_per_sweep)
+
+
+def blocked(Energy, Magn, thermalization):
+    """
+    BlockingAccumulator de una serie (o de las réplicas en las columnas de una
+    serie 2D, combinadas con merge).
+    """
+    Energy, Magn = np.asarray(Energy), np.asarray(Magn)
+    acc = BlockingAccumulator(thermalization)
+    if Energy.ndim == 1:
+        acc.add_series(Energy, Magn)
+        return acc
+    for r in range(Energy.shape[1]):
+        replica = BlockingAccumulator(thermalization)
+        replica.add_series(Energy[:, r], Magn[:, r])
+        acc.merge(replica)
+    return acc
+
+
+def assert_exact(acc, T, exact, n_sigma=5.0):
+    """
+    Verifica que <E>, <|M|>, C_V y chi coincidan con los exactos dentro de
+    n_sigma errores de la cadena (jackknife sobre bloques).
+    """
+    stats = acc.statistics(T)
+    for name, error in (("mean_energy", "error_energy"),
+                        ("mean_abs_magnetization", "error_abs_magnetization"),
+                        ("heat_capacity", "error_heat_capacity"),
+                        ("magnetic_susceptibility", "error_magnetic_susceptibility")):
+        assert abs(stats[name] - exact[name]) <= n_sigma * stats[error], \
+            "{}: {} vs exacto {} (error {})".format(name, stats[name], exact[name], stats[error])
+
+
+@pytest.mark.parametrize("engine", IsingModel.ENGINES)
+def test_engines_square(engine):
+    model = IsingModel2D(4, seed=1)
+    T = 2.5
+    assert_exact(chain(model, T, engine), T, exact_observables(model.lattice, T))
+
+
+@pytest.mark.parametrize("engine", ["metropolis", "jit", "checkerboard"])
+def test_antiferromagnet(engine):
+    model = IsingModel2D(4, J=-1.0, seed=8)
+    T = 2.5
+    assert_exact(chain(model, T, engine), T, exact_observables(model.lattice, T, J=-1.0))
+
+
+@pytest.mark.parametrize("engine", ["wolff", "swendsen-wang", "multispin"])
+def test_engines_reject_antiferromagnet(engine):
+    model = IsingModel2D(4, J=-1.0, seed=8)
+    with pytest.raises(ValueError):
+        model.simulate(model.ordered_state(), [2.5], 100, engine=engine)
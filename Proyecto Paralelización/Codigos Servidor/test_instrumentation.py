@@ -0,0 +1,35 @@
+from instrumentation import Profiler
+from ising_model import IsingModel2D
+import numpy as np
+import pytest
+
+# Pruebas de los registros de instrumentación (se ejecutan con pytest).
+
+
+def test_simulate_records():
+    received = []
+    profiler = Profiler(sink=received.append)
+    model = IsingModel2D(4, seed=1, profiler=profiler)
+    _, Magn, _ = model.simulate(model.ordered_state(), [2.5, 3.0], 100 * model.N)
+
+    assert received == profiler.records
+    assert [(r["kind"], r["T"]) for r in profiler.records] == [("simulate", 2.5), ("simulate", 3.0)]
+    for record, M in zip(profiler.records, Magn):
+        assert record["updates"] == 100 * model.N
+        # Cada inversión aceptada cambia la magnetización en ±2
+        assert record["accepted"] == np.count_nonzero(np.diff(M))
+        assert record["acceptance"] == record["accepted"] / record["updates"]
+        assert set(record["phases"]) == {"rng", "update", "other"}
+        assert sum(record["phases"].values()) == pytest.approx(record["time"])
+
+
+def test_anneal_records_are_not_nested():
+    profiler = Profiler()
+    model = IsingModel2D(4, seed=2, profiler=profiler)
+    _, burnin, _, _ = model.anneal([2.5, 3.0], 10 * model.N, engine="checkerboard")
+
+    # Los simulate() internos se suman al registro de cada temperatura
+    assert [r["kind"] for r in profiler.records] == ["anneal", "anneal"]
+    for record, steps in zip(profiler.records, burnin):
+        assert record["burnin"] == steps
+        assert record["updates"] == steps + 10 * model.N
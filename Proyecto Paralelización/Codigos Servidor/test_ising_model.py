@@ -0,0 +1,55 @@
+from ising_model import IsingModel2D
+import pytest
+
+# Pruebas de los métodos de simulación de IsingModel (se ejecutan con pytest).
+
+
+@pytest.mark.parametrize("engine", ["metropolis", "jit"])  # Motores con E y M incrementales
+def test_check_every_detects_drift(engine):
+    model = IsingModel2D(4, seed=1)
+    model.simulate(model.ordered_state(), [2.5], 200 * model.N, check_every=16, engine=engine)
+
+    # Un energy() que deja de coincidir con la energía acumulada (como si se
+    # hubiera perdido una inversión de espín) debe detectarse
+    exact_energy = model.energy
+    calls = []
+
+    def drifting_energy(S):
+        calls.append(1)
+        return exact_energy(S) + (4.0 if len(calls) > 1 else 0.0)
+
+    model.energy = drifting_energy
+    with pytest.raises(RuntimeError):
+        model.simulate(model.ordered_state(), [2.5], 200 * model.N, check_every=16, engine=engine)
+
+
+def test_anneal_detects_burnin():
+    def burnin(S_ini=None, max_burnin=5000):
+        model = IsingModel2D(32, seed=0)
+        S_ini = model.random_state() if S_ini == "random" else S_ini
+        _, steps, _, _ = model.anneal([1.5], 100 * model.N, S_ini=S_ini, engine="checkerboard",
+                                      window=5, max_burnin=max_burnin * model.N)
+        return steps[0] // model.N
+
+    # Desde el estado ordenado la cadena ya está termalizada: basta la prueba
+    # mínima de 2 · window bloques de un barrido; desde un estado aleatorio hay deriva
+    assert burnin() == 10
+    assert burnin("random") > 10
+    assert burnin("random", max_burnin=12) == 12
+
+
+def test_simulate_until_stops_at_target():
+    model = IsingModel2D(8, seed=2)
+    T = 3.0
+    max_steps = 20000 * model.N
+    acc, stats, _, _, _ = model.simulate_until(model.ordered_state(), T, target_error=0.05,
+                                               engine="checkerboard", max_steps=max_steps)
+    assert stats["target_reached"]
+    assert max(acc.relative_errors(T, 0.01 * model.N).values()) <= 0.05
+    assert acc.count < max_steps // model.N  # Un valor por barrido: se detuvo antes del máximo
+
+    # Con un objetivo inalcanzable se simula hasta max_steps
+    acc, stats, _, _, _ = model.simulate_until(model.ordered_state(), T, target_error=1e-6,
+                                               engine="checkerboard", max_steps=500 * model.N)
+    assert not stats["target_reached"]
+    assert acc.count == 500 + 1
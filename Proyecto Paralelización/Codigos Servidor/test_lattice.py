@@ -0,0 +1,23 @@
+from ising_model import IsingModel
+from lattice import make_lattice
+from test_exact import assert_exact, chain, exact_observables
+import pytest
+
+# Pruebas de los motores sobre redes distintas de la cuadrada periódica contra
+# la enumeración exacta (se ejecutan con pytest).
+
+
+@pytest.mark.parametrize("engine", ["jit", "checkerboard", "wolff", "swendsen-wang"])
+@pytest.mark.parametrize("name, L, T", [("square-open", 4, 2.0), ("square", 3, 2.5),
+                                         ("cubic", 2, 4.5), ("triangular", 3, 3.5)])
+def test_engines_lattices(engine, name, L, T):
+    model = IsingModel(make_lattice(name, L), seed=2)
+    assert_exact(chain(model, T, engine), T, exact_observables(model.lattice, T))
+
+
+@pytest.mark.parametrize("engine", ["metropolis", "jit", "checkerboard"])
+@pytest.mark.parametrize("name, L", [("square", 4), ("triangular", 3)])
+def test_external_field(engine, name, L):
+    model = IsingModel(make_lattice(name, L), h=0.3, seed=3)
+    T = 3.0
+    assert_exact(chain(model, T, engine), T, exact_observables(model.lattice, T, h=0.3))
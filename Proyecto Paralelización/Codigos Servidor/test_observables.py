@@ -0,0 +1,43 @@
+from observables import BlockingAccumulator, HistogramAccumulator, ObservableAccumulator
+import numpy as np
+import pytest
+
+# Pruebas de los acumuladores de observables (se ejecutan con pytest).
+
+
+def test_add_series_rejects_replica_arrays():
+    E = np.zeros((10, 64))
+    with pytest.raises(ValueError):
+        ObservableAccumulator().add_series(E, E)
+
+    acc = ObservableAccumulator()
+    acc.add_replicas(np.arange(20.0).reshape(10, 2), np.ones((10, 2)))
+    assert acc.count == 20
+    assert acc.mean_energy() == pytest.approx(9.5)
+
+
+def test_add_replicas_keeps_histogram_bins():
+    acc = HistogramAccumulator(bin_width=4.0)
+    acc.add_replicas(np.array([[-8.0, -4.0], [-8.0, 0.0]]), np.ones((2, 2)))
+    energies, counts, _ = acc.histogram()
+    assert list(energies) == [-8.0, -4.0, 0.0]
+    assert list(counts) == [2, 1, 1]
+
+
+def test_relative_errors_floor():
+    # Red casi ordenada: de vez en cuando se invierte un espín (C_V y chi casi nulos)
+    rng = np.random.default_rng(1)
+    flips = rng.random(4096) < 0.01
+    E = np.where(flips, -24.0, -32.0)
+    M = np.where(flips, 14, 16)
+    acc = BlockingAccumulator()
+    acc.add_series(E, M)
+    T = 1.0
+    # chi ≈ 0.03 es menor que el piso 0.01 N de simulate_until
+    assert acc.relative_errors(T)["magnetic_susceptibility"] > 0.1
+    assert acc.relative_errors(T, floor=0.01 * 16)["magnetic_susceptibility"] < 0.05
+
+    # Sin fluctuaciones, C_V = 0 con error 0 no impide alcanzar el objetivo
+    frozen = BlockingAccumulator()
+    frozen.add_series(np.full(64, -32.0), np.full(64, 16))
+    assert max(frozen.relative_errors(T).values()) == 0.0
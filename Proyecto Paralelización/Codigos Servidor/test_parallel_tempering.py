@@ -0,0 +1,23 @@
+from ising_model import IsingModel2D
+from parallel_tempering import ParallelTempering
+from test_exact import BURNIN, SWEEPS, exact_observables
+import numpy as np
+import pytest
+
+# Pruebas del intercambio de réplicas contra la enumeración exacta (se ejecutan
+# con pytest).
+
+
+@pytest.mark.parametrize("engine", ParallelTempering.ENGINES)
+def test_parallel_tempering(engine):
+    model = IsingModel2D(4, seed=5)
+    temperatures = [2.0, 2.5, 3.0]
+    rounds = SWEEPS if engine == "checkerboard" else SWEEPS // 4
+    accs, rates, _ = ParallelTempering(model, temperatures, engine=engine).run(
+        rounds, thermalization=BURNIN)
+    assert np.all(rates > 0)
+    for acc, T in zip(accs, temperatures):
+        # Sin series no hay errores de bloques: tolerancias fijas holgadas para L = 4
+        exact = exact_observables(model.lattice, T)
+        assert acc.mean_energy() / model.N == pytest.approx(exact["mean_energy"] / model.N, abs=0.03)
+        assert acc.heat_capacity(T) == pytest.approx(exact["heat_capacity"], rel=0.1)
@@ -0,0 +1,83 @@
+from results_store import ResultsStore
+from observables import ObservableAccumulator
+from random_streams import keyed_seed, seed_record
+import numpy as np
+import pytest
+
+# Pruebas del almacén columnar de resultados (se ejecutan con pytest).
+
+
+def make_result(L, T, entropy):
+    """
+    Resultado mínimo de simulate_task para una tarea (L, T).
+    """
+    acc = ObservableAccumulator()
+    acc.add_series([-2.0 * L * L, -1.5 * L * L], [L * L, L * L - 2])
+    return {"L": L, "T": T, "h": 0.0, "nsteps": 100, "engine": "jit", "lattice": "square",
+            "seed": {"entropy": entropy, "spawn_key": [L]}, "summary": acc,
+            "time_internal": 1.0, "wall_time": 1.0, "worker": "nodo1:101"}
+
+
+def test_append_and_select(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(make_result(4, 3.0, 11))
+    store.append(make_result(2, 2.0, 22))
+    assert len(store) == 2
+    data = store.select(["L", "T", "seed"])
+    assert list(data["L"]) == [2, 4]  # Ordenado por (L, T)
+    assert list(data["seed"]) == ["22/2", "11/4"]
+    assert list(store.select(["T"], L=4)["T"]) == [3.0]
+
+
+def test_partial_row_is_discarded(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(make_result(4, 3.0, 11))
+
+    # Escritura interrumpida: la fila nueva solo llegó a las primeras columnas
+    for name, value in (("L", 2), ("T", 2.0), ("h", 0.0)):
+        with open(store._path(name), "ab") as f:
+            f.write(np.array([value], dtype=store.dtypes[name]).tobytes())
+    assert len(store) == 1
+
+    store.append(make_result(6, 4.0, 33))
+    assert len(store) == 2
+    data = store.select(["L", "T", "seed", "mean_energy"])
+    assert list(data["L"]) == [4, 6]
+    assert list(data["T"]) == [3.0, 4.0]
+    assert list(data["seed"]) == ["11/4", "33/6"]
+    assert np.allclose(data["mean_energy"], [-1.75 * 16, -1.75 * 36])
+    for name in store.dtypes:
+        assert store.column(name).shape[0] == 2
+
+
+def test_keyed_seed_is_not_truncated(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    root = np.random.SeedSequence(2 ** 127 + 12345)
+    result = make_result(4, 2.269, 0)
+    result["seed"] = seed_record(keyed_seed(root, (4, 2.269, -0.1)))
+    store.append(result)
+    stored = store.select(["seed"])["seed"][0]
+    entropy, key = stored.split("/")
+    assert int(entropy) == root.entropy
+    assert [int(k) for k in key.split(".")] == result["seed"]["spawn_key"]
+
+
+def test_value_too_long_is_rejected(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    result = make_result(4, 3.0, 11)
+    result["engine"] = "x" * 40
+    with pytest.raises(ValueError):
+        store.append(result)
+    assert len(store) == 0
+
+
+def test_repeated_key_is_skipped(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    assert store.append(make_result(4, 3.0, 11)) == 1
+    # Una tarea leída de un punto de control trae la misma clave (con la semilla)
+    resumed = make_result(4, 3.0, 11)
+    resumed["worker"] = None
+    assert store.append(resumed) == 0
+    assert store.append(make_result(4, 3.0, 12)) == 1
+    assert len(store) == 2
+    assert list(store.select(["worker"])["worker"]) == ["nodo1:101", "nodo1:101"]
@@ -0,0 +1,37 @@
+from ising_model import IsingModel2D
+from reweighting import multiple_histogram, peak_temperature, single_histogram
+from test_exact import BURNIN, SWEEPS, exact_observables
+import numpy as np
+import pytest
+
+# Pruebas de la reponderación de histogramas contra la enumeración exacta (se
+# ejecutan con pytest).
+
+
+def exact_heat_capacity(lattice, temperatures):
+    """
+    C_V exacta en cada temperatura.
+    """
+    return np.array([exact_observables(lattice, T)["heat_capacity"] for T in temperatures])
+
+
+def test_reweighting():
+    model = IsingModel2D(4, seed=7)
+    temperatures_sim = [2.0, 2.5, 3.0]
+    histograms = [model.simulate(model.ordered_state(), [T], SWEEPS * model.N, engine="jit",
+                                 stream=True, thermalization=BURNIN * model.N,
+                                 histogram=True)[0][0]
+                  for T in temperatures_sim]
+    temperatures = np.linspace(2.0, 3.0, 51)
+    exact = exact_heat_capacity(model.lattice, temperatures)
+
+    curves = multiple_histogram(histograms, temperatures_sim, temperatures)
+    assert np.allclose(curves["heat_capacity"], exact, rtol=0.05)
+    T_peak, C_peak = peak_temperature(temperatures, curves["heat_capacity"])
+    T_exact, C_exact = peak_temperature(temperatures, exact)
+    assert T_peak == pytest.approx(T_exact, abs=0.05)
+    assert C_peak == pytest.approx(C_exact, rel=0.05)
+
+    near = np.linspace(2.4, 2.6, 11)
+    single = single_histogram(histograms[1], 2.5, near)
+    assert np.allclose(single["heat_capacity"], exact_heat_capacity(model.lattice, near), rtol=0.05)
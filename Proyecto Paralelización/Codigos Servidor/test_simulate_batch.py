@@ -0,0 +1,13 @@
+from ising_model import IsingModel2D
+from test_exact import BURNIN, SWEEPS, assert_exact, blocked, exact_observables
+
+# Pruebas de la simulación de varias temperaturas en un solo proceso contra la
+# enumeración exacta (se ejecutan con pytest).
+
+
+def test_simulate_batch():
+    model = IsingModel2D(4, seed=4)
+    temperatures = [2.0, 2.5, 3.0]
+    Energy, Magn, _, _ = model.simulate_batch(model.ordered_state(), temperatures, SWEEPS * model.N)
+    for E, M, T in zip(Energy, Magn, temperatures):
+        assert_exact(blocked(E, M, BURNIN), T, exact_observables(model.lattice, T))
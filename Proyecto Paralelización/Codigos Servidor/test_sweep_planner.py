@@ -0,0 +1,53 @@
+from sweep_planner import SweepPlanner
+import numpy as np
+import pytest
+
+# Pruebas del planificador adaptativo de barridos (se ejecutan con pytest).
+
+
+class PeakedSummary:
+    """
+    Resumen de observables con C_V y chi conocidos, con máximo en T = 2.3.
+    """
+
+    def heat_capacity(self, T):
+        return 1.0 / (1.0 + ((T - 2.3) / 0.05) ** 2)
+
+    def magnetic_susceptibility(self, T):
+        return 2.0 / (1.0 + ((T - 2.3) / 0.05) ** 2)
+
+
+def run_planner(planner):
+    """
+    Simula el ciclo de imap_dynamic sin pool: cada tarea termina en orden y
+    sus tareas de refinación se agregan al final de la cola.
+    """
+    queue = planner.initial_tasks()
+    done = []
+    while queue:
+        L, T, nsteps, h = queue.pop(0)
+        done.append((L, T, h))
+        queue += planner.add({"L": L, "T": T, "h": h, "summary": PeakedSummary()})
+    return done
+
+
+def test_refinement_converges_on_peak():
+    planner = SweepPlanner([8, 16], [100, 100], scan=(1.5, 3.5), n_initial=9, resolution=0.01)
+    done = run_planner(planner)
+
+    assert len(done) == len(set(done)) == planner.submitted  # Ningún punto se repite
+    for key in ((8, 0.0), (16, 0.0)):
+        assert planner.peaks()[key]["heat_capacity"] == pytest.approx(2.3, abs=0.01)
+        x, curves = planner.curve(key)
+        peak = int(np.argmax(curves["heat_capacity"]))
+        assert x[peak + 1] - x[peak - 1] <= 2 * 0.01  # Vecinos del máximo a la resolución
+        near = (x > 2.2) & (x < 2.4)
+        assert np.all(np.diff(x[near]) < 0.05)  # Donde la curva cambia rápido se refina
+        assert np.min(np.diff(x[x < 2.0])) == pytest.approx(0.25)  # Lejos del máximo sigue grueso
+
+
+def test_max_tasks_stops_refinement():
+    planner = SweepPlanner([8], [100], scan=(1.5, 3.5), n_initial=9, resolution=1e-6,
+                           max_tasks=20)
+    done = run_planner(planner)
+    assert len(done) == planner.submitted == 20
@@ -0,0 +1,65 @@
+from ising_model import IsingModel2D
+from results_store import ResultsStore
+from sweep_runner import SweepRunner, load_series, make_tasks, simulate_task
+import numpy as np
+import pytest
+
+# Pruebas del ejecutor de barridos en paralelo (se ejecutan con pytest).
+
+
+def test_costly_tasks_first_results_in_task_order():
+    tasks = make_tasks([4, 8, 6], [2.0, 3.0], [16 * 50, 64 * 50, 36 * 50])
+    with SweepRunner(processes=1, engine="checkerboard", seed=1) as runner:
+        arrived = [(result["L"], result["T"]) for result in runner.imap(tasks)]
+        results = runner.run(tasks)
+    # Con un solo proceso las tareas terminan en el orden en que se envían: L² · nsteps decreciente
+    assert [L for L, _ in arrived] == [8, 8, 6, 6, 4, 4]
+    assert sorted(arrived) == sorted((L, T) for L, T, _ in tasks)
+    assert [(result["L"], result["T"]) for result in results] == [(L, T) for L, T, _ in tasks]
+    assert [result["index"] for result in results] == list(range(len(tasks)))
+
+
+@pytest.mark.parametrize("engine", ["metropolis", "checkerboard"])
+def test_series_round_trip(tmp_path, engine):
+    result = simulate_task((4, 2.5, 16 * 50, 0.1), engine=engine, series_dir=str(tmp_path),
+                           seed=5, thermalization=3)
+    E, M = load_series(result)
+    assert isinstance(E, np.memmap) and isinstance(M, np.memmap)
+
+    # La misma semilla reproduce las series completas en memoria
+    model = IsingModel2D(4, h=0.1, seed=np.random.SeedSequence(5))
+    Energy, Magn, _, _ = model.simulate(model.ordered_state(), [2.5], 16 * 50, engine=engine)
+    assert np.array_equal(E, Energy[0])
+    assert np.array_equal(M, Magn[0])
+    assert E.dtype == np.float64 and M.dtype == np.int32
+    assert result["summary"].count == len(E) - 3
+    assert result["summary"].mean_energy() == pytest.approx(np.mean(E[3:]))
+
+
+def test_multispin_series(tmp_path):
+    tasks = make_tasks([4], [2.5], [16 * 200])
+    with SweepRunner(processes=2, engine="multispin", series_dir=str(tmp_path), seed=1) as runner:
+        stored, = runner.run(tasks)
+    with SweepRunner(processes=2, engine="multispin", seed=1) as runner:
+        streamed, = runner.run(tasks)
+
+    E, M = load_series(stored)
+    assert E.shape == M.shape == (201, 64)  # Una columna por réplica
+    summary = stored["summary"]
+    assert summary.count == 201 * 64
+    assert -2.0 <= summary.mean_energy() / 16 <= 0.0
+    assert summary.mean_energy() == streamed["summary"].mean_energy()
+    assert summary.mean_magnetization2() == streamed["summary"].mean_magnetization2()
+
+
+def test_resumed_tasks_are_stored_once(tmp_path):
+    tasks = make_tasks([4], [2.0, 3.0], [16 * 100])
+    store = ResultsStore(str(tmp_path / "store"))
+    options = dict(processes=2, engine="checkerboard", checkpoint_dir=str(tmp_path / "checkpoints"),
+                   seed=2, store=store)
+    with SweepRunner(**options) as runner:
+        runner.run(tasks)
+    with SweepRunner(**options) as runner:
+        resumed = runner.run(tasks)
+    assert all(result.get("resumed") for result in resumed)
+    assert len(store) == 2